@@ -1,31 +1,229 @@
 const express = require("express");
 const cors = require("cors");
-const { exec } = require("child_process");
+const { spawn } = require("child_process");
+const readline = require("readline");
 
 const app = express();
-app.use(express.json());
+app.use(express.json({ limit: "50mb" }));
+app.use(express.text({ type: ["text/csv", "application/x-ndjson", "text/plain"], limit: "50mb" }));
 app.use(cors()); // Enable CORS
 
-app.post("/get_data", (req, res) => {
+// Number of warm Python workers (each keeps the models loaded) and how long a request may wait.
+const POOL_SIZE = parseInt(process.env.WORKER_POOL_SIZE || "4", 10);
+const REQUEST_TIMEOUT_MS = parseInt(process.env.WORKER_TIMEOUT_MS || "30000", 10);
+const BATCH_TIMEOUT_MS = parseInt(process.env.WORKER_BATCH_TIMEOUT_MS || "300000", 10);
+
+// Workers that die are respawned after an exponential backoff (WORKER_RESTART_MS, doubling up to
+// WORKER_RESTART_MAX_MS). One that exits within WORKER_STABLE_MS of starting counts as a failed
+// start; after WORKER_MAX_RESTARTS failed starts in a row its slot is left empty.
+const RESTART_BASE_MS = parseInt(process.env.WORKER_RESTART_MS || "500", 10);
+const RESTART_MAX_MS = parseInt(process.env.WORKER_RESTART_MAX_MS || "30000", 10);
+const STABLE_MS = parseInt(process.env.WORKER_STABLE_MS || "10000", 10);
+const MAX_RESTARTS = parseInt(process.env.WORKER_MAX_RESTARTS || "5", 10);
+
+// A resident `get_data.py --serve` process answering one JSON line per request.
+function createWorker(slot) {
+    const worker = {
+        process: spawn("python", ["src/get_data.py", "--serve"], { stdio: ["pipe", "pipe", "pipe"] }),
+        pending: new Map(),
+        alive: true,
+        slot,
+        startedAt: Date.now(),
+    };
+
+    readline.createInterface({ input: worker.process.stdout }).on("line", (line) => {
+        let output;
+        try {
+            output = JSON.parse(line);
+        } catch (parseError) {
+            console.error("Error parsing Python worker output:", line);
+            return;
+        }
+        const entry = worker.pending.get(output.id);
+        if (!entry) {
+            return;
+        }
+        worker.pending.delete(output.id);
+        clearTimeout(entry.timer);
+        delete output.id;
+        entry.resolve(output);
+    });
+
+    worker.process.stderr.on("data", (data) => console.error("Python worker:", data.toString()));
+    worker.process.stdin.on("error", (error) => console.error("Python worker stdin:", error.message));
+
+    // "error" covers a failed spawn (e.g. no python on PATH), which may never emit "exit"
+    worker.process.on("error", (error) => retireWorker(worker, `failed: ${error.message}`));
+    worker.process.on("exit", (code, signal) => retireWorker(worker, `exited with ${signal || `code ${code}`}`));
+
+    return worker;
+}
+
+const workers = [];
+const failedStarts = new Array(POOL_SIZE).fill(0);
+let nextRequestId = 0;
+
+// Take a dead or hung worker out of the pool, fail its pending requests and schedule its replacement.
+function retireWorker(worker, reason) {
+    if (!worker.alive) {
+        return;
+    }
+    worker.alive = false;
+    worker.process.kill();
+    for (const entry of worker.pending.values()) {
+        clearTimeout(entry.timer);
+        entry.reject(new Error(`Python worker ${reason}`));
+    }
+    worker.pending.clear();
+
+    const slot = worker.slot;
+    failedStarts[slot] = Date.now() - worker.startedAt < STABLE_MS ? failedStarts[slot] + 1 : 0;
+    if (failedStarts[slot] > MAX_RESTARTS) {
+        console.error(`Python worker ${slot} ${reason}; ${MAX_RESTARTS} restarts failed, not restarting`);
+        return;
+    }
+    const delay = Math.min(RESTART_BASE_MS * 2 ** failedStarts[slot], RESTART_MAX_MS);
+    console.error(`Python worker ${slot} ${reason}, restarting in ${delay} ms`);
+    setTimeout(() => {
+        workers[slot] = createWorker(slot);
+    }, delay);
+}
+
+for (let slot = 0; slot < POOL_SIZE; slot++) {
+    workers.push(createWorker(slot));
+}
+
+// Send a request to the given worker (default: the least busy live one) and resolve with its JSON response.
+// A worker that misses the deadline is presumed hung and is killed and replaced.
+function sendToWorker(payload, timeoutMs = REQUEST_TIMEOUT_MS, target = null) {
+    const worker = target || workers
+        .filter((w) => w.alive)
+        .reduce((best, w) => (best === null || w.pending.size < best.pending.size ? w : best), null);
+    if (!worker || !worker.alive) {
+        return Promise.reject(new Error("No Python workers available"));
+    }
+
+    const id = nextRequestId++;
+    return new Promise((resolve, reject) => {
+        const timer = setTimeout(() => {
+            worker.pending.delete(id);
+            reject(new Error("Python worker timed out"));
+            retireWorker(worker, "timed out");
+        }, timeoutMs);
+        worker.pending.set(id, { resolve, reject, timer });
+        worker.process.stdin.write(JSON.stringify({ id, ...payload }) + "\n");
+    });
+}
+
+// Per-stage timings (ms) are added to a response when asked for with "timings": true or ?timings=1.
+function wantsTimings(req) {
+    return req.query.timings === "1" || (typeof req.body === "object" && req.body.timings === true);
+}
+
+app.post("/get_data", async (req, res) => {
     const { easting, northing } = req.body;
     if (!easting || !northing) {
         return res.status(400).json({ error: "Missing easting or northing" });
     }
 
-    const command = `python src/get_data.py ${easting} ${northing}`;
-    exec(command, (error, stdout, stderr) => {
-        if (error) {
-            console.error("Error executing Python script:", stderr);
-            return res.status(500).json({ error: "Failed to execute Python script" });
+    try {
+        const output = await sendToWorker({ easting, northing, timings: wantsTimings(req) });
+        res.json(output);
+    } catch (error) {
+        console.error("Error executing Python worker:", error.message);
+        res.status(500).json({ error: "Failed to execute Python script" });
+    }
+});
+
+// Score many points in one call. Accepts JSON ({ points: [...] } or a bare array of
+// { easting, northing } objects / [easting, northing] pairs) or a CSV/NDJSON body.
+app.post("/get_data_batch", async (req, res) => {
+    let payload;
+    if (typeof req.body === "string") {
+        payload = { text: req.body };
+    } else {
+        const points = Array.isArray(req.body) ? req.body : req.body.points;
+        if (!Array.isArray(points)) {
+            return res.status(400).json({ error: "Provide a list of points or a CSV/NDJSON body" });
         }
-        try {
-            const output = JSON.parse(stdout);
-            res.json(output);
-        } catch (parseError) {
-            console.error("Error parsing Python script output:", stdout);
-            res.status(500).json({ error: "Failed to parse Python output" });
+        payload = { points };
+    }
+    payload.timings = wantsTimings(req);
+
+    try {
+        const output = await sendToWorker(payload, BATCH_TIMEOUT_MS);
+        if (output.error) {
+            return res.status(400).json(output);
         }
-    });
+        res.json(output);
+    } catch (error) {
+        console.error("Error executing Python worker:", error.message);
+        res.status(500).json({ error: "Failed to execute Python script" });
+    }
+});
+
+// Precomputed prediction for a coordinate, read from the national risk grid (no live lookup).
+app.post("/get_risk", async (req, res) => {
+    const { easting, northing } = req.body;
+    if (!easting || !northing) {
+        return res.status(400).json({ error: "Missing easting or northing" });
+    }
+
+    try {
+        const output = await sendToWorker({ op: "risk", easting, northing });
+        res.json(output);
+    } catch (error) {
+        console.error("Error executing Python worker:", error.message);
+        res.status(500).json({ error: "Failed to execute Python script" });
+    }
+});
+
+// Per-worker counters (result cache hits/misses) from every live worker.
+app.get("/stats", async (req, res) => {
+    const live = workers.filter((w) => w.alive);
+    const stats = await Promise.all(
+        live.map((worker) => sendToWorker({ op: "stats" }, REQUEST_TIMEOUT_MS, worker).catch((error) => ({ error: error.message })))
+    );
+    res.json({ workers: stats });
+});
+
+// Stage timing histograms summed over all live workers, in the Prometheus text format.
+app.get("/metrics", async (req, res) => {
+    const live = workers.filter((w) => w.alive);
+    const snapshots = await Promise.all(
+        live.map((worker) => sendToWorker({ op: "metrics" }, REQUEST_TIMEOUT_MS, worker).catch(() => null))
+    );
+
+    const stages = {};
+    let buckets = [];
+    for (const snapshot of snapshots) {
+        if (!snapshot || !snapshot.metrics) {
+            continue;
+        }
+        buckets = snapshot.metrics.buckets;
+        for (const [stage, histogram] of Object.entries(snapshot.metrics.stages)) {
+            const total = stages[stage] || { counts: histogram.counts.map(() => 0), sum: 0, count: 0 };
+            histogram.counts.forEach((count, i) => { total.counts[i] += count; });
+            total.sum += histogram.sum;
+            total.count += histogram.count;
+            stages[stage] = total;
+        }
+    }
+
+    const name = "get_data_stage_duration_seconds";
+    const lines = [`# HELP ${name} Time spent in each stage of a lookup.`, `# TYPE ${name} histogram`];
+    for (const stage of Object.keys(stages).sort()) {
+        const { counts, sum, count } = stages[stage];
+        let cumulative = 0;
+        [...buckets, "+Inf"].forEach((bound, i) => {
+            cumulative += counts[i];
+            lines.push(`${name}_bucket{stage="${stage}",le="${bound}"} ${cumulative}`);
+        });
+        lines.push(`${name}_sum{stage="${stage}"} ${sum}`);
+        lines.push(`${name}_count{stage="${stage}"} ${count}`);
+    }
+    lines.push(`get_data_workers_live ${live.length}`);
+    res.type("text/plain; version=0.0.4").send(lines.join("\n") + "\n");
 });
 
 const PORT = 5000;
@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import mapboxgl from "mapbox-gl";
 import proj4 from "proj4";
 import "./Map.css";
@@ -37,6 +37,9 @@ const Map = () => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [activeLeftTab, setActiveLeftTab] = useState(null);
+  const [hasRiskOverlay, setHasRiskOverlay] = useState(false);
+  const [showRiskOverlay, setShowRiskOverlay] = useState(false);
+  const mapRef = useRef(null);
 
   const clusterColors = {
     0: "#49006a", // Purple
@@ -65,6 +68,8 @@ const Map = () => {
       bearing: 0,
     });
 
+    mapRef.current = map;
+
     map.dragRotate.disable();
     map.touchZoomRotate.disableRotation();
 
@@ -85,6 +90,32 @@ const Map = () => {
         source: "stamp-source",
         paint: { "raster-opacity": 1 },
       });
+
+      // Precomputed national risk overlay (tools/build_risk_tiles.py), if it has been built.
+      fetch("/images/risk_overlay.json")
+        .then((response) => (response.ok ? response.json() : null))
+        .then((overlay) => {
+          if (!overlay || !overlay.coordinates) {
+            return;
+          }
+          map.addSource("risk-source", {
+            type: "image",
+            url: "/images/risk_overlay.png",
+            coordinates: overlay.coordinates,
+          });
+          map.addLayer(
+            {
+              id: "risk-layer",
+              type: "raster",
+              source: "risk-source",
+              layout: { visibility: "none" },
+              paint: { "raster-opacity": 1 },
+            },
+            "stamp-layer"
+          );
+          setHasRiskOverlay(true);
+        })
+        .catch(() => setHasRiskOverlay(false));
     });
 
     // Function to fetch field data from backend.
@@ -153,6 +184,16 @@ const Map = () => {
     return () => map.remove();
   }, []);
 
+  const toggleRiskOverlay = () => {
+    const map = mapRef.current;
+    if (!map || !map.getLayer("risk-layer")) {
+      return;
+    }
+    const visible = !showRiskOverlay;
+    map.setLayoutProperty("risk-layer", "visibility", visible ? "visible" : "none");
+    setShowRiskOverlay(visible);
+  };
+
   return (
     <div className="map-container">
       <header className="map-header" style={headerStyle}>
@@ -180,6 +221,14 @@ const Map = () => {
           >
             Tech Breakdown
           </button>
+          {hasRiskOverlay && (
+            <button
+              onClick={toggleRiskOverlay}
+              className="tab-button vertical"
+            >
+              {showRiskOverlay ? "Hide Risk Map" : "Show Risk Map"}
+            </button>
+          )}
         </div>
 
         <div id="map"></div>
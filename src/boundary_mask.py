@@ -0,0 +1,112 @@
+import json
+import os
+import numpy as np
+import shapely
+
+# Cell states: 0 is wholly outside every province, 1..n wholly inside province n - 1, and EDGE
+# cells are crossed by a province boundary, so their points are tested against the polygons.
+OUTSIDE = 0
+EDGE = 255
+
+
+class BoundaryMask:
+    """
+    Province mask in Irish Grid: a uint8 raster of cell states plus the province polygons. Points in
+    cells wholly inside or outside are answered from the raster alone; only points in EDGE cells are
+    tested against the (prepared) polygons, so the answer is exact everywhere. The origin is the
+    centre of the top-left cell and rows run southwards, as in GridLayer.
+    """
+
+    def __init__(self, states, origin_x, origin_y, resolution, names, geometries):
+        self.states = states
+        self.origin_x = float(origin_x)
+        self.origin_y = float(origin_y)
+        self.resolution = float(resolution)
+        self.names = list(names)
+        self.geometries = np.asarray(geometries, dtype=object)
+        shapely.prepare(self.geometries)
+
+    @classmethod
+    def build(cls, names, geometries, resolution=50):
+        """Rasterise province polygons (Irish Grid) into a mask with cells of `resolution` metres."""
+        import rasterio.features
+        from affine import Affine
+        from scipy import ndimage
+
+        if len(names) >= EDGE:
+            raise ValueError(f"At most {EDGE - 1} provinces fit in a uint8 mask, got {len(names)}")
+        min_x, min_y, max_x, max_y = shapely.total_bounds(geometries)
+        origin_x = np.floor(min_x / resolution) * resolution + resolution / 2
+        origin_y = np.ceil(max_y / resolution) * resolution - resolution / 2
+        shape = (int(np.ceil((origin_y - min_y) / resolution)) + 1, int(np.ceil((max_x - origin_x) / resolution)) + 1)
+        transform = Affine(resolution, 0, origin_x - resolution / 2, 0, -resolution, origin_y + resolution / 2)
+
+        # Label each cell by the province containing its centre, then mark every cell a boundary
+        # line touches (grown by one cell to absorb rounding) as EDGE
+        states = rasterio.features.rasterize(
+            [(geometry, index + 1) for index, geometry in enumerate(geometries)], out_shape=shape, transform=transform, dtype=np.uint8
+        )
+        touched = rasterio.features.rasterize(
+            [(shapely.boundary(geometry), 1) for geometry in geometries], out_shape=shape, transform=transform, all_touched=True, dtype=np.uint8
+        )
+        states[ndimage.binary_dilation(touched.astype(bool))] = EDGE
+        return cls(states, origin_x, origin_y, resolution, names, geometries)
+
+    def save(self, directory, name):
+        """Write <name>.npy (cell states) and <name>.json (grid metadata and province polygons as WKB)."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, f"{name}.npy"), self.states)
+        metadata = {
+            "origin_x": self.origin_x,
+            "origin_y": self.origin_y,
+            "resolution": self.resolution,
+            "names": self.names,
+            "geometries": shapely.to_wkb(self.geometries, hex=True).tolist(),
+        }
+        with open(os.path.join(directory, f"{name}.json"), "w") as metadata_file:
+            json.dump(metadata, metadata_file)
+
+    @classmethod
+    def load(cls, directory, name):
+        """Open a mask written by save(), memory-mapping the cell states."""
+        with open(os.path.join(directory, f"{name}.json")) as metadata_file:
+            metadata = json.load(metadata_file)
+        states = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        geometries = shapely.from_wkb(metadata["geometries"])
+        return cls(states, metadata["origin_x"], metadata["origin_y"], metadata["resolution"], metadata["names"], geometries)
+
+    def indices(self, easting, northing):
+        """Index into names of the province containing each point, -1 where outside every province."""
+        easting = np.atleast_1d(np.asarray(easting, dtype=np.float64))
+        northing = np.atleast_1d(np.asarray(northing, dtype=np.float64))
+        rows = np.rint((self.origin_y - northing) / self.resolution).astype(np.intp)
+        cols = np.rint((easting - self.origin_x) / self.resolution).astype(np.intp)
+        inside = (rows >= 0) & (rows < self.states.shape[0]) & (cols >= 0) & (cols < self.states.shape[1])
+        states = np.where(inside, self.states[np.where(inside, rows, 0), np.where(inside, cols, 0)], OUTSIDE)
+
+        result = states.astype(np.intp) - 1
+        edge = np.flatnonzero(states == EDGE)
+        result[edge] = -1
+        for index, geometry in enumerate(self.geometries):
+            if not len(edge):
+                break
+            hits = shapely.contains_xy(geometry, easting[edge], northing[edge])
+            result[edge[hits]] = index
+            edge = edge[~hits]
+        return result
+
+    def contains(self, easting, northing):
+        """Boolean array: whether each point is inside any province."""
+        return self.indices(easting, northing) >= 0
+
+    def province(self, easting, northing):
+        """Name of the province containing a single point, or None."""
+        index = int(self.indices(easting, northing)[0])
+        return self.names[index] if index >= 0 else None
+
+
+def load(directory, name="boundary_mask"):
+    """The mask saved in directory, or None when it has not been built."""
+    if not os.path.exists(os.path.join(directory, f"{name}.npy")):
+        return None
+    return BoundaryMask.load(directory, name)
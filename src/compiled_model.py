@@ -0,0 +1,147 @@
+import os
+import sys
+import numpy as np
+
+
+class CategoryEncoder:
+    """Dict-based stand-in for a fitted LabelEncoder (classes_ and transform only)."""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes)
+        self.codes = {name: code for code, name in enumerate(self.classes_.tolist())}
+
+    def transform(self, values):
+        try:
+            return np.array([self.codes[value] for value in values], dtype=np.int64)
+        except KeyError as e:
+            raise ValueError(f"y contains previously unseen labels: {e}") from None
+
+
+class Scaler:
+    """StandardScaler.transform from the stored mean and scale."""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class Forest:
+    """
+    Tree ensemble flattened into node arrays. Every tree's nodes sit in one block starting at its
+    entry in `roots`; child indices are global and -1 marks a leaf. `values` holds each node's
+    class fractions, so a prediction is the argmax of the mean leaf fractions, as in sklearn.
+    """
+
+    def __init__(self, roots, left, right, feature, threshold, values, classes):
+        self.roots = roots
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.values = values
+        self.classes_ = classes
+
+    def leaves(self, X):
+        """Leaf node reached in every tree, shape (rows, trees). Walks all trees one level per step."""
+        # sklearn evaluates trees on float32 input and compares against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, np.newaxis]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        while True:
+            active = self.left[node] != -1
+            if not active.any():
+                return node
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(active, np.where(go_left, self.left[node], self.right[node]), node)
+
+    def predict_proba(self, X):
+        # Accumulate tree by tree (cumsum is sequential) so ties break exactly as in sklearn
+        proba = np.cumsum(self.values[self.leaves(X)], axis=1)[:, -1]
+        return proba / len(self.roots)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def compile_model(texture_encoder, hydrology_encoder, scaler, classifier):
+    """
+    Flatten the fitted encoders, scaler and tree classifier (random forest or single decision tree)
+    into plain arrays for save_model. Raises ValueError for any other kind of classifier.
+    """
+    trees = getattr(classifier, "estimators_", None)
+    if trees is None and hasattr(classifier, "tree_"):
+        trees = [classifier]
+    if trees is None or not all(hasattr(tree, "tree_") for tree in trees):
+        raise ValueError(f"Only tree classifiers can be compiled, got {type(classifier).__name__}")
+
+    roots, left, right, feature, threshold, values = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        structure = tree.tree_
+        leaf = structure.children_left == -1
+        roots.append(offset)
+        left.append(np.where(leaf, -1, structure.children_left + offset))
+        right.append(np.where(leaf, -1, structure.children_right + offset))
+        feature.append(np.where(leaf, 0, structure.feature))
+        threshold.append(structure.threshold)
+        node_values = structure.value[:, 0, :]
+        values.append(node_values / node_values.sum(axis=1, keepdims=True))
+        offset += structure.node_count
+
+    return {
+        "texture_classes": np.asarray(texture_encoder.classes_, dtype=str),
+        "hydrology_classes": np.asarray(hydrology_encoder.classes_, dtype=str),
+        "scaler_mean": np.asarray(scaler.mean_, dtype=np.float64),
+        "scaler_scale": np.asarray(scaler.scale_, dtype=np.float64),
+        "roots": np.asarray(roots, dtype=np.int32),
+        "left": np.concatenate(left).astype(np.int32),
+        "right": np.concatenate(right).astype(np.int32),
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "values": np.concatenate(values).astype(np.float64),
+        "classes": np.asarray(classifier.classes_),
+    }
+
+
+def save_model(path, arrays):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez_compressed(path, **arrays)
+
+
+def from_arrays(arrays):
+    """
+    Build the objects get_data.py uses on the pickled models (texture_encoder, hydrology_encoder,
+    scaler, classifier) from compiled arrays, without sklearn. Arrays may be memory-mapped.
+    """
+    return {
+        "texture_encoder": CategoryEncoder(arrays["texture_classes"]),
+        "hydrology_encoder": CategoryEncoder(arrays["hydrology_classes"]),
+        "scaler": Scaler(arrays["scaler_mean"], arrays["scaler_scale"]),
+        "classifier": Forest(
+            arrays["roots"], arrays["left"], arrays["right"], arrays["feature"],
+            arrays["threshold"], arrays["values"], arrays["classes"],
+        ),
+    }
+
+
+def load_model(path):
+    """Load a compiled .npz artifact (see from_arrays)."""
+    with np.load(path, allow_pickle=False) as arrays:
+        return from_arrays(arrays)
+
+
+if __name__ == "__main__":
+    # Compile the existing pickles without retraining: python src/compiled_model.py [models_dir]
+    import joblib
+
+    models_dir = sys.argv[1] if len(sys.argv) > 1 else "./models"
+    fitted = [
+        joblib.load(os.path.join(models_dir, name))
+        for name in ("texture_encoder.pkl", "hydrology_encoder.pkl", "scaler.pkl", "best_cluster_classifier.pkl")
+    ]
+    output_path = os.path.join(models_dir, "cluster_classifier.npz")
+    save_model(output_path, compile_model(*fitted))
+    print(f"Compiled model written to {output_path}")
@@ -0,0 +1,84 @@
+import os
+import numpy as np
+from scipy import ndimage
+
+
+class DecisionSurface:
+    """
+    Classifier output tabulated over (texture code, hydrology code, elevation bin, rainfall bin),
+    stored as a uint8 cube of indices into `classes`. Bins are `*_step` wide starting at `*_min`
+    and each cell holds the prediction at its centre. Cells within `margin` bins of a different
+    prediction are flagged as boundary cells, where callers should fall back to the exact model.
+    `model_version` identifies the model the cube was evaluated with, so a stale surface can be refused.
+    """
+
+    def __init__(self, cube, elevation_min, elevation_step, rainfall_min, rainfall_step,
+                 texture_classes, hydrology_classes, classes, margin=1, model_version=""):
+        self.cube = cube
+        self.elevation_min = float(elevation_min)
+        self.elevation_step = float(elevation_step)
+        self.rainfall_min = float(rainfall_min)
+        self.rainfall_step = float(rainfall_step)
+        self.texture_classes = np.asarray(texture_classes)
+        self.hydrology_classes = np.asarray(hydrology_classes)
+        self.classes = np.asarray(classes)
+        self.model_version = str(model_version)
+        self.boundary = boundary_mask(cube, margin)
+
+    def elevation_centres(self):
+        return self.elevation_min + (np.arange(self.cube.shape[2]) + 0.5) * self.elevation_step
+
+    def rainfall_centres(self):
+        return self.rainfall_min + (np.arange(self.cube.shape[3]) + 0.5) * self.rainfall_step
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path,
+            cube=self.cube,
+            elevation=np.array([self.elevation_min, self.elevation_step]),
+            rainfall=np.array([self.rainfall_min, self.rainfall_step]),
+            texture_classes=self.texture_classes.astype(str),
+            hydrology_classes=self.hydrology_classes.astype(str),
+            classes=self.classes,
+            model_version=np.array(self.model_version),
+        )
+
+    @classmethod
+    def load(cls, path, margin=1):
+        with np.load(path, allow_pickle=False) as arrays:
+            model_version = str(arrays["model_version"]) if "model_version" in arrays.files else ""
+            return cls(
+                arrays["cube"], *arrays["elevation"], *arrays["rainfall"],
+                arrays["texture_classes"], arrays["hydrology_classes"], arrays["classes"], margin, model_version,
+            )
+
+    def predict(self, features):
+        """
+        Look up encoded (texture, elevation, annual_rainfall, hydrology) rows. Returns the predicted
+        classes and a mask of rows that need the exact model (outside the cube or on a boundary);
+        their predicted class is only the nearest cell's.
+        """
+        features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        texture = features[:, 0].astype(np.int64)
+        hydrology = features[:, 3].astype(np.int64)
+        elevation = np.floor((features[:, 1] - self.elevation_min) / self.elevation_step).astype(np.int64)
+        rainfall = np.floor((features[:, 2] - self.rainfall_min) / self.rainfall_step).astype(np.int64)
+
+        shape = self.cube.shape
+        inside = (elevation >= 0) & (elevation < shape[2]) & (rainfall >= 0) & (rainfall < shape[3])
+        cell = (
+            np.clip(texture, 0, shape[0] - 1),
+            np.clip(hydrology, 0, shape[1] - 1),
+            np.clip(elevation, 0, shape[2] - 1),
+            np.clip(rainfall, 0, shape[3] - 1),
+        )
+        return self.classes[self.cube[cell]], ~inside | self.boundary[cell]
+
+
+def boundary_mask(cube, margin):
+    """Cells whose (2 * margin + 1)^2 elevation/rainfall neighbourhood holds more than one class."""
+    if margin <= 0:
+        return np.zeros(cube.shape, dtype=bool)
+    size = (1, 1, 2 * margin + 1, 2 * margin + 1)
+    return ndimage.maximum_filter(cube, size=size, mode="nearest") != ndimage.minimum_filter(cube, size=size, mode="nearest")
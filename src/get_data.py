@@ -1,11 +1,32 @@
-import psycopg2
+from psycopg2 import pool
 from pyproj import Transformer
+from concurrent.futures import CancelledError, ThreadPoolExecutor, TimeoutError
+from contextlib import contextmanager, nullcontext
+import csv
+import hashlib
+import itertools
 import json
+import os
 import sys
+import threading
+import time
 import joblib
+import numpy as np
+import boundary_mask
+import compiled_model
+import decision_surface
+import model_registry
+import polygon_index
+import raster_grid
+from metrics import Metrics, statsd_from_env
+from result_cache import ResultCache
 
 debug_logs = []
 
+# Per-stage timing spans: returned with a request when asked for ("timings": true), kept as
+# histograms for the {"op": "metrics"} request and sent as StatsD timers when STATSD_HOST is set
+metrics = Metrics(statsd_address=statsd_from_env())
+
 # Database connection parameters
 DB_CONFIG = {
     "dbname": "soil_data",
@@ -15,120 +36,495 @@ DB_CONFIG = {
     "port": 5432,
 }
 
+# Threads for concurrent lookups, raised when a request needs more (see fetch_workers). The shared
+# pool keeps at most one connection more than that open.
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 4))
+
+# Fetch the boundary check and all four layers in one statement (set to 0 for one query per table)
+USE_COMBINED_QUERY = os.environ.get("DB_COMBINED_QUERY", "1") == "1"
+
+# Without the combined query, send the boundary check and the layer lookups at the same time on
+# pooled connections (set to 0 to run them one after another). A query still running after
+# DB_QUERY_TIMEOUT_MS, or once the point is known to be outside the boundary, is cancelled.
+# The fetch threads and the pool are sized so all of them can start together (see fetch_workers).
+USE_CONCURRENT_FETCH = os.environ.get("DB_CONCURRENT_FETCH", "1") == "1"
+DB_QUERY_TIMEOUT = float(os.environ.get("DB_QUERY_TIMEOUT_MS", 2000)) / 1000
+
+# Number of coordinates sent to the database per statement in batch mode
+BATCH_CHUNK_SIZE = int(os.environ.get("BATCH_CHUNK_SIZE", 5000))
+
+# Field names returned for each layer, in the order the columns are selected
+LAYER_FIELDS = {
+    "soil_data": ["Texture_Su", "TEXTURE", "DEPTH", "PlainEngli"],
+    "hydrology_data": ["CATEGORY", "ParMat_Des", "SoilDraina"],
+    "elevation_data": ["Easting", "Northing", "Elevation"],
+    "rainfall_data": ["Easting", "Northing", "ANN", "DJF", "MAM", "JJA", "SON"],
+}
+
 transformer = Transformer.from_crs("EPSG:29903", "EPSG:2157", always_xy=True)
 
+connection_pool = None
+
+
+def fetch_workers():
+    """Fetch threads: enough for the boundary check and every database layer of a request at once."""
+    return max(DB_POOL_SIZE, len(DB_LAYERS) + 1)
+
+
+def get_connection_pool():
+    """
+    Create the shared connection pool on first use. It holds one connection more than there are
+    fetch threads, so a statement run on the request thread (combined, batch or sequential lookups)
+    still gets a connection while cancelled or timed-out queries are holding theirs.
+    """
+    global connection_pool
+    if connection_pool is None:
+        connection_pool = pool.ThreadedConnectionPool(1, fetch_workers() + 1, **DB_CONFIG)
+    return connection_pool
+
+
+@contextmanager
+def pooled_connection(timed=True):
+    """Borrow a connection from the shared pool and hand it back afterwards."""
+    with metrics.span("connection") if timed else nullcontext():
+        db_pool = get_connection_pool()
+        conn = db_pool.getconn()
+    try:
+        conn.autocommit = True
+        yield conn
+    finally:
+        db_pool.putconn(conn, close=bool(conn.closed))
+
+
+def format_row(table_name, values):
+    """Map the selected column values of a layer onto the field names returned to the frontend."""
+    if not values or all(value is None for value in values):
+        return None
+    return dict(zip(LAYER_FIELDS[table_name], values))
+
+
+# Province mask built by tools/build_boundary_mask.py. When present it answers the boundary check
+# in-process (exactly: points in cells crossed by a boundary are tested against the polygons), so
+# points outside the Republic are rejected without a database round trip.
+BOUNDARY_MASK_DIR = os.environ.get("BOUNDARY_MASK_DIR", "./data/boundary")
+province_mask = boundary_mask.load(BOUNDARY_MASK_DIR)
+
+BOUNDARY_QUERY = """
+SELECT PROVINCE
+FROM provinces___gen_20m_2019
+WHERE ST_Contains(
+    SHAPE,
+    ST_SetSRID(ST_MakePoint(%s, %s), 2157)
+);
+"""
+
+
+# Returned when a lookup failed, as opposed to a point that really is outside the boundary. The
+# "Database error" log line that comes with it keeps the response out of the result cache.
+DATABASE_ERROR = "Database error while looking up the point"
+
 
 def is_within_boundary(easting, northing):
-    """Check if the given point is within the boundary in the GeoPackage."""
-    conn = None
+    """Check if the given point is within the boundary in the GeoPackage (None when the check failed)."""
+    if province_mask is not None:
+        with metrics.span("boundary"):
+            return province_mask.province(easting, northing) is not None
     try:
         transformed_easting, transformed_northing = transformer.transform(easting, northing)
-        conn = psycopg2.connect(**DB_CONFIG)
-        cursor = conn.cursor()
-        query = """
-        SELECT PROVINCE
-        FROM provinces___gen_20m_2019
-        WHERE ST_Contains(
-            SHAPE,
-            ST_SetSRID(ST_MakePoint(%s, %s), 2157)
-        );
-        """
-        cursor.execute(query, (transformed_easting, transformed_northing))
-        result = cursor.fetchone()
+        with pooled_connection() as conn, conn.cursor() as cursor, metrics.span("boundary"):
+            cursor.execute(BOUNDARY_QUERY, (transformed_easting, transformed_northing))
+            result = cursor.fetchone()
         return True if result else False
     except Exception as e:
         debug_logs.append(f"DEBUG: Database error in is_within_boundary: {e}")
-        return False
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
+        return None
+
+
+# Nearest-row lookup for each layer, written against {easting}/{northing} SQL expressions so the
+# same lookup serves a single bound coordinate and a column of a batch. These rely on the columns
+# and indexes created by tools/provision_indexes.py: GiST indexes for KNN (<->) ordering on the
+# polygon layers, a 1 km grid key for rainfall and the DEM row/column for elevation. The grid
+# lookups fall back to a KNN search when the exact cell has no data (e.g. sea or nodata pixels).
+POINT_TEMPLATE = "ST_SetSRID(ST_MakePoint({easting}, {northing}), 29903)"
+
+LAYER_TEMPLATES = {
+    "soil_data": """
+        SELECT "Texture_Su", "TEXTURE", "DEPTH", "PlainEngli"
+        FROM soil_data
+        ORDER BY geometry <-> {point}
+        LIMIT 1
+    """,
+    "hydrology_data": """
+        SELECT "CATEGORY", "ParMat_Des", "SoilDraina"
+        FROM hydrology_data
+        ORDER BY geometry <-> {point}
+        LIMIT 1
+    """,
+    "elevation_data": """
+        (SELECT e.easting, e.northing, e.elevation
+         FROM elevation_data AS e, elevation_grid AS g, ST_Transform({point}, 4326) AS wgs
+         WHERE e.raster_row = ROUND((g.origin_lat - ST_Y(wgs)) / g.resolution)::integer
+           AND e.raster_col = ROUND((ST_X(wgs) - g.origin_lon) / g.resolution)::integer
+         LIMIT 1)
+        UNION ALL
+        (SELECT easting, northing, elevation
+         FROM elevation_data
+         ORDER BY geom <-> {point}
+         LIMIT 1)
+        LIMIT 1
+    """,
+    "rainfall_data": """
+        (SELECT easting, northing, ann, djf, mam, jja, son
+         FROM rainfall_data
+         WHERE grid_e = ROUND({easting} / 1000.0)::integer
+           AND grid_n = ROUND({northing} / 1000.0)::integer
+         LIMIT 1)
+        UNION ALL
+        (SELECT easting, northing, ann, djf, mam, jja, son
+         FROM rainfall_data
+         ORDER BY geom <-> {point}
+         LIMIT 1)
+        LIMIT 1
+    """,
+}
+
+
+def layer_sql(table_name, easting, northing):
+    """Render the nearest-row lookup of a layer for the given easting/northing SQL expressions."""
+    point = POINT_TEMPLATE.format(easting=easting, northing=northing)
+    return LAYER_TEMPLATES[table_name].format(point=point, easting=easting, northing=northing)
+
+
+LAYER_QUERIES = {table_name: layer_sql(table_name, "%(easting)s", "%(northing)s") for table_name in LAYER_TEMPLATES}
+
+
+# Layers served in-process from the grids built by tools/build_grids.py (see raster_grid.py) and
+# the polygon indexes built by tools/build_polygon_index.py (see polygon_index.py). Any layer
+# without a local file is looked up in the database.
+GRID_DIR = os.environ.get("GRID_DIR", "./data/grids")
+GRID_INTERPOLATE = os.environ.get("GRID_INTERPOLATE", "0") == "1"
+POLYGON_DIR = os.environ.get("POLYGON_DIR", "./data/index")
+
+grid_layers = {name: layer for name, layer in raster_grid.load_layers(GRID_DIR).items() if name in LAYER_TEMPLATES}
+polygon_layers = {name: layer for name, layer in polygon_index.load_layers(POLYGON_DIR).items() if name in LAYER_TEMPLATES}
+LOCAL_LAYERS = [table_name for table_name in LAYER_TEMPLATES if table_name in grid_layers or table_name in polygon_layers]
+DB_LAYERS = [table_name for table_name in LAYER_TEMPLATES if table_name not in LOCAL_LAYERS]
+
+LAYER_ALIASES = {
+    "soil_data": "soil",
+    "hydrology_data": "hydrology",
+    "elevation_data": "elevation",
+    "rainfall_data": "rainfall",
+}
+
+
+def query_grid(table_name, eastings, northings):
+    """Look up a grid-backed layer for arrays of coordinates; one formatted row (or None) per point."""
+    layer = grid_layers[table_name]
+    values = layer.lookup(eastings, northings, interpolate=GRID_INTERPOLATE)
+    cell_eastings, cell_northings = layer.cell_centres(eastings, northings)
+    matrix = np.column_stack([cell_eastings, cell_northings] + [values[field] for field in LAYER_FIELDS[table_name][2:]])
+    return [None if np.isnan(row[2:]).any() else format_row(table_name, row.tolist()) for row in matrix]
+
+
+def query_local(table_name, eastings, northings):
+    """Look up an in-process layer (grid or polygon index) for arrays of coordinates."""
+    with metrics.span(f"query.{table_name}"):
+        if table_name in grid_layers:
+            return query_grid(table_name, eastings, northings)
+        rows = polygon_layers[table_name].lookup(eastings, northings, LAYER_FIELDS[table_name])
+        return [format_row(table_name, row) for row in rows]
 
 
 def query_database(table_name, easting, northing):
     """Query the database for the closest point in the specified table."""
-    conn = None
+    if table_name in LOCAL_LAYERS:
+        return query_local(table_name, [easting], [northing])[0]
+    if table_name not in LAYER_QUERIES:
+        return None
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        cursor = conn.cursor()
-
-        if table_name == "soil_data":
-            query = f"""
-            SELECT *
-            FROM {table_name}
-            ORDER BY ST_SetSRID(geometry, 29903) <-> ST_SetSRID(ST_MakePoint(%s, %s), 29903)
-            LIMIT 1;
-            """
-        elif table_name == "hydrology_data":
-            query = f"""
-            SELECT *
-            FROM {table_name}
-            ORDER BY ST_SetSRID(geometry, 29903) <-> ST_SetSRID(ST_MakePoint(%s, %s), 29903)
-            LIMIT 1;
-            """
-        elif table_name == "elevation_data":
-            query = f"""
-            SELECT easting, northing, elevation
-            FROM {table_name}
-            ORDER BY (POWER(easting - %s, 2) + POWER(northing - %s, 2))
-            LIMIT 1;
-            """
-        elif table_name == "rainfall_data":
-            query = f"""
-            SELECT easting, northing, ann, djf, mam, jja, son
-            FROM {table_name}
-            ORDER BY (POWER(easting - %s, 2) + POWER(northing - %s, 2))
-            LIMIT 1;
-            """
-        else:
-            return None
-
-        cursor.execute(query, (easting, northing))
-        result = cursor.fetchone()
+        with pooled_connection() as conn, conn.cursor() as cursor, metrics.span(f"query.{table_name}"):
+            cursor.execute(LAYER_QUERIES[table_name], {"easting": easting, "northing": northing})
+            result = cursor.fetchone()
         if not result:
             return None
+        return format_row(table_name, result)
+    except Exception as e:
+        debug_logs.append(f"DEBUG: Database error in query_database for {table_name}: {e}")
+        return None
 
-        if table_name == "soil_data":
-            return {
-                "Texture_Su": result[1],
-                "TEXTURE": result[2],
-                "DEPTH": result[3],
-                "PlainEngli": result[4],
-            }
-        elif table_name == "hydrology_data":
-            return {
-                "CATEGORY": result[1],
-                "ParMat_Des": result[2],
-                "SoilDraina": result[3],
-            }
-        elif table_name == "elevation_data":
-            return {
-                "Easting": result[0],
-                "Northing": result[1],
-                "Elevation": result[2],
-            }
-        elif table_name == "rainfall_data":
-            return {
-                "Easting": result[0],
-                "Northing": result[1],
-                "ANN": result[2],
-                "DJF": result[3],
-                "MAM": result[4],
-                "JJA": result[5],
-                "SON": result[6],
+
+def layer_joins(easting, northing):
+    """SELECT columns and LATERAL joins for the database-backed layers, in DB_LAYERS order."""
+    columns = "".join(f", {LAYER_ALIASES[table_name]}.*" for table_name in DB_LAYERS)
+    joins = "\n".join(
+        f"LEFT JOIN LATERAL ({layer_sql(table_name, easting, northing)}) AS {LAYER_ALIASES[table_name]} ON TRUE"
+        for table_name in DB_LAYERS
+    )
+    return columns, joins
+
+
+def data_from_row(row, local_rows):
+    """
+    Build the combined data for one point from a combined/batch result row (key column first,
+    then the database layers in DB_LAYERS order) and its in-process layer rows.
+    """
+    data = {"boundary_province": True}
+    offset = 1
+    for table_name in LAYER_TEMPLATES:
+        if table_name in local_rows:
+            data[table_name] = local_rows[table_name]
+        else:
+            width = len(LAYER_FIELDS[table_name])
+            data[table_name] = format_row(table_name, row[offset:offset + width])
+            offset += width
+    return data
+
+
+# Boundary check plus the nearest database layer rows in one round trip. When the point is
+# outside every province the first subquery returns no rows and the layers are never queried.
+COMBINED_COLUMNS, COMBINED_JOINS = layer_joins("%(easting)s", "%(northing)s")
+COMBINED_QUERY = f"""
+SELECT province.province{COMBINED_COLUMNS}
+FROM (
+    SELECT PROVINCE
+    FROM provinces___gen_20m_2019
+    WHERE ST_Contains(SHAPE, ST_SetSRID(ST_MakePoint(%(itm_easting)s, %(itm_northing)s), 2157))
+    LIMIT 1
+) AS province
+{COMBINED_JOINS};
+"""
+
+# With the province mask the boundary check has already been answered in-process, so only the
+# layers are looked up and the province name (from the mask) is passed in as the key column
+COMBINED_MASK_QUERY = f"""
+SELECT %(province)s{COMBINED_COLUMNS}
+FROM (SELECT 1) AS point
+{COMBINED_JOINS};
+"""
+
+
+def query_combined(easting, northing, province=None):
+    """
+    Run the boundary check and all database layer lookups as a single statement. A province
+    already found with the mask skips the boundary check (and the database, when every layer is local).
+    """
+    try:
+        if province is not None:
+            query, params = COMBINED_MASK_QUERY, {"easting": easting, "northing": northing, "province": province}
+        else:
+            itm_easting, itm_northing = transformer.transform(easting, northing)
+            query = COMBINED_QUERY
+            params = {
+                "easting": easting,
+                "northing": northing,
+                "itm_easting": itm_easting,
+                "itm_northing": itm_northing,
             }
+        if province is not None and not DB_LAYERS:
+            row = (province,)
+        else:
+            with pooled_connection() as conn, conn.cursor() as cursor, metrics.span("query.combined"):
+                cursor.execute(query, params)
+                row = cursor.fetchone()
     except Exception as e:
-        debug_logs.append(f"DEBUG: Database error in query_database for {table_name}: {e}")
+        debug_logs.append(f"DEBUG: Database error in query_combined: {e}")
+        return {"error": DATABASE_ERROR}
+
+    if not row or row[0] is None:
+        return {"error": "Point is outside the defined boundary"}
+    local_rows = {table_name: query_local(table_name, [easting], [northing])[0] for table_name in LOCAL_LAYERS}
+    return data_from_row(row, local_rows)
+
+
+# Set-based version of COMBINED_QUERY: the coordinates arrive as arrays and are unnested into rows,
+# each joined against the same layer lookups. Points outside the boundary drop out of the result.
+BATCH_COLUMNS, BATCH_JOINS = layer_joins("pts.easting", "pts.northing")
+BATCH_QUERY = f"""
+SELECT pts.idx{BATCH_COLUMNS}
+FROM unnest(%(eastings)s::float8[], %(northings)s::float8[], %(itm_eastings)s::float8[], %(itm_northings)s::float8[])
+    WITH ORDINALITY AS pts(easting, northing, itm_easting, itm_northing, idx)
+JOIN LATERAL (
+    SELECT PROVINCE
+    FROM provinces___gen_20m_2019
+    WHERE ST_Contains(SHAPE, ST_SetSRID(ST_MakePoint(pts.itm_easting, pts.itm_northing), 2157))
+    LIMIT 1
+) AS province ON TRUE
+{BATCH_JOINS};
+"""
+
+# BATCH_QUERY for points the province mask has already found inside the boundary
+BATCH_MASK_QUERY = f"""
+SELECT pts.idx{BATCH_COLUMNS}
+FROM unnest(%(eastings)s::float8[], %(northings)s::float8[]) WITH ORDINALITY AS pts(easting, northing, idx)
+{BATCH_JOINS};
+"""
+
+
+def query_batch(eastings, northings):
+    """Rows of BATCH_QUERY (or BATCH_MASK_QUERY when the mask has filtered the points) for one chunk."""
+    if province_mask is not None and not DB_LAYERS:
+        return [(index,) for index in range(1, len(eastings) + 1)]
+    params = {"eastings": eastings, "northings": northings}
+    if province_mask is None:
+        itm_eastings, itm_northings = transformer.transform(np.array(eastings), np.array(northings))
+        params.update(itm_eastings=itm_eastings.tolist(), itm_northings=itm_northings.tolist())
+    with pooled_connection() as conn, conn.cursor() as cursor, metrics.span("query.batch"):
+        cursor.execute(BATCH_QUERY if province_mask is None else BATCH_MASK_QUERY, params)
+        return cursor.fetchall()
+
+
+def get_batch_data(points):
+    """Retrieve the combined data for a list of (easting, northing) pairs, in input order."""
+    results = [{"error": "Point is outside the defined boundary"} for _ in points]
+    candidates = list(range(len(points)))
+    if province_mask is not None and points:
+        with metrics.span("boundary"):
+            inside = province_mask.contains([easting for easting, _ in points], [northing for _, northing in points])
+        candidates = np.flatnonzero(inside).tolist()
+    for start in range(0, len(candidates), BATCH_CHUNK_SIZE):
+        chunk_indices = candidates[start:start + BATCH_CHUNK_SIZE]
+        chunk = [points[index] for index in chunk_indices]
+        eastings = [float(easting) for easting, _ in chunk]
+        northings = [float(northing) for _, northing in chunk]
+        try:
+            rows = query_batch(eastings, northings)
+        except Exception as e:
+            debug_logs.append(f"DEBUG: Database error in get_batch_data for points {chunk_indices[0]}-{chunk_indices[-1]}: {e}")
+            for index in chunk_indices:
+                results[index] = {"error": DATABASE_ERROR}
+            continue
+        local_columns = {table_name: query_local(table_name, eastings, northings) for table_name in LOCAL_LAYERS}
+        for row in rows:
+            index = row[0] - 1
+            local_rows = {table_name: column[index] for table_name, column in local_columns.items()}
+            results[chunk_indices[index]] = data_from_row(row, local_rows)
+    return results
+
+
+fetch_executor = None
+
+
+def get_fetch_executor():
+    """Threads for concurrent lookups, fewer than the pooled connections so getconn never finds the pool empty."""
+    global fetch_executor
+    if fetch_executor is None:
+        fetch_executor = ThreadPoolExecutor(max_workers=fetch_workers(), thread_name_prefix="fetch")
+    return fetch_executor
+
+
+class QueryGroup:
+    """
+    The queries of one request, each running on a fetch thread with its own pooled connection.
+    A query registers its connection while the statement runs so cancel() can interrupt it on the
+    server; the lock keeps that connection from going back to the pool (and being reused by
+    another query) while a cancel request for it is in flight. Cancelled queries may only finish
+    during a later request, so their time is not recorded.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.futures = {}
+        self.running = {}
+        self.cancelled = set()
+
+    def submit(self, name, stage, query, params):
+        self.futures[name] = get_fetch_executor().submit(self.fetch_row, name, stage, query, params)
+
+    def fetch_row(self, name, stage, query, params):
+        start = time.perf_counter()
+        try:
+            with pooled_connection(timed=False) as conn, conn.cursor() as cursor:
+                with self.lock:
+                    if name in self.cancelled:
+                        return None
+                    self.running[name] = conn
+                try:
+                    cursor.execute(query, params)
+                    return cursor.fetchone()
+                finally:
+                    with self.lock:
+                        self.running.pop(name, None)
+        finally:
+            with self.lock:
+                if name not in self.cancelled:
+                    metrics.record(stage, time.perf_counter() - start)
+
+    def cancel(self, names):
+        with self.lock:
+            for name in names:
+                self.cancelled.add(name)
+                self.futures[name].cancel()
+                conn = self.running.get(name)
+                if conn is not None:
+                    try:
+                        conn.cancel()
+                    except Exception as e:
+                        debug_logs.append(f"DEBUG: Could not cancel query {name}: {e}")
+
+    def result(self, name, deadline):
+        """The row a query fetched, or None when it failed or was cancelled. Cancels it once the deadline passes."""
+        try:
+            return self.futures[name].result(timeout=max(deadline - time.monotonic(), 0))
+        except TimeoutError:
+            self.cancel([name])
+            debug_logs.append(f"DEBUG: Database error in {name}: no result within {DB_QUERY_TIMEOUT * 1000:.0f} ms")
+        except CancelledError:
+            pass
+        except Exception as e:
+            if name not in self.cancelled:
+                debug_logs.append(f"DEBUG: Database error in concurrent query {name}: {e}")
         return None
-    finally:
-        if conn:
-            cursor.close()
-            conn.close()
+
+
+def query_concurrent(easting, northing):
+    """
+    Send the boundary check and every database layer lookup at once and wait for them together,
+    so the latency is that of the slowest query rather than the sum. The layer lookups are
+    cancelled as soon as the boundary check fails.
+    """
+    with metrics.span("query.concurrent"):
+        itm_easting, itm_northing = transformer.transform(easting, northing)
+        deadline = time.monotonic() + DB_QUERY_TIMEOUT
+        group = QueryGroup()
+        if province_mask is None:
+            group.submit("boundary", "boundary", BOUNDARY_QUERY, (itm_easting, itm_northing))
+        for table_name in DB_LAYERS:
+            group.submit(table_name, f"query.{table_name}", LAYER_QUERIES[table_name], {"easting": easting, "northing": northing})
+        local_rows = {table_name: query_local(table_name, [easting], [northing])[0] for table_name in LOCAL_LAYERS}
+
+        # With the mask, get_combined_data has already rejected points outside the boundary
+        if province_mask is None and not group.result("boundary", deadline):
+            group.cancel(DB_LAYERS)
+            # No row either means outside the boundary or a failed (logged) boundary query
+            return {"error": DATABASE_ERROR if database_error_logged() else "Point is outside the defined boundary"}
+
+        data = {"boundary_province": True}
+        for table_name in LAYER_TEMPLATES:
+            if table_name in local_rows:
+                data[table_name] = local_rows[table_name]
+            else:
+                row = group.result(table_name, deadline)
+                data[table_name] = format_row(table_name, row) if row else None
+        return data
 
 
 def get_combined_data(easting, northing):
     """Retrieve all relevant data for a given coordinate."""
+    province = None
+    if province_mask is not None:
+        with metrics.span("boundary"):
+            province = province_mask.province(easting, northing)
+        if province is None:
+            return {"error": "Point is outside the defined boundary"}
+    if USE_COMBINED_QUERY:
+        return query_combined(easting, northing, province)
+    if USE_CONCURRENT_FETCH:
+        return query_concurrent(easting, northing)
+
     province = is_within_boundary(easting, northing)
+    if province is None:
+        return {"error": DATABASE_ERROR}
     if not province:
         return {"error": "Point is outside the defined boundary"}
 
@@ -147,93 +543,472 @@ def get_combined_data(easting, northing):
     return result
 
 
-if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        output = {"error": "Provide easting and northing as arguments", "debug": debug_logs}
-        print(json.dumps(output))
-        sys.exit(1)
+# Cache of complete responses keyed by the exact coordinates. RESULT_CACHE_RESOLUTION=50 (metres,
+# about one DEM cell) shares entries between nearby points instead, at the cost of sometimes
+# answering a point with a neighbour's features across a DEM cell or polygon boundary (see
+# ResultCache). RESULT_CACHE_SIZE=0 disables the cache, RESULT_CACHE_PATH adds a SQLite copy that
+# survives restarts and is shared by the workers.
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", 10000))
+RESULT_CACHE_MB = float(os.environ.get("RESULT_CACHE_MB", 64))
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", 0)) or None
+RESULT_CACHE_RESOLUTION = float(os.environ.get("RESULT_CACHE_RESOLUTION", 0)) or None
+RESULT_CACHE_PATH = os.environ.get("RESULT_CACHE_PATH")
+
+result_cache = None
+if RESULT_CACHE_SIZE > 0:
+    result_cache = ResultCache(
+        resolution=RESULT_CACHE_RESOLUTION,
+        max_entries=RESULT_CACHE_SIZE,
+        max_bytes=int(RESULT_CACHE_MB * 1024 * 1024),
+        ttl=RESULT_CACHE_TTL,
+        path=RESULT_CACHE_PATH,
+    )
+
+
+# National grid of precomputed predictions written by tools/build_risk_tiles.py
+RISK_GRID_DIR = os.environ.get("RISK_GRID_DIR", "./data/risk")
+risk_grid = raster_grid.load_layers(RISK_GRID_DIR).get("risk_grid")
+
+
+MODEL_PATHS = {
+    "texture_encoder": "./models/texture_encoder.pkl",
+    "hydrology_encoder": "./models/hydrology_encoder.pkl",
+    "scaler": "./models/scaler.pkl",
+    "classifier": "./models/best_cluster_classifier.pkl",
+}
+
+# sklearn-free artifact compiled from the pickles above (src/compiled_model.py), used when present
+COMPILED_MODEL_PATH = os.environ.get("COMPILED_MODEL_PATH", "./models/cluster_classifier.npz")
+
+# Opt-in constant-time lookup table built by tools/build_decision_surface.py. Rows within
+# DECISION_SURFACE_MARGIN bins of a class change (or outside the table) use the exact model.
+DECISION_SURFACE_PATH = os.environ.get("DECISION_SURFACE_PATH", "./models/decision_surface.npz")
+USE_DECISION_SURFACE = os.environ.get("USE_DECISION_SURFACE", "0") == "1"
+DECISION_SURFACE_MARGIN = int(os.environ.get("DECISION_SURFACE_MARGIN", 1))
+
+# Versioned models (src/model_registry.py). When the registry has a current version it is used
+# instead of the files above, and the pointer is re-read at most every MODEL_RELOAD_INTERVAL
+# seconds so a long-running worker picks up a newly published version without restarting.
+MODEL_REGISTRY_DIR = os.environ.get("MODEL_REGISTRY_DIR", "./models/registry")
+MODEL_RELOAD_INTERVAL = float(os.environ.get("MODEL_RELOAD_INTERVAL", 5))
 
+models = {}
+# "fingerprint" identifies the models being served (the registry version, else a hash of the model
+# files). It namespaces the result cache and must match the one stored in the decision surface and
+# the risk grid, so nothing computed with a previous model is served after a reload.
+model_state = {"version": None, "checked": 0.0, "fingerprint": None}
+
+
+def registry_version():
+    """The registry's current version, re-reading the pointer only once per MODEL_RELOAD_INTERVAL."""
+    now = time.monotonic()
+    if models and now - model_state["checked"] < MODEL_RELOAD_INTERVAL:
+        return model_state["version"]
+    model_state["checked"] = now
+    return model_registry.current_version(MODEL_REGISTRY_DIR)
+
+
+def model_fingerprint(version):
+    if version is not None:
+        return version
+    paths = [COMPILED_MODEL_PATH] if os.path.exists(COMPILED_MODEL_PATH) else list(MODEL_PATHS.values())
+    return hashlib.sha256("".join(model_registry.file_hash(path) for path in paths).encode()).hexdigest()[:16]
+
+
+def load_models():
+    """Load the encoders, scaler and classifier once and keep them for later requests."""
+    version = registry_version()
+    if models and version == model_state["version"]:
+        return models
+    with metrics.span("model_load"):
+        if version is not None:
+            loaded = model_registry.load(MODEL_REGISTRY_DIR, version)
+        elif os.path.exists(COMPILED_MODEL_PATH):
+            loaded = compiled_model.load_model(COMPILED_MODEL_PATH)
+        else:
+            loaded = {name: joblib.load(path) for name, path in MODEL_PATHS.items()}
+    if models:
+        debug_logs.append(f"DEBUG: Reloaded models (version {model_state['version']} -> {version})")
+    # Swap in the complete set at once (this also drops the cached decision surface)
+    models.clear()
+    models.update(loaded)
+    model_state["version"] = version
+    model_state["fingerprint"] = model_fingerprint(version)
+    if result_cache is not None:
+        result_cache.set_namespace(model_state["fingerprint"])
+    return models
+
+
+def sync_models():
+    """Pick up a newly published model before the result cache is read, so it can't serve old predictions."""
     try:
-        easting = float(sys.argv[1])
-        northing = float(sys.argv[2])
+        load_models()
+    except Exception as e:
+        debug_logs.append(f"DEBUG: Could not load models: {e}")
 
-        data = get_combined_data(easting, northing)
-        debug_logs.append("DEBUG: Entire data dictionary:\n" + json.dumps(data, indent=2))
 
-        if "error" not in data:
-            try:
-                # Use TEXTURE if present; fallback to Texture_Su
-                let_texture = data.get("soil_data", {}).get("TEXTURE")
-                if not let_texture:
-                    let_texture = data.get("soil_data", {}).get("Texture_Su")
-                texture = let_texture
+def load_decision_surface(loaded):
+    """The decision surface when enabled and built for the loaded model and encoders, otherwise None."""
+    if not USE_DECISION_SURFACE or not os.path.exists(DECISION_SURFACE_PATH):
+        return None
+    if "decision_surface" not in loaded:
+        surface = decision_surface.DecisionSurface.load(DECISION_SURFACE_PATH, DECISION_SURFACE_MARGIN)
+        matches = (
+            surface.model_version == model_state["fingerprint"] and
+            surface.texture_classes.tolist() == loaded["texture_encoder"].classes_.tolist() and
+            surface.hydrology_classes.tolist() == loaded["hydrology_encoder"].classes_.tolist()
+        )
+        if not matches:
+            debug_logs.append(f"DEBUG: Ignoring decision surface built for model {surface.model_version or 'unknown'}")
+        loaded["decision_surface"] = surface if matches else None
+    return loaded["decision_surface"]
 
-                elevation = data.get("elevation_data", {}).get("Elevation")
-                annual_rainfall = data.get("rainfall_data", {}).get("ANN")
-                hydrology_category = data.get("hydrology_data", {}).get("CATEGORY")
 
-                debug_logs.append(f"DEBUG: texture = {texture}")
-                debug_logs.append(f"DEBUG: elevation = {elevation}")
-                debug_logs.append(f"DEBUG: annual_rainfall = {annual_rainfall}")
-                debug_logs.append(f"DEBUG: hydrology_category = {hydrology_category}")
+def classify(feature_matrix):
+    """Cluster for each encoded (texture, elevation, annual_rainfall, hydrology) row."""
+    loaded = load_models()
+    feature_matrix = np.asarray(feature_matrix, dtype=np.float64)
+    surface = load_decision_surface(loaded)
+    if surface is None:
+        return exact_predict(loaded, feature_matrix)
+    with metrics.span("surface_lookup"):
+        predicted, exact = surface.predict(feature_matrix)
+    if exact.any():
+        predicted[exact] = exact_predict(loaded, feature_matrix[exact])
+    return predicted
 
-                # Check if any field is missing
-                if None not in (texture, elevation, annual_rainfall, hydrology_category):
-                    try:
-                        elevation = float(elevation)
-                        annual_rainfall = float(annual_rainfall)
-                    except ValueError as ve:
-                        debug_logs.append("DEBUG: Error converting numeric fields: " + str(ve))
-                        data["cluster_prediction_error"] = "Missing one or more required feature values"
-                    else:
-                        # Load models
-                        texture_encoder = joblib.load("./models/texture_encoder.pkl")
-                        hydrology_encoder = joblib.load("./models/hydrology_encoder.pkl")
-                        scaler = joblib.load("./models/scaler.pkl")
-                        classifier = joblib.load("./models/best_cluster_classifier.pkl")
-
-                        # Check if texture is "Urban" (case-insensitive)
-                        cleaned_texture = texture.strip().lower()
-                        if cleaned_texture == "urban":
-                            data["cluster_prediction"] = "Urban: flooding doesn't apply."
-                        else:
-                            try:
-                                texture_encoded = texture_encoder.transform([texture])[0]
-                            except ValueError:
-                                data["cluster_prediction_error"] = f"'{texture}' not a valid texture to apply Risk Prediction. Try a different location."
-                                debug_logs.append(f"DEBUG: Unseen texture encountered: {texture}")
-                            else:
-                                # Next, handle hydrology
-                                try:
-                                    hydrology_encoded = hydrology_encoder.transform([hydrology_category])[0]
-                                except ValueError:
-                                    data["cluster_prediction_error"] = f"{hydrology_category}: flooding doesn't apply."
-                                    debug_logs.append(
-                                        f"DEBUG: Unseen hydrology category encountered: {hydrology_category}"
-                                    )
-                                else:
-                                    feature_vector = [
-                                        texture_encoded,
-                                        elevation,
-                                        annual_rainfall,
-                                        hydrology_encoded
-                                    ]
-                                    feature_vector_scaled = scaler.transform([feature_vector])
-                                    predicted_cluster = classifier.predict(feature_vector_scaled)[0]
-                                    debug_logs.append(f"DEBUG: Successfully predicted cluster: {predicted_cluster}")
-                                    data["cluster_prediction"] = int(predicted_cluster)
-                else:
-                    debug_logs.append("DEBUG: One or more fields is missing from the data.")
-                    data["cluster_prediction_error"] = "Missing one or more required feature values"
-            except Exception as e:
-                debug_logs.append("DEBUG: Exception during cluster prediction: " + str(e))
+
+def exact_predict(loaded, feature_matrix):
+    with metrics.span("scale"):
+        scaled = loaded["scaler"].transform(feature_matrix)
+    with metrics.span("predict"):
+        return loaded["classifier"].predict(scaled)
+
+
+def predict_cluster(data):
+    """Add a cluster prediction (or a prediction error) to the combined data dictionary."""
+    # Use TEXTURE if present; fallback to Texture_Su
+    let_texture = data.get("soil_data", {}).get("TEXTURE")
+    if not let_texture:
+        let_texture = data.get("soil_data", {}).get("Texture_Su")
+    texture = let_texture
+
+    elevation = data.get("elevation_data", {}).get("Elevation")
+    annual_rainfall = data.get("rainfall_data", {}).get("ANN")
+    hydrology_category = data.get("hydrology_data", {}).get("CATEGORY")
+
+    debug_logs.append(f"DEBUG: texture = {texture}")
+    debug_logs.append(f"DEBUG: elevation = {elevation}")
+    debug_logs.append(f"DEBUG: annual_rainfall = {annual_rainfall}")
+    debug_logs.append(f"DEBUG: hydrology_category = {hydrology_category}")
+
+    # Check if any field is missing
+    if None in (texture, elevation, annual_rainfall, hydrology_category):
+        debug_logs.append("DEBUG: One or more fields is missing from the data.")
+        data["cluster_prediction_error"] = "Missing one or more required feature values"
+        return data
+
+    try:
+        elevation = float(elevation)
+        annual_rainfall = float(annual_rainfall)
+    except ValueError as ve:
+        debug_logs.append("DEBUG: Error converting numeric fields: " + str(ve))
+        data["cluster_prediction_error"] = "Missing one or more required feature values"
+        return data
+
+    loaded = load_models()
+
+    # Check if texture is "Urban" (case-insensitive)
+    cleaned_texture = texture.strip().lower()
+    if cleaned_texture == "urban":
+        data["cluster_prediction"] = "Urban: flooding doesn't apply."
+        return data
+
+    try:
+        with metrics.span("encode"):
+            texture_encoded = loaded["texture_encoder"].transform([texture])[0]
+    except ValueError:
+        data["cluster_prediction_error"] = f"'{texture}' not a valid texture to apply Risk Prediction. Try a different location."
+        debug_logs.append(f"DEBUG: Unseen texture encountered: {texture}")
+        return data
+
+    # Next, handle hydrology
+    try:
+        with metrics.span("encode"):
+            hydrology_encoded = loaded["hydrology_encoder"].transform([hydrology_category])[0]
+    except ValueError:
+        data["cluster_prediction_error"] = f"{hydrology_category}: flooding doesn't apply."
+        debug_logs.append(f"DEBUG: Unseen hydrology category encountered: {hydrology_category}")
+        return data
+
+    feature_vector = [
+        texture_encoded,
+        elevation,
+        annual_rainfall,
+        hydrology_encoded
+    ]
+    predicted_cluster = classify([feature_vector])[0]
+    debug_logs.append(f"DEBUG: Successfully predicted cluster: {predicted_cluster}")
+    data["cluster_prediction"] = int(predicted_cluster)
+    return data
+
+
+def batch_features(data, texture_classes, hydrology_classes):
+    """
+    Return the (texture, elevation, annual_rainfall, hydrology_category) row for one batch result,
+    or None after recording why it cannot be classified (same outcomes as predict_cluster).
+    """
+    soil_data = data.get("soil_data") or {}
+    texture = soil_data.get("TEXTURE") or soil_data.get("Texture_Su")
+    elevation = (data.get("elevation_data") or {}).get("Elevation")
+    annual_rainfall = (data.get("rainfall_data") or {}).get("ANN")
+    hydrology_category = (data.get("hydrology_data") or {}).get("CATEGORY")
+
+    if None in (texture, elevation, annual_rainfall, hydrology_category):
+        data["cluster_prediction_error"] = "Missing one or more required feature values"
+        return None
+    try:
+        elevation = float(elevation)
+        annual_rainfall = float(annual_rainfall)
+    except ValueError:
+        data["cluster_prediction_error"] = "Missing one or more required feature values"
+        return None
+
+    if texture.strip().lower() == "urban":
+        data["cluster_prediction"] = "Urban: flooding doesn't apply."
+        return None
+    if texture not in texture_classes:
+        data["cluster_prediction_error"] = f"'{texture}' not a valid texture to apply Risk Prediction. Try a different location."
+        return None
+    if hydrology_category not in hydrology_classes:
+        data["cluster_prediction_error"] = f"{hydrology_category}: flooding doesn't apply."
+        return None
+    return texture, elevation, annual_rainfall, hydrology_category
+
+
+def predict_clusters(results):
+    """Batch version of predict_cluster: encode, scale and classify all valid rows in one call each."""
+    loaded = load_models()
+    texture_classes = set(loaded["texture_encoder"].classes_)
+    hydrology_classes = set(loaded["hydrology_encoder"].classes_)
+
+    rows = []
+    features = []
+    for data in results:
+        if "error" in data:
+            continue
+        row_features = batch_features(data, texture_classes, hydrology_classes)
+        if row_features is not None:
+            rows.append(data)
+            features.append(row_features)
+    if not rows:
+        return results
+
+    textures, elevations, annual_rainfalls, hydrology_categories = zip(*features)
+    with metrics.span("encode"):
+        feature_matrix = np.column_stack([
+            loaded["texture_encoder"].transform(list(textures)),
+            elevations,
+            annual_rainfalls,
+            loaded["hydrology_encoder"].transform(list(hydrology_categories)),
+        ])
+    predicted_clusters = classify(feature_matrix)
+    for data, predicted_cluster in zip(rows, predicted_clusters):
+        data["cluster_prediction"] = int(predicted_cluster)
+    return results
+
+
+def lookup_risk(easting, northing):
+    """Precomputed cluster and model inputs for the risk grid cell containing the coordinate."""
+    if risk_grid is None:
+        return {"error": "Risk grid has not been built"}
+    values = {band: column[0] for band, column in risk_grid.lookup(easting, northing).items()}
+    if np.isnan(values["Cluster"]):
+        return {"error": "No precomputed prediction for this location"}
+    loaded = load_models()
+    if risk_grid.attributes.get("model_version") != model_state["fingerprint"]:
+        return {"error": "Risk grid was built for a different model version"}
+    return {
+        "cluster_prediction": int(values["Cluster"]),
+        "elevation": float(values["Elevation"]),
+        "annual_rainfall": float(values["Annual_Rainfall"]),
+        "texture": str(loaded["texture_encoder"].classes_[int(values["Texture"])]),
+        "hydrology_category": str(loaded["hydrology_encoder"].classes_[int(values["Hydrology_Category"])]),
+        "resolution": risk_grid.resolution,
+    }
+
+
+def database_error_logged():
+    """Whether a lookup in the current request hit a database error (such results are not cached)."""
+    return any("Database error" in log for log in debug_logs)
+
+
+def handle_request(easting, northing):
+    """Look up the data for one coordinate and run the cluster prediction on it."""
+    debug_logs.clear()
+    if result_cache is not None:
+        sync_models()
+        with metrics.span("cache"):
+            cached = result_cache.get(easting, northing)
+        if cached is not None:
+            return cached
+
+    data = get_combined_data(easting, northing)
+    debug_logs.append("DEBUG: Entire data dictionary:\n" + json.dumps(data, indent=2))
+
+    if "error" not in data:
+        try:
+            predict_cluster(data)
+        except Exception as e:
+            debug_logs.append("DEBUG: Exception during cluster prediction: " + str(e))
+            data["cluster_prediction_error"] = str(e)
+
+    # Only include debug logs if there's an error
+    if "cluster_prediction_error" in data:
+        data["debug"] = list(debug_logs)
+
+    # Nothing is cached while the models can't be loaded, so the failure isn't kept after a fix
+    if result_cache is not None and models and not database_error_logged():
+        result_cache.put(easting, northing, data)
+    return data
+
+
+def handle_batch(points):
+    """Look up and predict a list of (easting, northing) pairs; results are returned in input order."""
+    debug_logs.clear()
+    if result_cache is not None:
+        sync_models()
+    with metrics.span("cache"):
+        results = [result_cache.get(easting, northing) if result_cache is not None else None for easting, northing in points]
+    missing = [index for index, data in enumerate(results) if data is None]
+
+    missing_results = get_batch_data([points[index] for index in missing])
+    try:
+        predict_clusters(missing_results)
+    except Exception as e:
+        debug_logs.append("DEBUG: Exception during batch cluster prediction: " + str(e))
+        for data in missing_results:
+            if "error" not in data and "cluster_prediction" not in data:
                 data["cluster_prediction_error"] = str(e)
 
-        # Only include debug logs if there's an error
-        if "cluster_prediction_error" in data:
-            data["debug"] = debug_logs
+    cacheable = result_cache is not None and models and not database_error_logged()
+    for index, data in zip(missing, missing_results):
+        results[index] = data
+        if cacheable:
+            result_cache.put(*points[index], data)
+    return [{"easting": easting, "northing": northing, **data} for (easting, northing), data in zip(points, results)]
+
 
-        print(json.dumps(data))
+def parse_point(record):
+    """Read an (easting, northing) pair from a JSON object or a two-element list."""
+    if isinstance(record, dict):
+        easting = record.get("easting", record.get("Easting"))
+        northing = record.get("northing", record.get("Northing"))
+    else:
+        easting, northing = record[0], record[1]
+    return float(easting), float(northing)
+
+
+def read_points(lines):
+    """
+    Read (easting, northing) pairs from NDJSON lines or CSV rows. CSV input may have a header
+    naming Easting/Northing columns (any case); without one the first two columns are used.
+    """
+    lines = (line for line in lines if line.strip())
+    first_line = next(lines, None)
+    if first_line is None:
+        return []
+    lines = itertools.chain([first_line], lines)
+    if first_line.lstrip().startswith(("{", "[")):
+        return [parse_point(json.loads(line)) for line in lines]
+
+    reader = csv.reader(lines)
+    header = [name.strip().lower() for name in next(reader)]
+    if "easting" in header and "northing" in header:
+        easting_col, northing_col = header.index("easting"), header.index("northing")
+    else:
+        easting_col, northing_col = 0, 1
+        reader = itertools.chain([header], reader)
+    return [(float(row[easting_col]), float(row[northing_col])) for row in reader]
+
+
+def serve_request(request):
+    """Answer one decoded worker request (see serve)."""
+    if request.get("op") == "stats":
+        return {"cache": result_cache.stats() if result_cache is not None else None}
+    if request.get("op") == "metrics":
+        if request.get("format") == "prometheus":
+            return {"text": metrics.prometheus()}
+        return {"metrics": metrics.snapshot()}
+    if request.get("op") == "risk":
+        return lookup_risk(float(request["easting"]), float(request["northing"]))
+    with metrics.span("total"):
+        if "points" in request:
+            return {"results": handle_batch([parse_point(point) for point in request["points"]])}
+        if "text" in request:
+            return {"results": handle_batch(read_points(request["text"].splitlines()))}
+        return handle_request(float(request["easting"]), float(request["northing"]))
+
+
+def serve():
+    """
+    Resident worker mode: load the models once, then answer one JSON request per line
+    on stdin ({"id": ..., "easting": ..., "northing": ...}) with one JSON line on stdout.
+    Batch requests carry "points" (a list of objects or pairs) or "text" (CSV/NDJSON) instead
+    and are answered with {"id": ..., "results": [...]}. {"op": "stats"} returns the cache counters,
+    {"op": "metrics"} the stage timing histograms and {"op": "risk", "easting": ..., "northing": ...}
+    reads the precomputed risk grid. Any request with "timings": true also gets its stage timings (ms).
+    A worker whose models fail to load keeps serving: each request retries the load and reports the
+    failure in its response, so a broken model file doesn't make the server respawn workers in a loop.
+    """
+    try:
+        load_models()
+    except Exception as e:
+        sys.stderr.write(f"Could not load models: {e}\n")
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        request = {}
+        debug_logs.clear()
+        metrics.start_request()
+        try:
+            request = json.loads(line)
+            output = serve_request(request)
+        except Exception as e:
+            output = {"error": str(e), "debug": list(debug_logs)}
+        if isinstance(request, dict) and request.get("timings"):
+            output["timings"] = metrics.request_timings()
+        output["id"] = request.get("id") if isinstance(request, dict) else None
+        sys.stdout.write(json.dumps(output) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1] == "--serve":
+        serve()
+        sys.exit(0)
+
+    # Batch mode: python get_data.py --batch [points.csv|points.ndjson], one JSON result per line
+    if len(sys.argv) in (2, 3) and sys.argv[1] == "--batch":
+        if len(sys.argv) == 3:
+            with open(sys.argv[2]) as points_file:
+                batch_points = read_points(points_file)
+        else:
+            batch_points = read_points(sys.stdin)
+        for result in handle_batch(batch_points):
+            sys.stdout.write(json.dumps(result) + "\n")
+        sys.exit(0)
+
+    if len(sys.argv) != 3:
+        output = {"error": "Provide easting and northing as arguments", "debug": debug_logs}
+        print(json.dumps(output))
+        sys.exit(1)
+
+    try:
+        easting = float(sys.argv[1])
+        northing = float(sys.argv[2])
+        print(json.dumps(handle_request(easting, northing)))
     except Exception as e:
         print(json.dumps({"error": str(e), "debug": debug_logs}))
         sys.exit(1)
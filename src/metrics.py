@@ -0,0 +1,84 @@
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds (Prometheus convention; +Inf is implied)
+BUCKETS = [0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+
+class Metrics:
+    """
+    Per-stage timing spans. Every span adds its duration to the current request's timings (in ms,
+    summed when a stage runs more than once) and to a per-stage histogram kept for the life of the
+    process. Histograms can be read as a JSON snapshot or in the Prometheus text format, and with
+    `statsd_address` set each span is also sent as a StatsD timer.
+    """
+
+    def __init__(self, prefix="get_data", statsd_address=None):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.current = {}
+        self.histograms = {}
+        self.statsd_address = statsd_address
+        self.statsd_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM) if statsd_address else None
+
+    def start_request(self):
+        with self.lock:
+            self.current = {}
+
+    def request_timings(self):
+        with self.lock:
+            return {stage: round(ms, 3) for stage, ms in self.current.items()}
+
+    @contextmanager
+    def span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage, seconds):
+        with self.lock:
+            self.current[stage] = self.current.get(stage, 0.0) + seconds * 1000
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = {"counts": [0] * (len(BUCKETS) + 1), "sum": 0.0, "count": 0}
+            index = next((i for i, bound in enumerate(BUCKETS) if seconds <= bound), len(BUCKETS))
+            histogram["counts"][index] += 1
+            histogram["sum"] += seconds
+            histogram["count"] += 1
+        if self.statsd_socket is not None:
+            try:
+                self.statsd_socket.sendto(f"{self.prefix}.{stage}:{seconds * 1000:.3f}|ms".encode(), self.statsd_address)
+            except OSError:
+                pass
+
+    def snapshot(self):
+        """Histograms as JSON: bucket bounds plus per-stage (non-cumulative) bucket counts, sum and count."""
+        with self.lock:
+            return {
+                "buckets": BUCKETS,
+                "stages": {stage: {**histogram, "counts": list(histogram["counts"])} for stage, histogram in self.histograms.items()},
+            }
+
+    def prometheus(self):
+        """The histograms in the Prometheus text exposition format."""
+        name = f"{self.prefix}_stage_duration_seconds"
+        lines = [f"# HELP {name} Time spent in each stage of a lookup.", f"# TYPE {name} histogram"]
+        for stage, histogram in sorted(self.snapshot()["stages"].items()):
+            cumulative = 0
+            for bound, count in zip(BUCKETS + ["+Inf"], histogram["counts"]):
+                cumulative += count
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram["sum"]}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram["count"]}')
+        return "\n".join(lines) + "\n"
+
+
+def statsd_from_env():
+    """(host, port) from STATSD_HOST / STATSD_PORT, or None when StatsD export is off."""
+    host = os.environ.get("STATSD_HOST")
+    return (host, int(os.environ.get("STATSD_PORT", 8125))) if host else None
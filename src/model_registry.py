@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+import joblib
+import compiled_model
+
+# Layout: <registry>/<version>/ holds the artifacts and manifest.json; <registry>/CURRENT names the
+# version being served. Versions are never modified after publishing, and CURRENT is replaced
+# atomically, so a retrain can't change files a running worker is reading. A version is assembled
+# in a hidden .staging-* directory, manifest last, and renamed into place; versions() ignores those.
+CURRENT_POINTER = "CURRENT"
+MANIFEST = "manifest.json"
+
+# Artifact names inside a version. Pickles are plain (uncompressed) joblib dumps so they can be
+# memory-mapped; the compiled model is stored the same way rather than as .npz.
+PICKLES = {
+    "texture_encoder": "texture_encoder.pkl",
+    "hydrology_encoder": "hydrology_encoder.pkl",
+    "scaler": "scaler.pkl",
+    "classifier": "best_cluster_classifier.pkl",
+}
+COMPILED = "cluster_classifier.joblib"
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as artifact:
+        for block in iter(lambda: artifact.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_atomic(path, text):
+    temporary = f"{path}.tmp{os.getpid()}"
+    with open(temporary, "w") as output_file:
+        output_file.write(text)
+        output_file.flush()
+        os.fsync(output_file.fileno())
+    os.replace(temporary, path)
+
+
+def publish(registry_dir, models, metadata=None, make_current=True):
+    """
+    Store fitted models (a dict with the PICKLES keys) as a new version, plus the compiled artifact
+    when the classifier is a tree ensemble. Returns the version name.
+    """
+    os.makedirs(registry_dir, exist_ok=True)
+    staging = os.path.join(registry_dir, f".staging-{os.getpid()}-{time.time_ns()}")
+    os.makedirs(staging)
+    try:
+        for name, filename in PICKLES.items():
+            joblib.dump(models[name], os.path.join(staging, filename))
+        try:
+            arrays = compiled_model.compile_model(models["texture_encoder"], models["hydrology_encoder"], models["scaler"], models["classifier"])
+            joblib.dump(arrays, os.path.join(staging, COMPILED))
+        except ValueError:
+            pass
+
+        files = {
+            filename: {"sha256": file_hash(os.path.join(staging, filename)), "bytes": os.path.getsize(os.path.join(staging, filename))}
+            for filename in sorted(os.listdir(staging))
+        }
+        combined = hashlib.sha256("".join(entry["sha256"] for entry in files.values()).encode()).hexdigest()
+        version = time.strftime("v%Y%m%d-%H%M%S-") + combined[:8]
+        manifest = {"version": version, "created": time.strftime("%Y-%m-%dT%H:%M:%S"), "files": files, "metadata": metadata or {}}
+        write_atomic(os.path.join(staging, MANIFEST), json.dumps(manifest, indent=2))
+        os.rename(staging, os.path.join(registry_dir, version))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    if make_current:
+        set_current(registry_dir, version)
+    return version
+
+
+def set_current(registry_dir, version):
+    if not os.path.exists(os.path.join(registry_dir, version, MANIFEST)):
+        raise ValueError(f"Unknown model version {version}")
+    check(registry_dir, version)
+    write_atomic(os.path.join(registry_dir, CURRENT_POINTER), version + "\n")
+
+
+def current_version(registry_dir):
+    """The version CURRENT points to, or None when the registry is empty or missing."""
+    try:
+        with open(os.path.join(registry_dir, CURRENT_POINTER)) as pointer:
+            return pointer.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def versions(registry_dir):
+    if not os.path.isdir(registry_dir):
+        return []
+    return sorted(
+        name for name in os.listdir(registry_dir)
+        if not name.startswith(".") and os.path.exists(os.path.join(registry_dir, name, MANIFEST))
+    )
+
+
+def manifest(registry_dir, version):
+    with open(os.path.join(registry_dir, version, MANIFEST)) as manifest_file:
+        return json.load(manifest_file)
+
+
+def verify(registry_dir, version):
+    """Names of the artifacts whose hash no longer matches the manifest (empty when intact)."""
+    version_dir = os.path.join(registry_dir, version)
+    return [
+        filename for filename, entry in manifest(registry_dir, version)["files"].items()
+        if not os.path.exists(os.path.join(version_dir, filename)) or file_hash(os.path.join(version_dir, filename)) != entry["sha256"]
+    ]
+
+
+def check(registry_dir, version):
+    """Raise ValueError when any artifact of the version is missing or doesn't match the manifest."""
+    bad = verify(registry_dir, version)
+    if bad:
+        raise ValueError(f"Model version {version} does not match its manifest: {', '.join(bad)}")
+
+
+def load(registry_dir, version, prefer_compiled=True):
+    """
+    Load a version with memory-mapped arrays, so worker processes share one copy of the forest in
+    the page cache. Uses the sklearn-free compiled model when the version has one. The artifacts are
+    checked against the manifest first, so a truncated or half-copied version is refused.
+    """
+    check(registry_dir, version)
+    version_dir = os.path.join(registry_dir, version)
+    compiled_path = os.path.join(version_dir, COMPILED)
+    if prefer_compiled and os.path.exists(compiled_path):
+        return compiled_model.from_arrays(joblib.load(compiled_path, mmap_mode="r"))
+    return {name: joblib.load(os.path.join(version_dir, filename), mmap_mode="r") for name, filename in PICKLES.items()}
+
+
+if __name__ == "__main__":
+    # python src/model_registry.py list|use <version>|verify <version>|publish [models_dir] [registry_dir]
+    command = sys.argv[1] if len(sys.argv) > 1 else "list"
+    registry = os.environ.get("MODEL_REGISTRY_DIR", "./models/registry")
+    if command == "list":
+        active = current_version(registry)
+        for name in versions(registry):
+            print(f"{'*' if name == active else ' '} {name}  {json.dumps(manifest(registry, name)['metadata'])}")
+    elif command == "use":
+        set_current(registry, sys.argv[2])
+        print(f"Current model version: {sys.argv[2]}")
+    elif command == "verify":
+        bad = verify(registry, sys.argv[2])
+        print("All artifacts match the manifest" if not bad else f"Hash mismatch: {', '.join(bad)}")
+        sys.exit(1 if bad else 0)
+    elif command == "publish":
+        # Register the loose pickles (e.g. the ones committed in models/) as a version
+        models_dir = sys.argv[2] if len(sys.argv) > 2 else "./models"
+        registry = sys.argv[3] if len(sys.argv) > 3 else registry
+        loose = {name: joblib.load(os.path.join(models_dir, filename)) for name, filename in PICKLES.items()}
+        source = {filename: file_hash(os.path.join(models_dir, filename)) for filename in PICKLES.values()}
+        print(f"Published {publish(registry, loose, {'source': models_dir, 'source_sha256': source})}")
+    else:
+        print(f"Unknown command {command}")
+        sys.exit(1)
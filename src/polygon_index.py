@@ -0,0 +1,70 @@
+import os
+import numpy as np
+import pandas as pd
+import shapely
+from shapely import STRtree
+
+
+class PolygonLayer:
+    """
+    Polygons plus their attribute columns, stored as Parquet with WKB geometries and bbox columns.
+    The file is read and the STRtree bulk-loaded on first use, so opening a layer is free and a
+    process that never queries it never pays for it. Lookups mirror the database KNN query: the
+    polygon containing a point, or the nearest one when no polygon contains it.
+    """
+
+    def __init__(self, path, max_distance=None):
+        self.path = path
+        self.max_distance = max_distance
+        self._tree = None
+        self._attributes = None
+
+    @staticmethod
+    def save(path, geometries, attributes):
+        """Write geometries (shapely array) and an attribute DataFrame to a Parquet index file."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        bounds = shapely.bounds(geometries)
+        df = attributes.reset_index(drop=True).copy()
+        df["min_x"], df["min_y"], df["max_x"], df["max_y"] = bounds.T
+        df["geometry"] = shapely.to_wkb(geometries)
+        df.to_parquet(path, index=False)
+
+    def load(self):
+        """Read the index file and build the tree (done automatically by the first lookup)."""
+        if self._tree is None:
+            df = pd.read_parquet(self.path)
+            geometries = shapely.from_wkb(df.pop("geometry").values)
+            df = df.drop(columns=["min_x", "min_y", "max_x", "max_y"])
+            self._attributes = {column: df[column].to_numpy(dtype=object) for column in df.columns}
+            self._tree = STRtree(geometries)
+        return self
+
+    def match(self, easting, northing):
+        """Index of the polygon containing (or nearest to) each point; -1 when nothing is within max_distance."""
+        self.load()
+        points = shapely.points(np.atleast_1d(easting), np.atleast_1d(northing))
+        matches = np.full(len(points), -1, dtype=np.intp)
+
+        point_index, polygon_index = self._tree.query(points, predicate="intersects")
+        _, first = np.unique(point_index, return_index=True)
+        matches[point_index[first]] = polygon_index[first]
+
+        missing = np.flatnonzero(matches < 0)
+        if missing.size:
+            point_index, polygon_index = self._tree.query_nearest(points[missing], max_distance=self.max_distance, all_matches=False)
+            matches[missing[point_index]] = polygon_index
+        return matches
+
+    def lookup(self, easting, northing, columns):
+        """Values of the given attribute columns for each point, as a tuple per point (None where unmatched)."""
+        matches = self.match(easting, northing)
+        values = [self._attributes[column][np.maximum(matches, 0)] for column in columns]
+        return [None if index < 0 else row for index, row in zip(matches, zip(*values))]
+
+
+def load_layers(directory):
+    """Open every <name>.parquet index in directory, keyed by name (the files are read lazily)."""
+    if not os.path.isdir(directory):
+        return {}
+    names = sorted(file_name[:-8] for file_name in os.listdir(directory) if file_name.endswith(".parquet"))
+    return {name: PolygonLayer(os.path.join(directory, f"{name}.parquet")) for name in names}
@@ -0,0 +1,162 @@
+import json
+import os
+import numpy as np
+from pyproj import Transformer
+
+# Coordinate system of the points passed to lookup() (Irish Grid)
+QUERY_CRS = "EPSG:29903"
+
+
+class GridLayer:
+    """
+    A regular grid of one or more value bands with origin/resolution metadata. The values are stored
+    as a (bands, rows, cols) float32 array with NaN for no data; the origin is the centre of the top-left
+    cell and rows run southwards. Grids saved with save() are reopened memory-mapped by load(), so a point
+    lookup only touches the pages it reads.
+    """
+
+    def __init__(self, values, origin_x, origin_y, resolution, bands, crs=QUERY_CRS, attributes=None):
+        self.values = values
+        self.origin_x = float(origin_x)
+        self.origin_y = float(origin_y)
+        self.resolution = float(resolution)
+        self.bands = list(bands)
+        self.crs = crs
+        # Free-form metadata saved with the grid (e.g. the model version a risk grid was scored with)
+        self.attributes = dict(attributes or {})
+        self.to_grid = None if crs == QUERY_CRS else Transformer.from_crs(QUERY_CRS, crs, always_xy=True)
+        self.from_grid = None if crs == QUERY_CRS else Transformer.from_crs(crs, QUERY_CRS, always_xy=True)
+
+    @property
+    def shape(self):
+        return self.values.shape[1:]
+
+    @classmethod
+    def from_points(cls, x, y, band_values, resolution, crs=QUERY_CRS, max_fill_cells=0):
+        """
+        Build a grid from points that sit on a regular lattice in `crs` (e.g. the rows of a CSV export).
+        band_values maps each band name to its values. Empty cells within max_fill_cells of data take
+        the value of the nearest filled cell, so coastal lookups do not fall into no-data gaps.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        origin_x, origin_y = x.min(), y.max()
+        cols = np.rint((x - origin_x) / resolution).astype(np.intp)
+        rows = np.rint((origin_y - y) / resolution).astype(np.intp)
+
+        values = np.full((len(band_values), rows.max() + 1, cols.max() + 1), np.nan, dtype=np.float32)
+        for band_index, band in enumerate(band_values.values()):
+            values[band_index, rows, cols] = np.asarray(band, dtype=np.float32)
+
+        fill_gaps(values, max_fill_cells)
+        return cls(values, origin_x, origin_y, resolution, band_values.keys(), crs)
+
+    def save(self, directory, name):
+        """Write <name>.npy (values) and <name>.json (metadata) to directory."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, f"{name}.npy"), self.values)
+        metadata = {
+            "origin_x": self.origin_x,
+            "origin_y": self.origin_y,
+            "resolution": self.resolution,
+            "bands": self.bands,
+            "crs": self.crs,
+            "attributes": self.attributes,
+        }
+        with open(os.path.join(directory, f"{name}.json"), "w") as metadata_file:
+            json.dump(metadata, metadata_file, indent=2)
+
+    @classmethod
+    def load(cls, directory, name):
+        """Open a grid written by save(), memory-mapping the values."""
+        with open(os.path.join(directory, f"{name}.json")) as metadata_file:
+            metadata = json.load(metadata_file)
+        values = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        return cls(
+            values, metadata["origin_x"], metadata["origin_y"], metadata["resolution"], metadata["bands"], metadata["crs"],
+            metadata.get("attributes"),
+        )
+
+    def cell_position(self, easting, northing):
+        """Fractional (row, col) of Irish Grid coordinates, where whole numbers are cell centres."""
+        easting = np.atleast_1d(np.asarray(easting, dtype=np.float64))
+        northing = np.atleast_1d(np.asarray(northing, dtype=np.float64))
+        if self.to_grid is not None:
+            easting, northing = self.to_grid.transform(easting, northing)
+        return (self.origin_y - northing) / self.resolution, (easting - self.origin_x) / self.resolution
+
+    def nearest_cell(self, easting, northing):
+        """Integer (row, col) of the nearest cell and a mask of the points that fall inside the grid."""
+        rows, cols = self.cell_position(easting, northing)
+        rows = np.rint(rows).astype(np.intp)
+        cols = np.rint(cols).astype(np.intp)
+        inside = (rows >= 0) & (rows < self.shape[0]) & (cols >= 0) & (cols < self.shape[1])
+        return np.where(inside, rows, 0), np.where(inside, cols, 0), inside
+
+    def cell_centres(self, easting, northing):
+        """Irish Grid coordinates of the cell centre nearest to each point."""
+        rows, cols, _ = self.nearest_cell(easting, northing)
+        x = self.origin_x + cols * self.resolution
+        y = self.origin_y - rows * self.resolution
+        if self.from_grid is not None:
+            x, y = self.from_grid.transform(x, y)
+        return np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+
+    def lookup(self, easting, northing, interpolate=False):
+        """
+        Values of every band at the given Irish Grid coordinates (scalars or arrays), as a dict of
+        band -> 1-D float64 array. Points outside the grid or on no-data cells come back as NaN. With
+        interpolate=True values are bilinearly interpolated between the four surrounding cell centres,
+        falling back to the nearest cell where any of them has no data.
+        """
+        rows, cols, inside = self.nearest_cell(easting, northing)
+        nearest = self.values[:, rows, cols].astype(np.float64)
+        nearest[:, ~inside] = np.nan
+        if interpolate:
+            interpolated = self.bilinear(easting, northing)
+            nearest = np.where(np.isnan(interpolated), nearest, interpolated)
+        return dict(zip(self.bands, nearest))
+
+    def bilinear(self, easting, northing):
+        """Bilinear interpolation of every band; NaN where a surrounding cell is missing."""
+        rows, cols = self.cell_position(easting, northing)
+        row0 = np.floor(rows).astype(np.intp)
+        col0 = np.floor(cols).astype(np.intp)
+        row_weight = (rows - row0)[np.newaxis]
+        col_weight = (cols - col0)[np.newaxis]
+        inside = (row0 >= 0) & (row0 + 1 < self.shape[0]) & (col0 >= 0) & (col0 + 1 < self.shape[1])
+        row0 = np.where(inside, row0, 0)
+        col0 = np.where(inside, col0, 0)
+
+        top_left = self.values[:, row0, col0]
+        top_right = self.values[:, row0, col0 + 1]
+        bottom_left = self.values[:, row0 + 1, col0]
+        bottom_right = self.values[:, row0 + 1, col0 + 1]
+        result = (
+            top_left * (1 - row_weight) * (1 - col_weight)
+            + top_right * (1 - row_weight) * col_weight
+            + bottom_left * row_weight * (1 - col_weight)
+            + bottom_right * row_weight * col_weight
+        )
+        result[:, ~inside] = np.nan
+        return result
+
+
+def fill_gaps(values, max_fill_cells):
+    """In place: give no-data cells within max_fill_cells of data the values of the nearest filled cell."""
+    if max_fill_cells <= 0:
+        return values
+    from scipy import ndimage
+    missing = np.isnan(values[0])
+    distance, (nearest_rows, nearest_cols) = ndimage.distance_transform_edt(missing, return_indices=True)
+    fill = missing & (distance <= max_fill_cells)
+    values[:, fill] = values[:, nearest_rows[fill], nearest_cols[fill]]
+    return values
+
+
+def load_layers(directory):
+    """Load every grid (name.npy + name.json) found in directory, keyed by name."""
+    if not os.path.isdir(directory):
+        return {}
+    names = sorted(file_name[:-5] for file_name in os.listdir(directory) if file_name.endswith(".json"))
+    return {name: GridLayer.load(directory, name) for name in names if os.path.exists(os.path.join(directory, f"{name}.npy"))}
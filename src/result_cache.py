@@ -0,0 +1,133 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    LRU cache of JSON results keyed by the exact coordinates, or with `resolution` set, by coordinates
+    snapped to a grid of that many metres so nearby clicks share one entry. Snapping is an
+    approximation: the grid isn't aligned with the DEM pixels or the soil and hydrology polygons,
+    so two points with one key can lie in different cells or polygons, and the second is answered
+    with the first one's features. Entries expire after `ttl` seconds (None = never) and
+    the least recently used ones are evicted beyond `max_entries` or `max_bytes` of serialised JSON.
+    With `path` set, entries are also written to a SQLite file so they survive restarts and can be
+    shared between worker processes; expired rows are deleted from it on open and every
+    `purge_every` puts. Values are stored serialised, so callers always get a fresh copy.
+    Keys are prefixed with `namespace` (the model version), so results from another model never match.
+    """
+
+    def __init__(self, resolution=None, max_entries=10000, max_bytes=64 * 1024 * 1024, ttl=None, path=None, namespace="", purge_every=1000):
+        self.resolution = resolution
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self.puts_since_purge = 0
+        self.entries = OrderedDict()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.db = None
+        if path:
+            self.db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+            self.db.execute("PRAGMA journal_mode=WAL;")
+            self.db.execute("CREATE TABLE IF NOT EXISTS result_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL);")
+            self.db.execute("CREATE INDEX IF NOT EXISTS result_cache_created_idx ON result_cache (created);")
+            self._purge()
+            self.db.commit()
+
+    def key(self, easting, northing):
+        if not self.resolution:
+            return f"{self.namespace}:{float(easting)!r}:{float(northing)!r}"
+        return f"{self.namespace}:{round(float(easting) / self.resolution)}:{round(float(northing) / self.resolution)}"
+
+    def set_namespace(self, namespace):
+        """Switch to a new namespace, dropping every entry stored under another one."""
+        with self.lock:
+            if namespace == self.namespace:
+                return
+            self.namespace = namespace
+            self.entries.clear()
+            self.size_bytes = 0
+            if self.db is not None:
+                prefix = f"{namespace}:"
+                self.db.execute("DELETE FROM result_cache WHERE substr(key, 1, ?) != ?;", (len(prefix), prefix))
+                self.db.commit()
+
+    def expired(self, created):
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def get(self, easting, northing):
+        """The cached result for the cell containing the coordinate, or None."""
+        key = self.key(easting, northing)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.expired(entry[1]):
+                self._remove(key)
+                entry = None
+            if entry is None and self.db is not None:
+                entry = self._load(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return json.loads(entry[0])
+
+    def put(self, easting, northing, result):
+        """Store a result for the cell containing the coordinate."""
+        key = self.key(easting, northing)
+        value = json.dumps(result)
+        created = time.time()
+        with self.lock:
+            self._store(key, value, created)
+            if self.db is not None:
+                self.db.execute("INSERT OR REPLACE INTO result_cache (key, value, created) VALUES (?, ?, ?);", (key, value, created))
+                self.puts_since_purge += 1
+                if self.puts_since_purge >= self.purge_every:
+                    self._purge()
+                self.db.commit()
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "bytes": self.size_bytes,
+            }
+
+    def _purge(self):
+        """Delete the expired rows from the SQLite file (the caller commits)."""
+        self.puts_since_purge = 0
+        if self.ttl is not None:
+            self.db.execute("DELETE FROM result_cache WHERE created < ?;", (time.time() - self.ttl,))
+
+    def _load(self, key):
+        row = self.db.execute("SELECT value, created FROM result_cache WHERE key = ?;", (key,)).fetchone()
+        if row is None or self.expired(row[1]):
+            return None
+        self._store(key, row[0], row[1])
+        return row
+
+    def _store(self, key, value, created):
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (value, created)
+        self.size_bytes += len(value)
+        while self.entries and (len(self.entries) > self.max_entries or self.size_bytes > self.max_bytes):
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        value, _ = self.entries.pop(key)
+        self.size_bytes -= len(value)
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The modules under test are imported the way the scripts import them: src/ for the service and
+# tools/ for the offline scripts, both on the path
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+for directory in ("src", "tools"):
+    sys.path.insert(0, os.path.join(ROOT, directory))
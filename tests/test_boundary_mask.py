@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+import shapely
+
+import boundary_mask
+from boundary_mask import EDGE, BoundaryMask
+
+# Two provinces sharing the x = 1000 edge, with a notch cut out of the west one
+WEST = shapely.Polygon([(0, 0), (1000, 0), (1000, 1000), (0, 1000)]).difference(shapely.box(0, 0, 300, 300))
+EAST = shapely.box(1000, 0, 2000, 1000)
+
+
+def test_edge_cells_fall_back_to_polygons():
+    # 2x2 cells of 1000 m: the west cell is marked EDGE, the east one wholly inside province 1
+    states = np.array([[EDGE, 2], [0, 0]], dtype=np.uint8)
+    mask = BoundaryMask(states, 500, 500, 1000, ["West", "East"], [WEST, EAST])
+    assert mask.province(500, 500) == "West"
+    assert mask.province(100, 100) is None
+    assert mask.province(1500, 500) == "East"
+    # The raster alone answers OUTSIDE cells and points off the grid
+    assert mask.province(500, -500) is None
+    assert mask.province(-5000, 500) is None
+
+
+def test_states_answer_without_polygons():
+    # Cells wholly inside are trusted even though the polygons disagree
+    mask = BoundaryMask(np.array([[1]], dtype=np.uint8), 5000, 5000, 1000, ["West"], [WEST])
+    np.testing.assert_array_equal(mask.indices([5000, 5400], [5000, 5400]), [0, 0])
+
+
+@pytest.fixture(scope="module")
+def built():
+    pytest.importorskip("rasterio")
+    return BoundaryMask.build(["West", "East"], np.array([WEST, EAST], dtype=object), resolution=50)
+
+
+def test_build_agrees_with_polygons(built):
+    rng = np.random.default_rng(0)
+    easting, northing = rng.uniform(-200, 2200, 5000), rng.uniform(-200, 1200, 5000)
+    expected = np.where(shapely.contains_xy(WEST, easting, northing), 0, np.where(shapely.contains_xy(EAST, easting, northing), 1, -1))
+    np.testing.assert_array_equal(built.indices(easting, northing), expected)
+    assert (built.states == EDGE).any()
+    assert set(np.unique(built.states)) <= {0, 1, 2, EDGE}
+
+
+def test_save_and_load(built, tmp_path):
+    built.save(str(tmp_path), "boundary_mask")
+    loaded = boundary_mask.load(str(tmp_path))
+    np.testing.assert_array_equal(loaded.states, built.states)
+    assert loaded.names == ["West", "East"]
+    assert loaded.province(1500, 500) == "East"
+    assert boundary_mask.load(str(tmp_path / "missing")) is None
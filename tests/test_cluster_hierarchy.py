@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from sklearn.cluster import AgglomerativeClustering
+
+import cluster_hierarchy
+from cluster_hierarchy import WardHierarchy, select_k, stratified_sample
+
+
+@pytest.fixture(scope="module")
+def X():
+    rng = np.random.default_rng(0)
+    centres = rng.uniform(-10, 10, (5, 3))
+    return np.concatenate([centre + rng.normal(0, 1, (60, 3)) for centre in centres])
+
+
+@pytest.mark.parametrize("k", [1, 2, 3, 5, 8])
+def test_cut_matches_agglomerative_clustering(X, k):
+    expected = AgglomerativeClustering(n_clusters=k, linkage="ward").fit_predict(X)
+    np.testing.assert_array_equal(WardHierarchy(X).cut(k), expected)
+
+
+def test_cut_rejects_more_clusters_than_leaves(X):
+    with pytest.raises(ValueError):
+        WardHierarchy(X[:4]).cut(5)
+
+
+def test_large_inputs_label_points_by_subcluster(X, monkeypatch):
+    monkeypatch.setattr(cluster_hierarchy, "large_n_threshold", 100)
+    hierarchy = WardHierarchy(X)
+    assert hierarchy.birch is not None
+    labels = hierarchy.cut(5)
+    assert labels.shape == (len(X),)
+    # Points sharing a BIRCH subcluster always share a cluster
+    for leaf in np.unique(hierarchy.leaf_of_point):
+        assert len(np.unique(labels[hierarchy.leaf_of_point == leaf])) == 1
+
+
+def test_stratified_sample_keeps_every_cluster():
+    labels = np.array([0] * 990 + [1] * 8 + [2] * 2)
+    sample = stratified_sample(labels, 100, np.random.default_rng(0))
+    assert set(labels[sample]) == {0, 1, 2}
+    assert len(np.unique(sample)) == len(sample)
+    np.testing.assert_array_equal(stratified_sample(labels[:50], 100, np.random.default_rng(0)), np.arange(50))
+
+
+def test_select_k_finds_the_generated_clusters(X):
+    best_k, labels, scores = select_k(X, range(2, 8), n_jobs=1)
+    assert set(scores) == set(range(2, 8))
+    assert best_k == 5
+    np.testing.assert_array_equal(labels, WardHierarchy(X).cut(5))
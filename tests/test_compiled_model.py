@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+import compiled_model
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(0)
+    textures = rng.choice(["Clay", "Loam", "Sand"], 400)
+    hydrology = rng.choice(["Peat", "Poorly Drained", "Well Drained"], 400)
+    texture_encoder = LabelEncoder().fit(textures)
+    hydrology_encoder = LabelEncoder().fit(hydrology)
+    features = np.column_stack([
+        texture_encoder.transform(textures),
+        rng.uniform(0, 400, 400),
+        rng.uniform(800, 1800, 400),
+        hydrology_encoder.transform(hydrology),
+    ])
+    scaler = StandardScaler().fit(features)
+    X = scaler.transform(features)
+    y = (X[:, 1] + X[:, 3] + rng.normal(0, 0.5, 400) > 0).astype(int) + (X[:, 2] > 1)
+    return texture_encoder, hydrology_encoder, scaler, X, y
+
+
+@pytest.mark.parametrize("classifier", [
+    RandomForestClassifier(n_estimators=25, random_state=0),
+    DecisionTreeClassifier(max_depth=6, random_state=0),
+])
+def test_predictions_match_sklearn(fitted, classifier):
+    texture_encoder, hydrology_encoder, scaler, X, y = fitted
+    classifier.fit(X, y)
+    compiled = compiled_model.from_arrays(compiled_model.compile_model(texture_encoder, hydrology_encoder, scaler, classifier))
+
+    probe = np.random.default_rng(1).normal(size=(1000, X.shape[1]))
+    np.testing.assert_array_equal(compiled["classifier"].predict(probe), classifier.predict(probe))
+    np.testing.assert_allclose(compiled["classifier"].predict_proba(probe), classifier.predict_proba(probe))
+
+
+def test_encoders_and_scaler_match_sklearn(fitted):
+    texture_encoder, hydrology_encoder, scaler, X, y = fitted
+    classifier = DecisionTreeClassifier(max_depth=3, random_state=0).fit(X, y)
+    compiled = compiled_model.from_arrays(compiled_model.compile_model(texture_encoder, hydrology_encoder, scaler, classifier))
+
+    labels = ["Sand", "Clay", "Loam"]
+    np.testing.assert_array_equal(compiled["texture_encoder"].transform(labels), texture_encoder.transform(labels))
+    np.testing.assert_allclose(compiled["scaler"].transform(X[:10] * 3), scaler.transform(X[:10] * 3))
+    with pytest.raises(ValueError):
+        compiled["hydrology_encoder"].transform(["Unknown"])
+
+
+def test_save_and_load_round_trip(fitted, tmp_path):
+    texture_encoder, hydrology_encoder, scaler, X, y = fitted
+    classifier = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    path = str(tmp_path / "model.npz")
+    compiled_model.save_model(path, compiled_model.compile_model(texture_encoder, hydrology_encoder, scaler, classifier))
+
+    loaded = compiled_model.load_model(path)
+    np.testing.assert_array_equal(loaded["classifier"].predict(X), classifier.predict(X))
+
+
+def test_rejects_non_tree_classifier(fitted):
+    texture_encoder, hydrology_encoder, scaler, X, y = fitted
+    classifier = LogisticRegression().fit(X, y)
+    with pytest.raises(ValueError, match="Only tree classifiers"):
+        compiled_model.compile_model(texture_encoder, hydrology_encoder, scaler, classifier)
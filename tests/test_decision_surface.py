@@ -0,0 +1,39 @@
+import numpy as np
+
+from decision_surface import DecisionSurface, boundary_mask
+
+
+def surface(margin=1):
+    # 1 texture x 1 hydrology x 6 elevation bins x 4 rainfall bins; class 1 above elevation bin 3
+    cube = np.zeros((1, 1, 6, 4), dtype=np.uint8)
+    cube[:, :, 4:, :] = 1
+    return DecisionSurface(cube, 0, 50, 800, 250, ["Loam"], ["Peat"], np.array([2, 3]), margin, "v1")
+
+
+def test_boundary_mask_marks_cells_within_margin():
+    cube = surface().cube
+    np.testing.assert_array_equal(boundary_mask(cube, 1)[0, 0, :, 0], [False, False, False, True, True, False])
+    np.testing.assert_array_equal(boundary_mask(cube, 2)[0, 0, :, 0], [False, False, True, True, True, True])
+    assert not boundary_mask(cube, 0).any()
+
+
+def test_predict_flags_boundary_and_outside_rows():
+    predicted, exact = surface().predict([
+        [0, 25, 900, 0],     # elevation bin 0: class 2
+        [0, 275, 900, 0],    # bin 5: class 3
+        [0, 175, 900, 0],    # bin 3, next to the change
+        [0, 25, 5000, 0],    # rainfall beyond the cube
+    ])
+    np.testing.assert_array_equal(predicted, [2, 3, 2, 2])
+    np.testing.assert_array_equal(exact, [False, False, True, True])
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "surface.npz")
+    surface().save(path)
+    loaded = DecisionSurface.load(path, margin=2)
+    assert loaded.model_version == "v1"
+    assert loaded.texture_classes.tolist() == ["Loam"]
+    np.testing.assert_array_equal(loaded.cube, surface().cube)
+    np.testing.assert_allclose(loaded.elevation_centres(), [25, 75, 125, 175, 225, 275])
+    np.testing.assert_array_equal(loaded.boundary, boundary_mask(loaded.cube, 2))
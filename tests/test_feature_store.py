@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import feature_store
+
+
+def write_training_csv(path, elevation_offset=0.0):
+    pd.DataFrame({
+        "Texture": ["Loam", "Clay", "Loam", "Peat", "Sand"],
+        "Elevation": np.array([10.5, 120.25, 60.0, 5.0, 300.0]) + elevation_offset,
+        "Annual_Rainfall": [900.0, 1400.0, 1100.0, 1200.0, 1800.0],
+        "Hydrology_Category": ["Well Drained", "Poorly Drained", "Peat", "Water", "AlluvMIN"],
+        "Count": [1, 2, 3, 4, 5],
+    }).to_csv(path, index=False)
+
+
+def cached_files(tmp_path):
+    return sorted(os.listdir(tmp_path / feature_store.CACHE_DIR))
+
+
+def test_load_table_types_and_cache(tmp_path):
+    path = str(tmp_path / "training_data.csv")
+    write_training_csv(path)
+    df = feature_store.load_table(path)
+    assert df["Texture"].dtype == "category"
+    assert df["Elevation"].dtype == np.float32
+    assert df["Count"].dtype == np.int8
+    assert len(cached_files(tmp_path)) == 1
+
+    # Served from the cache, with a column projection
+    assert list(feature_store.load_table(path, columns=["Elevation"]).columns) == ["Elevation"]
+    assert len(cached_files(tmp_path)) == 1
+
+    full = feature_store.load_table(path, float_dtype=np.float64)
+    assert full["Elevation"].dtype == np.float64
+    assert full["Elevation"][1] == 120.25
+    assert len(cached_files(tmp_path)) == 2
+
+
+def test_edited_csv_replaces_its_cached_table(tmp_path):
+    path = str(tmp_path / "training_data.csv")
+    write_training_csv(path)
+    feature_store.load_table(path)
+    before = cached_files(tmp_path)
+    write_training_csv(path, elevation_offset=1.0)
+    assert feature_store.load_table(path)["Elevation"][0] == np.float32(11.5)
+    after = cached_files(tmp_path)
+    assert len(after) == 1 and after != before
+
+
+def test_cluster_features_match_clustering_definition(tmp_path):
+    path = str(tmp_path / "training_data.csv")
+    write_training_csv(path)
+    df = feature_store.cluster_features(path)
+
+    raw = pd.read_csv(path)
+    raw = raw[~raw["Hydrology_Category"].isin(feature_store.EXCLUDED_CATEGORIES)]
+    values = raw[feature_store.SCALED_COLUMNS].to_numpy()
+    scaled = (values - values.mean(axis=0)) / values.std(axis=0)
+    hydrology = raw["Hydrology_Category"].map(feature_store.MAPPING).to_numpy()
+
+    assert df["Hydrology_Category_Original"].tolist() == raw["Hydrology_Category"].tolist()
+    np.testing.assert_allclose(df["Flood_Risk_Index"], scaled[:, 1] - scaled[:, 0], rtol=1e-6)
+    np.testing.assert_allclose(df["Runoff_Index"], (3 - 2 * hydrology) - scaled[:, 0], rtol=1e-6)
+    np.testing.assert_array_equal(df["Raw_Hydrology"], 2 * hydrology)
@@ -0,0 +1,26 @@
+import numpy as np
+
+from incremental_clustering import merge_moments
+
+
+def empty():
+    return {"count": 0, "mean": [0.0, 0.0], "m2": [0.0, 0.0]}
+
+
+def test_merge_moments_matches_numpy_over_all_blocks():
+    rng = np.random.default_rng(0)
+    blocks = [rng.normal([100, 1200], [50, 300], (size, 2)) for size in (1, 7, 250, 3)]
+    running = empty()
+    for block in blocks:
+        running = merge_moments(running, block)
+
+    values = np.concatenate(blocks)
+    assert running["count"] == len(values)
+    np.testing.assert_allclose(running["mean"], values.mean(axis=0))
+    np.testing.assert_allclose(np.asarray(running["m2"]) / running["count"], values.var(axis=0))
+
+
+def test_merge_moments_ignores_empty_blocks():
+    running = merge_moments(empty(), np.array([[1.0, 2.0], [3.0, 6.0]]))
+    assert merge_moments(running, np.empty((0, 2))) == running
+    assert running == {"count": 2, "mean": [2.0, 4.0], "m2": [2.0, 8.0]}
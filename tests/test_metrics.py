@@ -0,0 +1,58 @@
+import socket
+
+import pytest
+
+import metrics
+from metrics import BUCKETS, Metrics
+
+
+def test_request_timings_sum_repeated_stages():
+    recorder = Metrics()
+    recorder.record("query", 0.002)
+    recorder.start_request()
+    recorder.record("query", 0.001)
+    recorder.record("query", 0.0005)
+    recorder.record("predict", 0.003)
+    assert recorder.request_timings() == {"query": 1.5, "predict": 3.0}
+
+
+def test_span_records_even_when_the_stage_raises():
+    recorder = Metrics()
+    with pytest.raises(RuntimeError):
+        with recorder.span("query"):
+            raise RuntimeError
+    assert recorder.snapshot()["stages"]["query"]["count"] == 1
+
+
+def test_histogram_buckets_and_prometheus_output():
+    recorder = Metrics(prefix="test")
+    for seconds in (0.0001, 0.0003, 0.0003, 20.0):
+        recorder.record("query", seconds)
+    histogram = recorder.snapshot()["stages"]["query"]
+    assert histogram["counts"][:3] == [1, 0, 2]
+    assert histogram["counts"][len(BUCKETS)] == 1
+    assert histogram["count"] == 4
+
+    lines = recorder.prometheus().splitlines()
+    assert 'test_stage_duration_seconds_bucket{stage="query",le="0.0005"} 3' in lines
+    assert 'test_stage_duration_seconds_bucket{stage="query",le="+Inf"} 4' in lines
+    assert 'test_stage_duration_seconds_count{stage="query"} 4' in lines
+
+
+def test_statsd_timer_is_sent():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(2)
+    try:
+        Metrics(prefix="test", statsd_address=receiver.getsockname()).record("query", 0.0125)
+        assert receiver.recv(100) == b"test.query:12.500|ms"
+    finally:
+        receiver.close()
+
+
+def test_statsd_from_env(monkeypatch):
+    monkeypatch.delenv("STATSD_HOST", raising=False)
+    assert metrics.statsd_from_env() is None
+    monkeypatch.setenv("STATSD_HOST", "localhost")
+    monkeypatch.setenv("STATSD_PORT", "9125")
+    assert metrics.statsd_from_env() == ("localhost", 9125)
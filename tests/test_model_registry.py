@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+import compiled_model
+import model_registry
+
+
+def fitted_models(classifier):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(100, 4))
+    y = (X[:, 0] > 0).astype(int)
+    return {
+        "texture_encoder": LabelEncoder().fit(["Clay", "Loam"]),
+        "hydrology_encoder": LabelEncoder().fit(["Peat", "Well Drained"]),
+        "scaler": StandardScaler().fit(X),
+        "classifier": classifier.fit(X, y),
+    }, X
+
+
+def test_publish_and_load(tmp_path):
+    registry = str(tmp_path)
+    models, X = fitted_models(RandomForestClassifier(n_estimators=5, random_state=0))
+    version = model_registry.publish(registry, models, {"note": "first"})
+
+    assert model_registry.versions(registry) == [version]
+    assert model_registry.current_version(registry) == version
+    assert model_registry.manifest(registry, version)["metadata"] == {"note": "first"}
+    assert model_registry.verify(registry, version) == []
+
+    loaded = model_registry.load(registry, version)
+    assert isinstance(loaded["classifier"], compiled_model.Forest)
+    np.testing.assert_array_equal(loaded["classifier"].predict(X), models["classifier"].predict(X))
+    pickled = model_registry.load(registry, version, prefer_compiled=False)
+    np.testing.assert_array_equal(pickled["classifier"].predict(X), models["classifier"].predict(X))
+
+
+def test_non_tree_classifier_is_stored_without_compiled_artifact(tmp_path):
+    registry = str(tmp_path)
+    models, X = fitted_models(LogisticRegression())
+    version = model_registry.publish(registry, models)
+    assert model_registry.COMPILED not in model_registry.manifest(registry, version)["files"]
+    np.testing.assert_array_equal(model_registry.load(registry, version)["classifier"].predict(X), models["classifier"].predict(X))
+
+
+def test_set_current(tmp_path):
+    registry = str(tmp_path)
+    assert model_registry.current_version(registry) is None
+    first = model_registry.publish(registry, fitted_models(RandomForestClassifier(n_estimators=2, random_state=0))[0])
+    second = model_registry.publish(registry, fitted_models(RandomForestClassifier(n_estimators=3, random_state=0))[0], make_current=False)
+
+    assert first != second
+    assert model_registry.current_version(registry) == first
+    model_registry.set_current(registry, second)
+    assert model_registry.current_version(registry) == second
+    with pytest.raises(ValueError, match="Unknown model version"):
+        model_registry.set_current(registry, "v-missing")
+
+
+def test_staging_directories_are_not_versions(tmp_path):
+    registry = str(tmp_path)
+    version = model_registry.publish(registry, fitted_models(RandomForestClassifier(n_estimators=2, random_state=0))[0])
+    staging = tmp_path / ".staging-1-1"
+    staging.mkdir()
+    (staging / model_registry.MANIFEST).write_text("{}")
+    assert model_registry.versions(registry) == [version]
+
+
+def test_modified_artifact_is_refused(tmp_path):
+    registry = str(tmp_path)
+    version = model_registry.publish(registry, fitted_models(RandomForestClassifier(n_estimators=2, random_state=0))[0], make_current=False)
+    artifact = os.path.join(registry, version, model_registry.PICKLES["scaler"])
+    with open(artifact, "r+b") as artifact_file:
+        artifact_file.truncate(os.path.getsize(artifact) // 2)
+
+    assert model_registry.verify(registry, version) == [model_registry.PICKLES["scaler"]]
+    with pytest.raises(ValueError, match="does not match its manifest"):
+        model_registry.load(registry, version)
+    with pytest.raises(ValueError, match="does not match its manifest"):
+        model_registry.set_current(registry, version)
+    assert model_registry.current_version(registry) is None
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import shapely
+
+import polygon_index
+from polygon_index import PolygonLayer
+
+
+def write_layer(path):
+    geometries = np.array([shapely.box(0, 0, 100, 100), shapely.box(100, 0, 200, 100), shapely.box(500, 0, 600, 100)])
+    attributes = pd.DataFrame({"CATEGORY": ["Peat", "Made", "Water"], "DEPTH": [1, 2, 3]})
+    PolygonLayer.save(path, geometries, attributes)
+
+
+def test_containing_polygon_then_nearest(tmp_path):
+    path = str(tmp_path / "soil_data.parquet")
+    write_layer(path)
+    layer = PolygonLayer(path)
+    assert layer.lookup([50, 150, 580], [50, 50, 50], ["CATEGORY"]) == [("Peat",), ("Made",), ("Water",)]
+    # Outside every polygon: the nearest one, as the database KNN query answers
+    assert layer.lookup(450, 50, ["CATEGORY", "DEPTH"]) == [("Water", 3)]
+    # On a shared edge the point matches one of the two touching polygons
+    assert layer.lookup(100, 50, ["CATEGORY"])[0] in [("Peat",), ("Made",)]
+
+
+def test_max_distance_leaves_far_points_unmatched(tmp_path):
+    path = str(tmp_path / "soil_data.parquet")
+    write_layer(path)
+    layer = PolygonLayer(path, max_distance=100)
+    np.testing.assert_array_equal(layer.match([250, 350, 50], [50, 50, 50]), [1, -1, 0])
+    assert layer.lookup(350, 50, ["CATEGORY"]) == [None]
+
+
+def test_load_layers_opens_lazily(tmp_path):
+    write_layer(str(tmp_path / "hydrology_data.parquet"))
+    layers = polygon_index.load_layers(str(tmp_path))
+    assert list(layers) == ["hydrology_data"]
+    assert layers["hydrology_data"]._tree is None
+    assert polygon_index.load_layers(str(tmp_path / "missing")) == {}
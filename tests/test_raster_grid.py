@@ -0,0 +1,64 @@
+import numpy as np
+
+import raster_grid
+from raster_grid import GridLayer
+
+
+def lattice(resolution=100):
+    # 4 x 3 lattice of points with the top-left centre at (1000, 5000); band value = 10 * row + col
+    cols, rows = np.meshgrid(np.arange(3), np.arange(4))
+    x = 1000 + cols.ravel() * resolution
+    y = 5000 - rows.ravel() * resolution
+    return x, y, (10 * rows + cols).ravel().astype(float)
+
+
+def test_from_points_and_nearest_lookup():
+    x, y, value = lattice()
+    grid = GridLayer.from_points(x, y, {"A": value, "B": -value}, 100)
+    assert grid.shape == (4, 3)
+    result = grid.lookup([1000, 1140, 1240, 900, 1000], [5000, 4790, 4710, 5000, 4300])
+    np.testing.assert_array_equal(result["A"], [0, 21, 32, np.nan, np.nan])
+    np.testing.assert_array_equal(result["B"], [0, -21, -32, np.nan, np.nan])
+
+
+def test_bilinear_interpolation_and_fallback():
+    x, y, value = lattice()
+    value[11] = np.nan
+    grid = GridLayer.from_points(x, y, {"A": value}, 100)
+    # Halfway between rows 0-1 and a quarter of the way from col 0 to col 1: 10 * 0.5 + 0.25
+    np.testing.assert_allclose(grid.lookup(1025, 4950, interpolate=True)["A"], [5.25])
+    # Next to the no-data cell the nearest value is used instead
+    np.testing.assert_array_equal(grid.lookup(1140, 4740, interpolate=True)["A"], [31])
+
+
+def test_fill_gaps_only_within_distance():
+    values = np.full((1, 1, 6), np.nan, dtype=np.float32)
+    values[0, 0, 0] = 7
+    raster_grid.fill_gaps(values, 2)
+    np.testing.assert_array_equal(values[0, 0], [7, 7, 7, np.nan, np.nan, np.nan])
+
+
+def test_save_load_round_trip(tmp_path):
+    x, y, value = lattice()
+    grid = GridLayer.from_points(x, y, {"A": value}, 100)
+    grid.attributes["model_version"] = "v1"
+    grid.save(str(tmp_path), "grid")
+    (tmp_path / "orphan.json").write_text("{}")
+
+    layers = raster_grid.load_layers(str(tmp_path))
+    assert list(layers) == ["grid"]
+    loaded = layers["grid"]
+    assert isinstance(loaded.values, np.memmap)
+    assert loaded.attributes == {"model_version": "v1"}
+    np.testing.assert_array_equal(loaded.lookup(x, y)["A"], value)
+    assert raster_grid.load_layers(str(tmp_path / "missing")) == {}
+
+
+def test_other_crs_is_transformed():
+    # A WGS84 lattice queried in Irish Grid: cell centres come back on the query's side
+    lon, lat = np.meshgrid(np.arange(-8, -7, 0.01), np.arange(53, 54, 0.01))
+    grid = GridLayer.from_points(lon.ravel(), lat.ravel(), {"Lon": lon.ravel()}, 0.01, crs="EPSG:4326")
+    easting, northing = raster_grid.Transformer.from_crs("EPSG:4326", raster_grid.QUERY_CRS, always_xy=True).transform(-7.5, 53.5)
+    np.testing.assert_allclose(grid.lookup(easting, northing)["Lon"], [-7.5], atol=1e-6)
+    centre_x, centre_y = grid.cell_centres(easting, northing)
+    np.testing.assert_allclose([centre_x[0], centre_y[0]], [easting, northing], atol=1)
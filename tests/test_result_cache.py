@@ -0,0 +1,100 @@
+import sqlite3
+
+from result_cache import ResultCache
+
+
+def test_exact_keys_by_default():
+    cache = ResultCache()
+    cache.put(100000.0, 200000.0, {"cluster": 1})
+    assert cache.get(100000, 200000) == {"cluster": 1}
+    assert cache.get(100000.4, 200000.0) is None
+
+
+def test_resolution_snaps_nearby_points():
+    cache = ResultCache(resolution=10)
+    cache.put(100001, 200002, {"cluster": 1})
+    assert cache.get(99998, 199999) == {"cluster": 1}
+    assert cache.get(100010, 200002) is None
+
+
+def test_results_are_copies():
+    cache = ResultCache()
+    result = {"cluster": 1}
+    cache.put(1, 2, result)
+    result["cluster"] = 2
+    cached = cache.get(1, 2)
+    cached["cluster"] = 3
+    assert cache.get(1, 2) == {"cluster": 1}
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = ResultCache(max_entries=2)
+    cache.put(1, 1, "a")
+    cache.put(2, 2, "b")
+    cache.get(1, 1)
+    cache.put(3, 3, "c")
+    assert cache.get(2, 2) is None
+    assert cache.get(1, 1) == "a"
+    assert cache.stats()["evictions"] == 1
+
+    cache = ResultCache(max_bytes=10)
+    cache.put(1, 1, "x" * 5)
+    cache.put(2, 2, "y" * 5)
+    assert cache.stats()["entries"] == 1
+    assert cache.get(2, 2) == "y" * 5
+
+
+def test_ttl_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("result_cache.time.time", lambda: now[0])
+    cache = ResultCache(ttl=60)
+    cache.put(1, 2, "value")
+    now[0] += 59
+    assert cache.get(1, 2) == "value"
+    now[0] += 2
+    assert cache.get(1, 2) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_sqlite_entries_survive_restart_and_expire(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("result_cache.time.time", lambda: now[0])
+    path = str(tmp_path / "cache.sqlite")
+    ResultCache(ttl=60, path=path).put(1, 2, "value")
+    assert ResultCache(ttl=60, path=path).get(1, 2) == "value"
+    now[0] += 61
+    assert ResultCache(ttl=60, path=path).get(1, 2) is None
+
+
+def rows(path):
+    with sqlite3.connect(path) as db:
+        return db.execute("SELECT count(*) FROM result_cache;").fetchone()[0]
+
+
+def test_expired_rows_purged_on_open_and_every_n_puts(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("result_cache.time.time", lambda: now[0])
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResultCache(ttl=60, path=path, purge_every=3)
+    cache.put(1, 1, "a")
+    cache.put(2, 2, "b")
+    now[0] += 61
+    cache.put(3, 3, "c")
+    assert rows(path) == 1
+
+    cache.put(4, 4, "d")
+    now[0] += 61
+    ResultCache(ttl=60, path=path)
+    assert rows(path) == 0
+
+
+def test_namespace_switch_drops_other_models_results(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResultCache(path=path, namespace="v1")
+    cache.put(1, 2, "old")
+    cache.set_namespace("v2")
+    assert cache.get(1, 2) is None
+    assert rows(path) == 0
+    cache.put(1, 2, "new")
+    assert ResultCache(path=path, namespace="v1").get(1, 2) is None
+    assert ResultCache(path=path, namespace="v2").get(1, 2) == "new"
@@ -1,56 +1,161 @@
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import rasterio
+from rasterio.windows import Window
 from pyproj import Transformer
-import csv
 
-# Input file and output CSV paths
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from raster_grid import GridLayer, fill_gaps  # noqa: E402
+
+# Input file and output paths
 input_path = 'data/45N015W_3S.ACE2'
+output_parquet_path = 'data/elevation_data.parquet'
 output_csv_path = 'valid_irish_coords_irish_grid.csv'
+grid_dir = 'data/grids'
+
+# "parquet" (columnar point export), "csv" (the original layout) or "grid" (the in-process
+# elevation grid used by get_data.py, written straight from the raster without reprojection)
+output_format = 'parquet'
+
+# Grid output: no-data cells within this many pixels of data are filled from the nearest pixel
+max_fill_cells = 3
+
+# Raster rows handled per window, and worker processes (1 = run in this process)
+window_rows = 512
+workers = os.cpu_count() or 1
 
 # Define Ireland's WGS84 bounds (longitude and latitude)
 LON_MIN, LON_MAX = -10.5, -5.5
-LAT_MIN, LAT_MAX = 51.4, 55.5  
+LAT_MIN, LAT_MAX = 51.4, 55.5
 
-# Define transformer (WGS84 -> Irish Grid EPSG:29903)
-transformer = Transformer.from_crs("EPSG:4326", "EPSG:29903", always_xy=True)
+# Elevation values marking no data in ACE2
+NODATA_VALUES = [-500, -32768]
 
-# Open raster file
-with rasterio.open(input_path) as src:
-    elevation_data = src.read(1)  # Elevation data
-    bounds = src.bounds
-    width = src.width
-    height = src.height
+COLUMNS = ['Lon', 'Lat', 'IrishGrid_Easting', 'IrishGrid_Northing', 'Elevation']
 
-    # Calculate resolution (assumes consistent resolution)
-    lon_resolution = (bounds.right - bounds.left) / width
-    lat_resolution = (bounds.top - bounds.bottom) / height
 
-    print(f"Raster bounds in WGS84: {bounds}")
-    print(f"Longitude resolution: {lon_resolution}, Latitude resolution: {lat_resolution}")
+def raster_grid_info(path):
+    """Raster origin (left, top), pixel size and the row/column window covering Ireland's bounds."""
+    with rasterio.open(path) as src:
+        bounds = src.bounds
+        lon_resolution = (bounds.right - bounds.left) / src.width
+        lat_resolution = (bounds.top - bounds.bottom) / src.height
+        # Same pixel positions as the per-pixel loop: lon = left + col * res, lat = top - row * res
+        col_start = max(int(np.ceil((LON_MIN - bounds.left) / lon_resolution)), 0)
+        col_stop = min(int(np.floor((LON_MAX - bounds.left) / lon_resolution)) + 1, src.width)
+        row_start = max(int(np.ceil((bounds.top - LAT_MAX) / lat_resolution)), 0)
+        row_stop = min(int(np.floor((bounds.top - LAT_MIN) / lat_resolution)) + 1, src.height)
+    return bounds, lon_resolution, lat_resolution, (row_start, row_stop, col_start, col_stop)
+
+
+def read_window(args):
+    """Read one block of rows and return the valid pixels as column arrays (lon, lat, easting, northing, elevation)."""
+    path, row_start, row_stop, col_start, col_stop = args
+    with rasterio.open(path) as src:
+        bounds = src.bounds
+        lon_resolution = (bounds.right - bounds.left) / src.width
+        lat_resolution = (bounds.top - bounds.bottom) / src.height
+        elevation = src.read(1, window=Window(col_start, row_start, col_stop - col_start, row_stop - row_start))
+
+    lon = bounds.left + np.arange(col_start, col_stop) * lon_resolution
+    lat = bounds.top - np.arange(row_start, row_stop) * lat_resolution
+    lon_grid, lat_grid = np.meshgrid(lon, lat)
+
+    # Vectorised version of the bounds and invalid-elevation checks
+    valid = (
+        (lon_grid >= LON_MIN) & (lon_grid <= LON_MAX)
+        & (lat_grid >= LAT_MIN) & (lat_grid <= LAT_MAX)
+        & ~np.isin(elevation, NODATA_VALUES)
+    )
+    lon_valid = lon_grid[valid]
+    lat_valid = lat_grid[valid]
+
+    # One pyproj call for the whole block (WGS84 -> Irish Grid EPSG:29903)
+    transformer = Transformer.from_crs("EPSG:4326", "EPSG:29903", always_xy=True)
+    easting, northing = transformer.transform(lon_valid, lat_valid)
+    return lon_valid, lat_valid, easting, northing, elevation[valid]
 
-    # Open CSV to save valid Irish coordinates
+
+def windows(path, window):
+    row_start, row_stop, col_start, col_stop = window
+    for start in range(row_start, row_stop, window_rows):
+        yield path, start, min(start + window_rows, row_stop), col_start, col_stop
+
+
+def export_points(path, window, write_block):
+    """Run read_window over every block (in a process pool when workers > 1) and pass each result to write_block."""
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for block in executor.map(read_window, windows(path, window)):
+                write_block(block)
+    else:
+        for block in map(read_window, windows(path, window)):
+            write_block(block)
+
+
+def export_parquet(path, window):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        def write_block(block):
+            nonlocal writer
+            table = pa.Table.from_arrays([pa.array(values) for values in block], names=COLUMNS)
+            if writer is None:
+                writer = pq.ParquetWriter(output_parquet_path, table.schema)
+            writer.write_table(table)
+        export_points(path, window, write_block)
+    finally:
+        if writer is not None:
+            writer.close()
+    return output_parquet_path
+
+
+def export_csv(path, window):
     with open(output_csv_path, 'w', newline='') as csvfile:
-        csv_writer = csv.writer(csvfile)
-        csv_writer.writerow(['Lon', 'Lat', 'IrishGrid_Easting', 'IrishGrid_Northing', 'Elevation'])
+        csvfile.write(','.join(COLUMNS) + '\n')
+
+        def write_block(block):
+            np.savetxt(csvfile, np.column_stack(block), delimiter=',', fmt=['%.10f', '%.10f', '%.6f', '%.6f', '%g'])
+        export_points(path, window, write_block)
+    return output_csv_path
 
-        for row in range(elevation_data.shape[0]):
-            for col in range(elevation_data.shape[1]):
-                # Calculate longitude and latitude
-                lon = bounds.left + col * lon_resolution
-                lat = bounds.top - row * lat_resolution
 
-                # Skip points outside Ireland's longitude and latitude bounds
-                if not (LON_MIN <= lon <= LON_MAX and LAT_MIN <= lat <= LAT_MAX):
-                    continue
+def export_grid(path, window):
+    """Write the Ireland window as a GridLayer (NaN for no data) in its native WGS84 lattice."""
+    bounds, lon_resolution, lat_resolution, _ = raster_grid_info(path)
+    row_start, row_stop, col_start, col_stop = window
+    with rasterio.open(path) as src:
+        elevation = src.read(1, window=Window(col_start, row_start, col_stop - col_start, row_stop - row_start))
+    if not np.isclose(lon_resolution, lat_resolution):
+        raise ValueError(f"Grid output needs square pixels, got {lon_resolution} x {lat_resolution}")
+    values = elevation.astype(np.float32)
+    values[np.isin(elevation, NODATA_VALUES)] = np.nan
+    values = fill_gaps(values[np.newaxis], max_fill_cells)
+    grid = GridLayer(
+        values,
+        bounds.left + col_start * lon_resolution,
+        bounds.top - row_start * lat_resolution,
+        lon_resolution,
+        ['Elevation'],
+        crs='EPSG:4326',
+    )
+    grid.save(grid_dir, 'elevation_data')
+    return os.path.join(grid_dir, 'elevation_data.npy')
 
-                # Transform to Irish Grid
-                irish_grid_easting, irish_grid_northing = transformer.transform(lon, lat)
-                elevation = elevation_data[row, col]
 
-                # Skip invalid elevation values
-                if elevation in [-500, -32768]:
-                    continue
+if __name__ == "__main__":
+    start_time = time.time()
+    bounds, lon_resolution, lat_resolution, window = raster_grid_info(input_path)
+    print(f"Raster bounds in WGS84: {bounds}")
+    print(f"Longitude resolution: {lon_resolution}, Latitude resolution: {lat_resolution}")
+    print(f"Ireland window rows {window[0]}-{window[1]}, cols {window[2]}-{window[3]}")
 
-                # Write valid Irish points to the CSV
-                csv_writer.writerow([lon, lat, irish_grid_easting, irish_grid_northing, elevation])
+    exporters = {'parquet': export_parquet, 'csv': export_csv, 'grid': export_grid}
+    output_path = exporters[output_format](input_path, window)
 
-print(f"Valid Irish coordinates written to {output_csv_path}")
+    print(f"Valid Irish coordinates written to {output_path} in {time.time() - start_time:.1f}s")
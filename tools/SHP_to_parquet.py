@@ -0,0 +1,87 @@
+import json
+import os
+import time
+import pyarrow as pa
+import pyarrow.parquet as pq
+import shapely
+from pyogrio import read_info
+from pyogrio.raw import open_arrow
+from pyproj import CRS
+
+# Shapefiles and the attributes kept from each (the rest are never read)
+layers = {
+    "hydrology_data": ("data/NationalSoilsHydrologyMap/NationalSoilsHydrologyMap.shp", ["CATEGORY", "ParMat_Des", "SoilDraina"]),
+    "soil_data": ("data/NationalSoilsMap/NationalSoilsMap.shp", ["Texture_Su", "TEXTURE", "DEPTH", "PlainEngli"]),
+}
+
+# Output: data/<name>.parquet, readable by build_polygon_index.py, trim_*.py and load_database.py
+output_dir = "data"
+
+# Features read and written per chunk; peak memory is bounded by one chunk
+batch_size = 50000
+
+BBOX_COLUMNS = ["min_x", "min_y", "max_x", "max_y"]
+
+# GeoParquet geometry_types for the shapefile's layer type: a shapefile polygon layer holds both
+# polygons and multipolygons, so each maps to the single and multi part types
+SHAPEFILE_TYPES = {
+    "Point": ["Point", "MultiPoint"],
+    "LineString": ["LineString", "MultiLineString"],
+    "Polygon": ["Polygon", "MultiPolygon"],
+    "MultiPoint": ["MultiPoint"],
+}
+
+
+def geo_metadata(crs, geometry_types, bbox):
+    """GeoParquet 1.0 file metadata for a WKB 'geometry' column."""
+    column = {"encoding": "WKB", "geometry_types": sorted(geometry_types), "bbox": bbox}
+    if crs:
+        column["crs"] = CRS.from_user_input(crs).to_json_dict()
+    return {"version": "1.0.0", "primary_column": "geometry", "columns": {"geometry": column}}
+
+
+def convert(shapefile, columns, output_path):
+    """Stream the shapefile into GeoParquet chunk by chunk; returns the number of features written."""
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    temporary_path = output_path + ".tmp"
+    writer = None
+    rows = 0
+
+    # The geo metadata goes in the schema, which the writer needs before the first chunk, so the
+    # bbox and geometry types come from the shapefile header rather than from the features
+    info = read_info(shapefile, force_total_bounds=True)
+    bbox = [float(value) for value in info["total_bounds"]]
+    geo = geo_metadata(info["crs"], SHAPEFILE_TYPES.get(info["geometry_type"], []), bbox)
+    with open_arrow(shapefile, columns=columns, batch_size=batch_size, use_pyarrow=True) as (meta, reader):
+        geometry_name = meta["geometry_name"] or "wkb_geometry"
+        for batch in reader:
+            geometries = shapely.from_wkb(batch.column(geometry_name).to_numpy(zero_copy_only=False))
+            valid = ~shapely.is_missing(geometries)
+            bounds = shapely.bounds(geometries[valid])
+            arrays = [batch.column(name).filter(pa.array(valid)) for name in columns]
+            arrays += [pa.array(bounds[:, i]) for i in range(4)]
+            arrays.append(pa.array(shapely.to_wkb(geometries[valid]), type=pa.binary()))
+            table = pa.Table.from_arrays(arrays, names=columns + BBOX_COLUMNS + ["geometry"])
+
+            if writer is None:
+                schema = table.schema.with_metadata({"geo": json.dumps(geo)})
+                writer = pq.ParquetWriter(temporary_path, schema, compression="zstd")
+            writer.write_table(table)
+            rows += len(table)
+    if writer is None:
+        raise ValueError(f"No features read from {shapefile}")
+    writer.close()
+    os.replace(temporary_path, output_path)
+    return rows
+
+
+if __name__ == "__main__":
+    for name, (shapefile, columns) in layers.items():
+        if not os.path.exists(shapefile):
+            print(f"{name}: {shapefile} not found, skipped")
+            continue
+        start = time.time()
+        output_path = os.path.join(output_dir, f"{name}.parquet")
+        rows = convert(shapefile, columns, output_path)
+        elapsed = time.time() - start
+        print(f"{name}: {rows} features written to {output_path} in {elapsed:.1f}s ({rows / elapsed:.0f} features/s)")
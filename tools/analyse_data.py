@@ -1,121 +1,167 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.metrics import silhouette_score, silhouette_samples, davies_bouldin_score, calinski_harabasz_score, pairwise_distances
+from scipy.spatial import ConvexHull, QhullError, cKDTree
+from sklearn.cluster import KMeans
+from sklearn.metrics import silhouette_score, silhouette_samples, davies_bouldin_score, calinski_harabasz_score, pairwise_distances_chunked
+from feature_store import load_table
 import warnings
 warnings.filterwarnings("ignore")
 
+# Memory (MB) for each block of pairwise distances, so peak memory stays fixed as n grows
+working_memory = 256
+
+# Process pool size for the gap statistic reference fits
+gap_workers = os.cpu_count() or 1
+
+
+def cluster_diameter(points):
+    """
+    Largest pairwise distance in a cluster: only convex hull vertices can be its endpoints. The
+    clusters are usually flat (Raw_Hydrology is constant within one), so the hull is taken in the
+    subspace the points actually span, which leaves every pairwise distance unchanged.
+    """
+    centred = points - points.mean(axis=0)
+    _, singular_values, directions = np.linalg.svd(centred, full_matrices=False)
+    rank = int(np.sum(singular_values > singular_values[0] * 1e-9)) if singular_values[0] > 0 else 0
+    if rank == 0:
+        return 0.0
+    projected = centred @ directions[:rank].T
+    if rank == 1:
+        return float(np.ptp(projected))
+    if len(points) > rank + 1:
+        try:
+            points = points[ConvexHull(projected).vertices]
+        except QhullError:
+            pass  # degenerate cluster: fall back to all points
+    return max(np.max(block) for block in pairwise_distances_chunked(points, working_memory=working_memory))
+
+
 def dunn_index(X, labels):
     unique_labels = np.unique(labels)
     intra_dists = []
     for label in unique_labels:
         cluster_points = X[labels == label]
         if len(cluster_points) > 1:
-            dists = pairwise_distances(cluster_points)
-            intra_dists.append(np.max(dists))
+            intra_dists.append(cluster_diameter(cluster_points))
     if len(intra_dists) == 0:
         return np.nan
     max_intra = np.max(intra_dists)
-    
+
+    # Closest pair between two clusters: nearest-neighbour query of one cluster against a KD-tree of the other
+    trees = {label: cKDTree(X[labels == label]) for label in unique_labels}
     inter_dists = []
     for i in range(len(unique_labels)):
         for j in range(i+1, len(unique_labels)):
             points_i = X[labels == unique_labels[i]]
-            points_j = X[labels == unique_labels[j]]
-            dists = pairwise_distances(points_i, points_j)
+            dists, _ = trees[unique_labels[j]].query(points_i, k=1)
             inter_dists.append(np.min(dists))
     if len(inter_dists) == 0:
         return np.nan
     min_inter = np.min(inter_dists)
-    
+
     return min_inter / max_intra
 
-def gap_statistic(X, labels, nrefs=10):
-    from sklearn.cluster import KMeans
-    def compute_wk(X, labels):
-        unique_labels = np.unique(labels)
-        Wk = 0
-        for label in unique_labels:
-            cluster_points = X[labels == label]
-            if len(cluster_points) > 1:
-                dists = pairwise_distances(cluster_points)
-                Wk += np.sum(dists) / (2 * len(cluster_points))
-        return Wk
 
+def compute_wk(X, labels):
+    """Sum over clusters of all pairwise distances / (2 * cluster size), accumulated block by block."""
+    unique_labels = np.unique(labels)
+    Wk = 0
+    for label in unique_labels:
+        cluster_points = X[labels == label]
+        if len(cluster_points) > 1:
+            total = sum(np.sum(block) for block in pairwise_distances_chunked(cluster_points, working_memory=working_memory))
+            Wk += total / (2 * len(cluster_points))
+    return Wk
+
+
+def reference_wk(args):
+    """Wk of KMeans fitted to one uniform reference dataset over the bounding box of the data."""
+    mins, maxs, shape, k, seed = args
+    X_ref = np.random.default_rng(seed).uniform(mins, maxs, shape)
+    km = KMeans(n_clusters=k, random_state=42, n_init=10)
+    ref_labels = km.fit_predict(X_ref)
+    return compute_wk(X_ref, ref_labels)
+
+
+def gap_statistic(X, labels, nrefs=10, seed=None):
     shape = X.shape
     mins = np.min(X, axis=0)
     maxs = np.max(X, axis=0)
     Wks = compute_wk(X, labels)
-    Wkrefs = np.zeros(nrefs)
-    
-    for i in range(nrefs):
-        X_ref = np.random.uniform(mins, maxs, shape)
-        k = len(np.unique(labels))
-        km = KMeans(n_clusters=k, random_state=42, n_init=10)
-        ref_labels = km.fit_predict(X_ref)
-        Wkrefs[i] = compute_wk(X_ref, ref_labels)
-    
+    k = len(np.unique(labels))
+
+    seeds = np.random.SeedSequence(seed).spawn(nrefs)
+    with ProcessPoolExecutor(max_workers=min(gap_workers, nrefs)) as executor:
+        Wkrefs = np.array(list(executor.map(reference_wk, [(mins, maxs, shape, k, s) for s in seeds])))
+
     gap = np.mean(np.log(Wkrefs)) - np.log(Wks)
     return gap
 
-df = pd.read_csv("../data/training_data_with_clusters.csv")
-print("Columns in the dataset:")
-print(df.columns.tolist())
-
-eval_features = ["Flood_Risk_Index", "Runoff_Index", "Raw_Hydrology"]
-for col in eval_features:
-    df[col] = pd.to_numeric(df[col], errors="coerce")
-
-X = df[eval_features].values
-
-cluster_method = "Cluster" 
-if cluster_method in df.columns:
-    print(f"\n=== Descriptive Statistics for {cluster_method} ===")
-    cluster_summary = df.groupby(cluster_method)[eval_features].mean()
-    print("Mean values per cluster:")
-    print(cluster_summary)
-    
-    cluster_median = df.groupby(cluster_method)[eval_features].median()
-    print("\nMedian values per cluster:")
-    print(cluster_median)
-    
-    for cluster, group in df.groupby(cluster_method):
-        print(f"\n{cluster_method} - Cluster {cluster} Raw_Hydrology distribution:")
-        print(group["Raw_Hydrology"].value_counts())
-else:
-    print(f"Column '{cluster_method}' not found in the data.")
-
-if cluster_method in df.columns:
-    labels = df[cluster_method].values
-    try:
-        sil_score = silhouette_score(X, labels)
-        db_index = davies_bouldin_score(X, labels)
-        ch_index = calinski_harabasz_score(X, labels)
-        dunn = dunn_index(X, labels)
-        gap = gap_statistic(X, labels, nrefs=10)
-        print(f"\nEvaluation for {cluster_method}:")
-        print("Overall Silhouette Score:", sil_score)
-        print("Davies–Bouldin Index:", db_index)
-        print("Calinski–Harabasz Index:", ch_index)
-        print("Dunn Index:", dunn)
-        print("Gap Statistic:", gap)
-    except Exception as e:
-        print(f"Error computing metrics for {cluster_method}: {e}")
-    
-    sample_silhouette_values = silhouette_samples(X, labels)
-    df[f"Silhouette_{cluster_method}"] = sample_silhouette_values
-    
-    plt.figure(figsize=(8, 6))
-    sns.boxplot(x=cluster_method, y=f"Silhouette_{cluster_method}", data=df, palette="viridis")
-    plt.title(f"Silhouette Score Distribution per Cluster for {cluster_method}")
-    plt.xlabel("Cluster")
-    plt.ylabel("Silhouette Score")
-    plt.show()
-else:
-    print(f"Skipping evaluation for '{cluster_method}' as it is not in the data.")
-
-if cluster_method in df.columns:
-    sns.pairplot(df, vars=eval_features, hue=cluster_method, palette="viridis", diag_kind="kde")
-    plt.suptitle(f"Pairplot of Composite Features Colored by {cluster_method}", y=1.02)
-    plt.show()
+
+if __name__ == "__main__":
+    # The gap statistic uses a process pool, so the analysis only runs as a script
+    # Full precision: the metrics are computed on these values and compared with earlier runs
+    df = load_table("../data/training_data_with_clusters.csv", float_dtype=np.float64)
+    print("Columns in the dataset:")
+    print(df.columns.tolist())
+
+    eval_features = ["Flood_Risk_Index", "Runoff_Index", "Raw_Hydrology"]
+    for col in eval_features:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    X = df[eval_features].to_numpy(dtype=np.float64)
+
+    cluster_method = "Cluster" 
+    if cluster_method in df.columns:
+        print(f"\n=== Descriptive Statistics for {cluster_method} ===")
+        cluster_summary = df.groupby(cluster_method)[eval_features].mean()
+        print("Mean values per cluster:")
+        print(cluster_summary)
+
+        cluster_median = df.groupby(cluster_method)[eval_features].median()
+        print("\nMedian values per cluster:")
+        print(cluster_median)
+
+        for cluster, group in df.groupby(cluster_method):
+            print(f"\n{cluster_method} - Cluster {cluster} Raw_Hydrology distribution:")
+            print(group["Raw_Hydrology"].value_counts())
+    else:
+        print(f"Column '{cluster_method}' not found in the data.")
+
+    if cluster_method in df.columns:
+        labels = df[cluster_method].values
+        try:
+            sil_score = silhouette_score(X, labels)
+            db_index = davies_bouldin_score(X, labels)
+            ch_index = calinski_harabasz_score(X, labels)
+            dunn = dunn_index(X, labels)
+            gap = gap_statistic(X, labels, nrefs=10)
+            print(f"\nEvaluation for {cluster_method}:")
+            print("Overall Silhouette Score:", sil_score)
+            print("Davies–Bouldin Index:", db_index)
+            print("Calinski–Harabasz Index:", ch_index)
+            print("Dunn Index:", dunn)
+            print("Gap Statistic:", gap)
+        except Exception as e:
+            print(f"Error computing metrics for {cluster_method}: {e}")
+
+        sample_silhouette_values = silhouette_samples(X, labels)
+        df[f"Silhouette_{cluster_method}"] = sample_silhouette_values
+
+        plt.figure(figsize=(8, 6))
+        sns.boxplot(x=cluster_method, y=f"Silhouette_{cluster_method}", data=df, palette="viridis")
+        plt.title(f"Silhouette Score Distribution per Cluster for {cluster_method}")
+        plt.xlabel("Cluster")
+        plt.ylabel("Silhouette Score")
+        plt.show()
+    else:
+        print(f"Skipping evaluation for '{cluster_method}' as it is not in the data.")
+
+    if cluster_method in df.columns:
+        sns.pairplot(df, vars=eval_features, hue=cluster_method, palette="viridis", diag_kind="kde")
+        plt.suptitle(f"Pairplot of Composite Features Colored by {cluster_method}", y=1.02)
+        plt.show()
@@ -0,0 +1,213 @@
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+# Benchmarks measure the lookup path itself, so the response cache stays off unless asked for
+os.environ.setdefault("RESULT_CACHE_SIZE", "0")
+
+# Every layer and the boundary check go to the seeded fixture database, not to whatever grids,
+# polygon indexes or province mask the checkout has built (set these variables to benchmark them)
+local_data_dir = tempfile.mkdtemp(prefix="benchmark-empty-")
+for variable in ("GRID_DIR", "POLYGON_DIR", "BOUNDARY_MASK_DIR"):
+    os.environ.setdefault(variable, local_data_dir)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import get_data  # noqa: E402
+import benchmark_fixture  # noqa: E402
+
+# Usage:
+#   python tools/benchmark.py run [output.json]          time every stage against the fixture database
+#   python tools/benchmark.py compare old.json new.json  report changes, exit 1 on a regression
+# Seed the fixture first with tools/benchmark_fixture.py. Run from the repository root.
+
+# Timed repetitions per stage (after warmup runs) and the batch sizes for the batch path
+repeats = 50
+warmup = 5
+batch_sizes = [1, 10, 100, 1000]
+batch_repeats = 5
+
+# compare: a stage regresses when its median is this much slower than the baseline
+regression_threshold = 0.2
+
+output_path = "benchmark_results.json"
+
+
+def summarise(timings):
+    timings_ms = np.array(timings) * 1000
+    return {
+        "runs": len(timings_ms),
+        "min_ms": float(timings_ms.min()),
+        "median_ms": float(np.median(timings_ms)),
+        "mean_ms": float(timings_ms.mean()),
+        "p90_ms": float(np.percentile(timings_ms, 90)),
+        "max_ms": float(timings_ms.max()),
+    }
+
+
+def time_stage(function, arguments, runs=repeats):
+    """Time function(*args) for each args tuple in turn (cycling through them), after warmup calls."""
+    for args in arguments[:warmup]:
+        function(*args)
+    timings = []
+    for index in range(runs):
+        args = arguments[index % len(arguments)]
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return summarise(timings)
+
+
+def bench_points(count, rng):
+    """Reproducible coordinates inside the fixture area."""
+    eastings = rng.uniform(benchmark_fixture.EASTING_MIN, benchmark_fixture.EASTING_MAX, count)
+    northings = rng.uniform(benchmark_fixture.NORTHING_MIN, benchmark_fixture.NORTHING_MAX, count)
+    return list(zip(eastings.round().tolist(), northings.round().tolist()))
+
+
+def database_available():
+    try:
+        with get_data.pooled_connection() as conn, conn.cursor() as cursor:
+            cursor.execute("SELECT 1;")
+        return True
+    except Exception as e:
+        print(f"Fixture database unavailable, skipping database stages: {e}")
+        return False
+
+
+def load_models_cold():
+    get_data.models.clear()
+    get_data.load_models()
+
+
+def feature_rows(points):
+    """Classifiable (texture, elevation, annual_rainfall, hydrology) rows for the model stages."""
+    loaded = get_data.load_models()
+    rng = np.random.default_rng(1)
+    count = len(points)
+    return (
+        rng.choice(loaded["texture_encoder"].classes_, count).tolist(),
+        rng.uniform(0, 400, count),
+        rng.uniform(800, 1800, count),
+        rng.choice(loaded["hydrology_encoder"].classes_, count).tolist(),
+    )
+
+
+def encode_and_scale(textures, elevations, rainfalls, hydrology):
+    loaded = get_data.load_models()
+    features = np.column_stack([
+        loaded["texture_encoder"].transform(textures),
+        elevations,
+        rainfalls,
+        loaded["hydrology_encoder"].transform(hydrology),
+    ])
+    return loaded["scaler"].transform(features)
+
+
+def model_stages(points, size):
+    textures, elevations, rainfalls, hydrology = feature_rows(points)
+    chunks = [
+        (textures[start:start + size], elevations[start:start + size], rainfalls[start:start + size], hydrology[start:start + size])
+        for start in range(0, len(points) - size + 1, size)
+    ]
+    scaled = [(encode_and_scale(*chunk),) for chunk in chunks]
+    classifier = get_data.load_models()["classifier"]
+    runs = repeats if size == 1 else batch_repeats
+    return {
+        f"encode_scale[{size}]": time_stage(encode_and_scale, chunks, runs),
+        f"classifier_predict[{size}]": time_stage(classifier.predict, scaled, runs),
+    }
+
+
+def database_stages(points):
+    results = {"is_within_boundary": time_stage(get_data.is_within_boundary, points)}
+    for table_name in get_data.LAYER_TEMPLATES:
+        key = f"query_database[{table_name}{'' if table_name in get_data.DB_LAYERS else ', local'}]"
+        results[key] = time_stage(lambda e, n, table_name=table_name: get_data.query_database(table_name, e, n), points)
+    results["query_combined"] = time_stage(get_data.query_combined, points)
+    results["handle_request"] = time_stage(get_data.handle_request, points)
+    for size in batch_sizes:
+        chunks = [(points[start:start + size],) for start in range(0, len(points) - size + 1, size)]
+        results[f"get_batch_data[{size}]"] = time_stage(get_data.get_batch_data, chunks, batch_repeats)
+        results[f"handle_batch[{size}]"] = time_stage(get_data.handle_batch, chunks, batch_repeats)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(path):
+    get_data.DB_CONFIG["dbname"] = benchmark_fixture.FIXTURE_DB
+    rng = np.random.default_rng(0)
+    points = bench_points(max(batch_sizes) * (batch_repeats + 1), rng)
+
+    stages = {"load_models": time_stage(load_models_cold, [()], 10)}
+    for size in batch_sizes:
+        stages.update(model_stages(points, size))
+    if database_available():
+        stages.update(database_stages(points))
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "config": {
+            "database": benchmark_fixture.FIXTURE_DB,
+            "combined_query": get_data.USE_COMBINED_QUERY,
+            "concurrent_fetch": get_data.USE_CONCURRENT_FETCH,
+            "local_layers": get_data.LOCAL_LAYERS,
+            "grid_layers": sorted(get_data.grid_layers),
+            "polygon_layers": sorted(get_data.polygon_layers),
+            "province_mask": get_data.province_mask is not None,
+            "grid_interpolate": get_data.GRID_INTERPOLATE,
+            "compiled_model": os.path.exists(get_data.COMPILED_MODEL_PATH),
+            "decision_surface": get_data.USE_DECISION_SURFACE,
+            "result_cache": get_data.result_cache is not None,
+        },
+        "stages": stages,
+    }
+    with open(path, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+    for name, stats in stages.items():
+        print(f"{name:45s} median {stats['median_ms']:9.3f} ms   p90 {stats['p90_ms']:9.3f} ms")
+    print(f"Results written to {path}")
+
+
+def compare(baseline_path, current_path):
+    """Print the median change of every stage present in both files; True when nothing regressed."""
+    with open(baseline_path) as baseline_file, open(current_path) as current_file:
+        baseline, current = json.load(baseline_file), json.load(current_file)
+    print(f"Baseline {baseline.get('commit')} -> current {current.get('commit')}")
+    regressed = []
+    for name, stats in current["stages"].items():
+        if name not in baseline["stages"]:
+            continue
+        before, after = baseline["stages"][name]["median_ms"], stats["median_ms"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > regression_threshold:
+            regressed.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:45s} {before:9.3f} -> {after:9.3f} ms ({change:+.1%}){flag}")
+    if regressed:
+        print(f"{len(regressed)} stage(s) slower by more than {regression_threshold:.0%}: {', '.join(regressed)}")
+    return not regressed
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 2 and sys.argv[1] == "run":
+        run(sys.argv[2] if len(sys.argv) > 2 else output_path)
+    elif len(sys.argv) == 4 and sys.argv[1] == "compare":
+        sys.exit(0 if compare(sys.argv[2], sys.argv[3]) else 1)
+    else:
+        print("Usage: python tools/benchmark.py run [output.json] | compare baseline.json current.json")
+        sys.exit(1)
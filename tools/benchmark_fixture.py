@@ -0,0 +1,163 @@
+import os
+import sys
+import numpy as np
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+from pyproj import Transformer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from get_data import DB_CONFIG  # noqa: E402
+import provision_indexes  # noqa: E402
+
+# Database created for the benchmarks (the production tables are never touched)
+FIXTURE_DB = "soil_data_bench"
+
+# Synthetic area (Irish Grid, a 5 km square in the midlands) and its cell sizes in metres. The
+# elevation points are the DEM pixels in the area (about 5,000), so their raster_row and raster_col
+# keys are the ones the elevation lookups compute.
+EASTING_MIN, EASTING_MAX = 200000, 205000
+NORTHING_MIN, NORTHING_MAX = 200000, 205000
+polygon_cell = 250
+rainfall_cell = 1000
+
+TEXTURES = ["Fine loamy", "Coarse loamy", "Loamy", "Clayey", "Sandy", "Peat", "Urban"]
+HYDROLOGY = ["Well Drained", "Poorly Drained", "Peat", "AlluvMIN", "Water"]
+
+SCHEMA = [
+    "CREATE EXTENSION IF NOT EXISTS postgis;",
+    "DROP TABLE IF EXISTS provinces___gen_20m_2019, soil_data, hydrology_data, rainfall_data, elevation_data, elevation_grid;",
+    "CREATE TABLE provinces___gen_20m_2019 (PROVINCE text, SHAPE geometry(MultiPolygon, 2157));",
+    """
+    CREATE TABLE soil_data (
+        "Texture_Su" text, "TEXTURE" text, "DEPTH" text, "PlainEngli" text, geometry geometry(Geometry, 29903)
+    );
+    """,
+    """
+    CREATE TABLE hydrology_data (
+        "CATEGORY" text, "ParMat_Des" text, "SoilDraina" text, geometry geometry(Geometry, 29903)
+    );
+    """,
+    """
+    CREATE TABLE rainfall_data (
+        easting double precision, northing double precision,
+        ann double precision, djf double precision, mam double precision, jja double precision, son double precision
+    );
+    """,
+    "CREATE TABLE elevation_data (easting double precision, northing double precision, elevation double precision);",
+]
+
+
+def cell_origins(cell):
+    eastings, northings = np.meshgrid(np.arange(EASTING_MIN, EASTING_MAX, cell), np.arange(NORTHING_MIN, NORTHING_MAX, cell))
+    return eastings.ravel(), northings.ravel()
+
+
+def dem_pixels(dem_grid):
+    """Irish Grid positions of the DEM pixels inside the area, placed as DEM_to_csv.py exports them."""
+    origin_lon, origin_lat, resolution = dem_grid
+    to_wgs84 = Transformer.from_crs("EPSG:29903", "EPSG:4326", always_xy=True)
+    to_irish_grid = Transformer.from_crs("EPSG:4326", "EPSG:29903", always_xy=True)
+
+    # Longitude/latitude range of the area, from a grid of points over it (its edges are curved in WGS84)
+    edge_e, edge_n = np.meshgrid(np.linspace(EASTING_MIN, EASTING_MAX, 21), np.linspace(NORTHING_MIN, NORTHING_MAX, 21))
+    lon, lat = to_wgs84.transform(edge_e.ravel(), edge_n.ravel())
+    cols = np.arange(np.floor((lon.min() - origin_lon) / resolution), np.ceil((lon.max() - origin_lon) / resolution) + 1)
+    rows = np.arange(np.floor((origin_lat - lat.max()) / resolution), np.ceil((origin_lat - lat.min()) / resolution) + 1)
+
+    # Same pixel positions as DEM_to_csv.py: lon = left + col * res, lat = top - row * res
+    lon, lat = np.meshgrid(origin_lon + cols * resolution, origin_lat - rows * resolution)
+    eastings, northings = to_irish_grid.transform(lon.ravel(), lat.ravel())
+    inside = (eastings >= EASTING_MIN) & (eastings < EASTING_MAX) & (northings >= NORTHING_MIN) & (northings < NORTHING_MAX)
+    return eastings[inside], northings[inside]
+
+
+def smooth_field(eastings, northings, low, high):
+    """Deterministic, spatially smooth values between low and high."""
+    x = (eastings - EASTING_MIN) / (EASTING_MAX - EASTING_MIN)
+    y = (northings - NORTHING_MIN) / (NORTHING_MAX - NORTHING_MIN)
+    wave = (np.sin(6 * x) * np.cos(4 * y) + 1) / 2
+    return low + (high - low) * wave
+
+
+def create_database():
+    conn = psycopg2.connect(**{**DB_CONFIG, "dbname": "postgres"})
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_database WHERE datname = %s;", (FIXTURE_DB,))
+            if cursor.fetchone() is None:
+                cursor.execute(sql.SQL("CREATE DATABASE {};").format(sql.Identifier(FIXTURE_DB)))
+    finally:
+        conn.close()
+
+
+def seed(cursor, rng, dem_grid):
+    # Four provinces splitting the area into quadrants
+    middle_e, middle_n = (EASTING_MIN + EASTING_MAX) / 2, (NORTHING_MIN + NORTHING_MAX) / 2
+    quadrants = [
+        ("Leinster", middle_e, middle_n, EASTING_MAX, NORTHING_MAX),
+        ("Connacht", EASTING_MIN, middle_n, middle_e, NORTHING_MAX),
+        ("Munster", EASTING_MIN, NORTHING_MIN, middle_e, middle_n),
+        ("Ulster", middle_e, NORTHING_MIN, EASTING_MAX, middle_n),
+    ]
+    execute_values(
+        cursor,
+        "INSERT INTO provinces___gen_20m_2019 (PROVINCE, SHAPE) VALUES %s;",
+        quadrants,
+        template="(%s, ST_Multi(ST_Transform(ST_MakeEnvelope(%s, %s, %s, %s, 29903), 2157)))",
+    )
+
+    eastings, northings = cell_origins(polygon_cell)
+    envelopes = [(e, n, e + polygon_cell, n + polygon_cell) for e, n in zip(eastings.tolist(), northings.tolist())]
+    textures = rng.choice(TEXTURES, len(envelopes), p=[0.3, 0.2, 0.2, 0.1, 0.05, 0.1, 0.05]).tolist()
+    execute_values(
+        cursor,
+        'INSERT INTO soil_data ("Texture_Su", "TEXTURE", "DEPTH", "PlainEngli", geometry) VALUES %s;',
+        [(texture, texture, "Deep", f"Synthetic {texture.lower()} soil", *envelope) for texture, envelope in zip(textures, envelopes)],
+        template="(%s, %s, %s, %s, ST_MakeEnvelope(%s, %s, %s, %s, 29903))",
+    )
+    categories = rng.choice(HYDROLOGY, len(envelopes), p=[0.4, 0.3, 0.15, 0.1, 0.05]).tolist()
+    execute_values(
+        cursor,
+        'INSERT INTO hydrology_data ("CATEGORY", "ParMat_Des", "SoilDraina", geometry) VALUES %s;',
+        [(category, "Synthetic parent material", category, *envelope) for category, envelope in zip(categories, envelopes)],
+        template="(%s, %s, %s, ST_MakeEnvelope(%s, %s, %s, %s, 29903))",
+    )
+
+    eastings, northings = cell_origins(rainfall_cell)
+    annual = smooth_field(eastings, northings, 800, 1800)
+    execute_values(
+        cursor,
+        "INSERT INTO rainfall_data (easting, northing, ann, djf, mam, jja, son) VALUES %s;",
+        np.column_stack([eastings, northings, annual, annual * 0.3, annual * 0.2, annual * 0.2, annual * 0.3]).tolist(),
+    )
+
+    eastings, northings = dem_pixels(dem_grid)
+    execute_values(
+        cursor,
+        "INSERT INTO elevation_data (easting, northing, elevation) VALUES %s;",
+        np.column_stack([eastings, northings, smooth_field(eastings, northings, 0, 400)]).tolist(),
+        page_size=10000,
+    )
+
+
+if __name__ == "__main__":
+    create_database()
+    conn = psycopg2.connect(**{**DB_CONFIG, "dbname": FIXTURE_DB})
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            for statement in SCHEMA:
+                cursor.execute(statement)
+            dem_grid = provision_indexes.dem_grid()
+            seed(cursor, np.random.default_rng(42), dem_grid)
+            # Same indexes and grid keys as production
+            provision_indexes.run_steps(cursor, provision_indexes.POLYGON_STEPS)
+            provision_indexes.run_steps(cursor, provision_indexes.RAINFALL_STEPS)
+            provision_indexes.run_steps(cursor, provision_indexes.ELEVATION_STEPS, dem_grid)
+            for table in ("soil_data", "hydrology_data", "rainfall_data", "elevation_data", "provinces___gen_20m_2019"):
+                cursor.execute(f"ANALYZE {table};")
+    finally:
+        conn.close()
+    print(f"Benchmark fixture seeded in database {FIXTURE_DB}")
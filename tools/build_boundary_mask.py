@@ -0,0 +1,28 @@
+import os
+import sys
+import time
+import shapely
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import get_data  # noqa: E402
+from boundary_mask import BoundaryMask  # noqa: E402
+
+# Output directory read by get_data.py (BOUNDARY_MASK_DIR)
+mask_dir = "data/boundary"
+
+# Cell size in metres; only points in cells crossed by a boundary are tested against the polygons
+resolution = 50
+
+start = time.time()
+with get_data.pooled_connection() as conn, conn.cursor() as cursor:
+    # Provinces in Irish Grid, the coordinate system of the points get_data.py is given
+    cursor.execute("SELECT PROVINCE, ST_AsBinary(ST_Transform(SHAPE, 29903)) FROM provinces___gen_20m_2019 ORDER BY PROVINCE;")
+    rows = cursor.fetchall()
+names = [name for name, _ in rows]
+geometries = shapely.from_wkb([bytes(wkb) for _, wkb in rows])
+
+mask = BoundaryMask.build(names, geometries, resolution)
+mask.save(mask_dir, "boundary_mask")
+edge_share = (mask.states == 255).mean()
+print(f"Boundary mask {mask.states.shape} at {resolution} m written to {mask_dir} in {time.time() - start:.1f}s "
+      f"({edge_share:.2%} of cells need a polygon test)")
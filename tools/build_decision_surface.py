@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import get_data  # noqa: E402
+from decision_surface import DecisionSurface  # noqa: E402
+
+# Output read by get_data.py (DECISION_SURFACE_PATH, enabled with USE_DECISION_SURFACE=1)
+output_path = "models/decision_surface.npz"
+
+# Bin ranges cover the raw values get_data.py passes to the classifier (metres and mm/year);
+# anything outside them falls back to the exact model
+elevation_min, elevation_max, elevation_step = -10, 1050, 2
+rainfall_min, rainfall_max, rainfall_step = 600, 3400, 5
+
+# Rows per classifier call while filling the cube
+chunk_size = 50000
+
+# Labelled points for the disagreement report. The clustered CSV holds standardised elevation and
+# rainfall, so the raw values get_data.py would see are taken from training_data.csv (same points).
+clustered_csv = "data/training_data_with_clusters.csv"
+raw_csv = "data/training_data.csv"
+report_margins = [0, 1, 2]
+
+
+def exact_predict(features):
+    loaded = get_data.load_models()
+    return np.concatenate([
+        loaded["classifier"].predict(loaded["scaler"].transform(features[start:start + chunk_size]))
+        for start in range(0, len(features), chunk_size)
+    ])
+
+
+def build_surface():
+    loaded = get_data.load_models()
+    texture_classes = loaded["texture_encoder"].classes_
+    hydrology_classes = loaded["hydrology_encoder"].classes_
+    classes = loaded["classifier"].classes_
+    elevations = np.arange(elevation_min, elevation_max, elevation_step) + elevation_step / 2
+    rainfalls = np.arange(rainfall_min, rainfall_max, rainfall_step) + rainfall_step / 2
+
+    cube = np.empty((len(texture_classes), len(hydrology_classes), len(elevations), len(rainfalls)), dtype=np.uint8)
+    elevation_grid, rainfall_grid = np.meshgrid(elevations, rainfalls, indexing="ij")
+    for texture in range(len(texture_classes)):
+        for hydrology in range(len(hydrology_classes)):
+            features = np.column_stack([
+                np.full(elevation_grid.size, texture),
+                elevation_grid.ravel(),
+                rainfall_grid.ravel(),
+                np.full(elevation_grid.size, hydrology),
+            ])
+            predicted = exact_predict(features)
+            cube[texture, hydrology] = np.searchsorted(classes, predicted).reshape(elevation_grid.shape)
+        print(f"Evaluated texture {texture_classes[texture]}")
+    return DecisionSurface(
+        cube, elevation_min, elevation_step, rainfall_min, rainfall_step, texture_classes, hydrology_classes, classes,
+        model_version=get_data.model_state["fingerprint"],
+    )
+
+
+def report_features():
+    """Encoded (texture, elevation, annual_rainfall, hydrology) rows for the labelled points, in raw units."""
+    clustered = pd.read_csv(clustered_csv, usecols=["Easting", "Northing", "Texture", "Hydrology_Category"])
+    raw = pd.read_csv(raw_csv, usecols=["Easting", "Northing", "Elevation", "Annual_Rainfall"])
+    df = clustered.merge(raw, on=["Easting", "Northing"])
+    loaded = get_data.load_models()
+    return np.column_stack([
+        loaded["texture_encoder"].transform(df["Texture"].tolist()),
+        df["Elevation"],
+        df["Annual_Rainfall"],
+        loaded["hydrology_encoder"].transform(df["Hydrology_Category"].tolist()),
+    ])
+
+
+def report(surface):
+    features = report_features()
+    expected = exact_predict(features)
+    print(f"Disagreement with the exact model on {len(features)} points from {clustered_csv}:")
+    for margin in report_margins:
+        margin_surface = DecisionSurface(
+            surface.cube, elevation_min, elevation_step, rainfall_min, rainfall_step,
+            surface.texture_classes, surface.hydrology_classes, surface.classes, margin,
+        )
+        predicted, exact = margin_surface.predict(features)
+        predicted[exact] = expected[exact]
+        print(
+            f"  margin {margin}: {np.mean(predicted != expected):.4%} disagree, "
+            f"{np.mean(exact):.2%} fall back to the exact model"
+        )
+
+
+if __name__ == "__main__":
+    start_time = time.time()
+    surface = build_surface()
+    surface.save(output_path)
+    print(f"Decision surface {surface.cube.shape} written to {output_path} in {time.time() - start_time:.0f}s")
+    report(surface)
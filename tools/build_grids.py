@@ -0,0 +1,63 @@
+import os
+import sys
+import pandas as pd
+import pyarrow.parquet as pq
+from pyproj import Transformer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from raster_grid import GridLayer  # noqa: E402
+
+# Output directory read by get_data.py (GRID_DIR)
+grid_dir = "data/grids"
+
+# Elevation: the DEM_to_csv.py point export (Parquet by default, else a CSV), on the ACE2
+# 3 arc-second lattice in WGS84. The first file that exists is used.
+elevation_paths = ["data/elevation_data.parquet", "data/elevation_data.csv"]
+elevation_resolution = 3 / 3600
+
+# Rainfall: Met Éireann 1 km grid in Irish Grid
+rainfall_csv = "data/rainfall_data.csv"
+rainfall_resolution = 1000
+rainfall_bands = ["ANN", "DJF", "MAM", "JJA", "SON"]
+
+
+def read_columns(path, columns):
+    """
+    Read the requested columns from a CSV or Parquet file, matching column names case-insensitively.
+    A column given as a tuple of alternative names is read from the first one present and returned
+    under the first name.
+    """
+    parquet = path.endswith(".parquet")
+    header = pq.read_schema(path).names if parquet else pd.read_csv(path, nrows=0).columns
+    lookup = {name.lower(): name for name in header}
+    renames = {}
+    for column in columns:
+        names = column if isinstance(column, tuple) else (column,)
+        source = next((lookup[name.lower()] for name in names if name.lower() in lookup), None)
+        if source is None:
+            raise ValueError(f"Missing column {' or '.join(names)} in {path}")
+        renames[source] = names[0]
+    df = pd.read_parquet(path, columns=list(renames)) if parquet else pd.read_csv(path, usecols=list(renames))
+    return df.rename(columns=renames)
+
+
+elevation_path = next((path for path in elevation_paths if os.path.exists(path)), elevation_paths[-1])
+elevation_df = read_columns(elevation_path, [("Easting", "IrishGrid_Easting"), ("Northing", "IrishGrid_Northing"), "Elevation"])
+to_wgs84 = Transformer.from_crs("EPSG:29903", "EPSG:4326", always_xy=True)
+lon, lat = to_wgs84.transform(elevation_df["Easting"].values, elevation_df["Northing"].values)
+elevation_grid = GridLayer.from_points(
+    lon, lat, {"Elevation": elevation_df["Elevation"].values}, elevation_resolution, crs="EPSG:4326", max_fill_cells=3
+)
+elevation_grid.save(grid_dir, "elevation_data")
+print(f"Elevation grid {elevation_grid.shape} written to {grid_dir}/elevation_data.npy")
+
+rainfall_df = read_columns(rainfall_csv, ["Easting", "Northing"] + rainfall_bands)
+rainfall_grid = GridLayer.from_points(
+    rainfall_df["Easting"].values,
+    rainfall_df["Northing"].values,
+    {band: rainfall_df[band].values for band in rainfall_bands},
+    rainfall_resolution,
+    max_fill_cells=2,
+)
+rainfall_grid.save(grid_dir, "rainfall_data")
+print(f"Rainfall grid {rainfall_grid.shape} written to {grid_dir}/rainfall_data.npy")
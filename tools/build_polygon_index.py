@@ -0,0 +1,35 @@
+import os
+import sys
+import time
+import pandas as pd
+import pyarrow.parquet as pq
+import shapely
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from polygon_index import PolygonLayer  # noqa: E402
+
+# Output directory read by get_data.py (POLYGON_DIR)
+index_dir = "data/index"
+
+# Sources and the attributes kept for each layer. The GeoParquet written by SHP_to_parquet.py is
+# used when present (already WKB with bbox columns, so it is only projected); else the WKT CSV.
+layers = {
+    "soil_data": ("data/soil_data.parquet", "data/soil_data.csv", ["Texture_Su", "TEXTURE", "DEPTH", "PlainEngli"]),
+    "hydrology_data": ("data/hydrology_data.parquet", "data/hydrology_data.csv", ["CATEGORY", "ParMat_Des", "SoilDraina"]),
+}
+
+for name, (parquet_path, csv_path, columns) in layers.items():
+    start = time.time()
+    output_path = os.path.join(index_dir, f"{name}.parquet")
+    if os.path.exists(parquet_path):
+        table = pq.read_table(parquet_path, columns=columns + ["min_x", "min_y", "max_x", "max_y", "geometry"])
+        os.makedirs(index_dir, exist_ok=True)
+        pq.write_table(table, output_path)
+        print(f"{name}: {table.num_rows} polygons written to {output_path} in {time.time() - start:.1f}s")
+        continue
+    df = pd.read_csv(csv_path, usecols=columns + ["geometry"])
+    # Parse all WKT in one vectorised call rather than .apply(wkt.loads)
+    geometries = shapely.from_wkt(df.pop("geometry").values)
+    valid = ~shapely.is_missing(geometries)
+    PolygonLayer.save(output_path, geometries[valid], df[valid])
+    print(f"{name}: {valid.sum()} polygons written to {output_path} in {time.time() - start:.1f}s")
@@ -0,0 +1,130 @@
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgba
+from pyproj import Transformer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import get_data  # noqa: E402
+from raster_grid import GridLayer  # noqa: E402
+
+# Grid extent (Irish Grid, same bounds as training_dataset.py) and cell size in metres
+EASTING_MIN = 13098
+EASTING_MAX = 367154
+NORTHING_MIN = 11478
+NORTHING_MAX = 462251
+resolution = 250
+
+# Grid rows scored per task, and worker processes (each runs get_data's batch lookup + inference)
+chunk_rows = 40
+workers = os.cpu_count() or 1
+
+# Outputs: the risk grid served by get_data.py (RISK_GRID_DIR) and the map overlay for the frontend
+risk_grid_dir = "data/risk"
+overlay_png = "frontend/frontend/public/images/risk_overlay.png"
+overlay_json = "frontend/frontend/public/images/risk_overlay.json"
+overlay_width = 2000
+
+# Same colours as clusterColors in Map.js
+cluster_colors = {0: "#49006a", 1: "#2b8cbe", 2: "#41ae76", 3: "#ffff33"}
+
+BANDS = ["Cluster", "Elevation", "Annual_Rainfall", "Texture", "Hydrology_Category"]
+
+
+def grid_shape():
+    rows = int((NORTHING_MAX - NORTHING_MIN) // resolution) + 1
+    cols = int((EASTING_MAX - EASTING_MIN) // resolution) + 1
+    return rows, cols
+
+
+def score_rows(row_range):
+    """
+    Score grid rows [start, stop) with the batch lookup and classifier. Returns a (bands, rows, cols)
+    float32 block: the predicted cluster and its inputs, with texture and hydrology stored as their
+    label encoder codes and NaN wherever there is no prediction.
+    """
+    start, stop = row_range
+    _, cols = grid_shape()
+    eastings = EASTING_MIN + np.arange(cols) * resolution
+    northings = NORTHING_MAX - np.arange(start, stop) * resolution
+    easting_grid, northing_grid = np.meshgrid(eastings, northings)
+    points = list(zip(easting_grid.ravel().tolist(), northing_grid.ravel().tolist()))
+
+    results = get_data.predict_clusters(get_data.get_batch_data(points))
+    models = get_data.load_models()
+    texture_codes = {name: code for code, name in enumerate(models["texture_encoder"].classes_)}
+    hydrology_codes = {name: code for code, name in enumerate(models["hydrology_encoder"].classes_)}
+
+    block = np.full((len(BANDS), len(points)), np.nan, dtype=np.float32)
+    for index, data in enumerate(results):
+        if not isinstance(data.get("cluster_prediction"), int):
+            continue
+        soil_data = data["soil_data"]
+        block[:, index] = [
+            data["cluster_prediction"],
+            float(data["elevation_data"]["Elevation"]),
+            float(data["rainfall_data"]["ANN"]),
+            texture_codes[soil_data.get("TEXTURE") or soil_data.get("Texture_Su")],
+            hydrology_codes[data["hydrology_data"]["CATEGORY"]],
+        ]
+    return block.reshape(len(BANDS), stop - start, cols)
+
+
+def build_grid():
+    rows, cols = grid_shape()
+    chunks = [(start, min(start + chunk_rows, rows)) for start in range(0, rows, chunk_rows)]
+    values = np.empty((len(BANDS), rows, cols), dtype=np.float32)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for (start, stop), block in zip(chunks, executor.map(score_rows, chunks)):
+            values[:, start:stop] = block
+            print(f"Scored rows {stop}/{rows}")
+    # Tagged with the model version so get_data.py refuses the grid once a different model is served
+    get_data.load_models()
+    return GridLayer(values, EASTING_MIN, NORTHING_MAX, resolution, BANDS, attributes={"model_version": get_data.model_state["fingerprint"]})
+
+
+def build_overlay(grid):
+    """
+    Render the cluster band to an RGBA PNG on a Web Mercator-aligned pixel lattice, so Mapbox can
+    drape it with a plain image source without distortion. Returns the corner coordinates.
+    """
+    to_wgs84 = Transformer.from_crs("EPSG:29903", "EPSG:4326", always_xy=True)
+    # Irish Grid edges are curved in WGS84, so bound densified edges rather than the four corners
+    west, south, east, north = to_wgs84.transform_bounds(EASTING_MIN, NORTHING_MIN, EASTING_MAX, NORTHING_MAX, densify_pts=100)
+
+    def mercator_y(latitude):
+        return math.log(math.tan(math.pi / 4 + math.radians(latitude) / 2))
+
+    height = int(overlay_width * (mercator_y(north) - mercator_y(south)) / math.radians(east - west))
+    pixel_lon = west + (np.arange(overlay_width) + 0.5) / overlay_width * (east - west)
+    pixel_y = mercator_y(north) - (np.arange(height) + 0.5) / height * (mercator_y(north) - mercator_y(south))
+    pixel_lat = np.degrees(2 * np.arctan(np.exp(pixel_y)) - np.pi / 2)
+    lon_grid, lat_grid = np.meshgrid(pixel_lon, pixel_lat)
+
+    to_irish_grid = Transformer.from_crs("EPSG:4326", "EPSG:29903", always_xy=True)
+    eastings, northings = to_irish_grid.transform(lon_grid.ravel(), lat_grid.ravel())
+    clusters = grid.lookup(eastings, northings)["Cluster"].reshape(height, overlay_width)
+
+    image = np.zeros((height, overlay_width, 4), dtype=np.float32)
+    for cluster, color in cluster_colors.items():
+        image[clusters == cluster] = to_rgba(color, alpha=0.6)
+    os.makedirs(os.path.dirname(overlay_png), exist_ok=True)
+    plt.imsave(overlay_png, image)
+    return [[west, north], [east, north], [east, south], [west, south]]
+
+
+if __name__ == "__main__":
+    start_time = time.time()
+    risk_grid = build_grid()
+    risk_grid.save(risk_grid_dir, "risk_grid")
+    print(f"Risk grid {risk_grid.shape} at {resolution} m written to {risk_grid_dir} in {time.time() - start_time:.0f}s")
+
+    coordinates = build_overlay(risk_grid)
+    with open(overlay_json, "w") as overlay_file:
+        json.dump({"coordinates": coordinates, "resolution": resolution}, overlay_file, indent=2)
+    print(f"Overlay written to {overlay_png}")
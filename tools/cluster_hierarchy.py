@@ -0,0 +1,82 @@
+import heapq
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.cluster import Birch, ward_tree
+from sklearn.metrics import silhouette_score
+
+# Above this many rows the Ward tree is built on BIRCH subcluster centres instead of the points
+large_n_threshold = 50000
+birch_threshold = 0.1
+
+# Points per silhouette evaluation (stratified by cluster); datasets this small are used whole
+silhouette_sample = 10000
+
+
+class WardHierarchy:
+    """
+    Ward tree built once and cut at any number of clusters, giving the same labels as
+    AgglomerativeClustering(n_clusters=k) on the same data. With more than large_n_threshold rows
+    the points are first summarised by BIRCH and the tree is built on the subcluster centres;
+    every point then takes the label of its subcluster.
+    """
+
+    def __init__(self, X):
+        self.X = np.asarray(X, dtype=np.float64)
+        self.birch = None
+        leaves = self.X
+        if len(self.X) > large_n_threshold:
+            self.birch = Birch(threshold=birch_threshold, n_clusters=None).fit(self.X)
+            leaves = self.birch.subcluster_centers_
+        self.children, _, self.n_leaves, _ = ward_tree(leaves)
+        self.leaf_of_point = self.birch.predict(self.X) if self.birch is not None else None
+
+    def cut(self, k):
+        """Labels for every point with the tree cut into k clusters (numbered as sklearn does)."""
+        if k > self.n_leaves:
+            raise ValueError(f"Cannot extract {k} clusters from a tree with {self.n_leaves} leaves")
+        # Split the highest remaining merge k - 1 times; the heap order fixes the label numbering
+        nodes = [-(int(max(self.children[-1])) + 1)]
+        for _ in range(k - 1):
+            left, right = self.children[-nodes[0] - self.n_leaves]
+            heapq.heappush(nodes, -int(left))
+            heapq.heappushpop(nodes, -int(right))
+
+        node_labels = np.full(2 * self.n_leaves - 1, -1, dtype=np.intp)
+        for label, node in enumerate(nodes):
+            node_labels[-node] = label
+        # Push each cluster's label down the tree, from the last merge to the first
+        for merge in range(len(self.children) - 1, -1, -1):
+            label = node_labels[self.n_leaves + merge]
+            if label >= 0:
+                node_labels[self.children[merge]] = label
+        leaf_labels = node_labels[:self.n_leaves]
+        return leaf_labels if self.leaf_of_point is None else leaf_labels[self.leaf_of_point]
+
+
+def stratified_sample(labels, size, rng):
+    """Row indices sampling each cluster in proportion to its size (at least two rows per cluster)."""
+    if len(labels) <= size:
+        return np.arange(len(labels))
+    indices = []
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        take = min(len(members), max(2, round(size * len(members) / len(labels))))
+        indices.append(rng.choice(members, take, replace=False))
+    return np.sort(np.concatenate(indices))
+
+
+def score_k(hierarchy, k, seed):
+    labels = hierarchy.cut(k)
+    sample = stratified_sample(labels, silhouette_sample, np.random.default_rng(seed))
+    return k, silhouette_score(hierarchy.X[sample], labels[sample])
+
+
+def select_k(X, k_values, n_jobs=-1, seed=42):
+    """
+    Build the hierarchy once, score every candidate k by silhouette (in parallel) and return
+    (best_k, labels for best_k, {k: silhouette}).
+    """
+    hierarchy = WardHierarchy(X)
+    scores = dict(Parallel(n_jobs=n_jobs)(delayed(score_k)(hierarchy, k, seed) for k in k_values))
+    best_k = max(scores, key=scores.get)
+    return best_k, hierarchy.cut(best_k), scores
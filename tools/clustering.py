@@ -1,48 +1,36 @@
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.cluster import AgglomerativeClustering
-from sklearn.metrics import silhouette_score
-from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 from sklearn.manifold import TSNE
 import warnings
+from cluster_hierarchy import select_k
+from feature_store import FEATURES, cluster_features
 warnings.filterwarnings("ignore")
 
 # ------------------------------
 # Data Loading and Preprocessing
 # ------------------------------
-df = pd.read_csv("../data/training_data.csv")
-df = df[~df["Hydrology_Category"].isin(["Water", "Made"])]
-df["Hydrology_Category_Original"] = df["Hydrology_Category"]
+# Filtering, hydrology mapping, scaling and the derived indices are computed once per version of
+# the CSV and cached as Parquet (see feature_store.py)
+df_scaled = cluster_features("../data/training_data.csv")
 
-mapping = {"Well Drained": 0, "AlluvMIN": 1, "Peat": 2, "Poorly Drained": 3}
-df["Hydrology_Category"] = df["Hydrology_Category"].map(mapping)
+X = df_scaled[FEATURES]
 
-scaler = StandardScaler()
-df_scaled = df.copy()
-df_scaled[["Elevation", "Annual_Rainfall"]] = scaler.fit_transform(df_scaled[["Elevation", "Annual_Rainfall"]])
-
-df_scaled["Raw_Hydrology"] = df["Hydrology_Category"] * 2
-df_scaled["Flood_Risk_Index"] = df_scaled["Annual_Rainfall"] - df_scaled["Elevation"]
-df_scaled["Runoff_Index"] = (3 - df_scaled["Raw_Hydrology"]) - df_scaled["Elevation"]
-
-X = df_scaled[["Flood_Risk_Index", "Runoff_Index", "Raw_Hydrology"]]
-
-silhouette_scores = []
+# Build the Ward tree once and cut it at every k (same labels as AgglomerativeClustering);
+# large datasets are pre-aggregated with BIRCH, see cluster_hierarchy.py
 k_values = range(3, 10)
-for k in k_values:
-    agg_temp = AgglomerativeClustering(n_clusters=k)
-    labels_temp = agg_temp.fit_predict(X)
-    score = silhouette_score(X, labels_temp)
-    silhouette_scores.append(score)
-
-optimal_k = k_values[silhouette_scores.index(max(silhouette_scores))]
-agglo = AgglomerativeClustering(n_clusters=optimal_k)
-labels = agglo.fit_predict(X)
+optimal_k, labels, silhouette_scores = select_k(X, k_values)
+for k, score in silhouette_scores.items():
+    print(f"k={k}: silhouette {score:.4f}")
 df_scaled["Cluster"] = labels
 
+# PCA/t-SNE plots on at most plot_sample rows
+plot_sample = 20000
+if len(df_scaled) > plot_sample:
+    df_scaled = df_scaled.sample(plot_sample, random_state=42)
+    X = df_scaled[FEATURES]
+
 pca = PCA(n_components=2)
 pca_result = pca.fit_transform(X)
 df_scaled["PCA1"] = pca_result[:, 0]
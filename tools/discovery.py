@@ -3,23 +3,11 @@ import numpy as np
 import time
 from sklearn.cluster import KMeans, DBSCAN, AgglomerativeClustering
 from sklearn.metrics import silhouette_score
-from sklearn.preprocessing import StandardScaler
+from feature_store import FEATURES, cluster_features
 import warnings
 warnings.filterwarnings("ignore")
 
-df = pd.read_csv("../data/training_data.csv")
-df = df[~df["Hydrology_Category"].isin(["Water", "Made"])]
-mapping = {"Well Drained": 0, "AlluvMIN": 1, "Peat": 2, "Poorly Drained": 3}
-df["Hydrology_Category"] = df["Hydrology_Category"].map(mapping)
-
-scaler = StandardScaler()
-df_scaled = df.copy()
-df_scaled[["Elevation", "Annual_Rainfall"]] = scaler.fit_transform(df[["Elevation", "Annual_Rainfall"]])
-df_scaled["Raw_Hydrology"] = df["Hydrology_Category"] * 2
-df_scaled["Flood_Risk_Index"] = df_scaled["Annual_Rainfall"] - df_scaled["Elevation"]
-df_scaled["Runoff_Index"] = (3 - df_scaled["Raw_Hydrology"]) - df_scaled["Elevation"]
-
-X = df_scaled[["Flood_Risk_Index", "Runoff_Index", "Raw_Hydrology"]]
+X = cluster_features("../data/training_data.csv", columns=FEATURES)
 
 results = []
 
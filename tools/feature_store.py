@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import re
+import numpy as np
+import pandas as pd
+
+# Cached tables live in a features/ directory next to the CSV they were computed from, named
+# <csv stem>-<params key>-<content key>.parquet. The params key tells apart the tables derived from
+# one CSV (load_table, cluster_features); the content key hashes the CSV contents and FEATURE_VERSION,
+# so editing the data or the feature definitions produces a new file and the old one is removed.
+CACHE_DIR = "features"
+FEATURE_VERSION = 1
+
+EXCLUDED_CATEGORIES = ["Water", "Made"]
+MAPPING = {"Well Drained": 0, "AlluvMIN": 1, "Peat": 2, "Poorly Drained": 3}
+SCALED_COLUMNS = ["Elevation", "Annual_Rainfall"]
+FEATURES = ["Flood_Risk_Index", "Runoff_Index", "Raw_Hydrology"]
+
+
+def params_key(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:8]
+
+
+def content_key(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as source:
+        for block in iter(lambda: source.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(str(FEATURE_VERSION).encode())
+    return digest.hexdigest()[:16]
+
+
+def cached(path, params, compute, columns=None):
+    """compute() the first time for this file content and params, the stored Parquet afterwards."""
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR)
+    prefix = f"{os.path.splitext(os.path.basename(path))[0]}-{params_key(params)}"
+    cache_path = os.path.join(cache_dir, f"{prefix}-{content_key(path)}.parquet")
+    if os.path.exists(cache_path):
+        return pd.read_parquet(cache_path, columns=columns)
+
+    df = compute()
+    os.makedirs(cache_dir, exist_ok=True)
+    temporary = f"{cache_path}.tmp{os.getpid()}"
+    df.to_parquet(temporary, index=False)
+    os.replace(temporary, cache_path)
+    remove_stale(cache_dir, prefix, cache_path)
+    return df if columns is None else df[columns]
+
+
+def remove_stale(cache_dir, prefix, keep):
+    """Delete the tables cached for earlier contents of the same CSV and params (any <prefix>-<key>.parquet but `keep`)."""
+    pattern = re.compile(re.escape(prefix) + r"-[0-9a-f]{16}\.parquet")
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if pattern.fullmatch(name) and path != keep:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # removed by another process at the same time
+
+
+def compact(df, float_dtype=np.float32):
+    """Text columns as categoricals, floats as float_dtype and integers in the smallest type that fits."""
+    for column in df.columns:
+        kind = df[column].dtype.kind
+        if kind == "O":
+            df[column] = df[column].astype("category")
+        elif kind == "f":
+            df[column] = df[column].astype(float_dtype)
+        elif kind in "iu":
+            df[column] = pd.to_numeric(df[column], downcast="integer")
+    return df
+
+
+def load_table(path, columns=None, float_dtype=np.float32):
+    """A CSV read once with compact dtypes (see compact; float_dtype=np.float64 keeps full precision) and cached."""
+    params = {"table": True} if float_dtype == np.float32 else {"table": True, "floats": np.dtype(float_dtype).name}
+    return cached(path, params, lambda: compact(pd.read_csv(path), float_dtype), columns)
+
+
+def cluster_features(path="../data/training_data.csv", columns=None):
+    """
+    Training rows with the clustering features, as clustering.py and discovery.py define them:
+    water and made ground dropped, Hydrology_Category mapped to codes (the name is kept in
+    Hydrology_Category_Original), Elevation and Annual_Rainfall standardised (StandardScaler
+    statistics), Raw_Hydrology, Flood_Risk_Index and Runoff_Index. The arithmetic is float64;
+    only the stored columns are float32.
+    """
+    def compute():
+        df = pd.read_csv(path)
+        df = df[~df["Hydrology_Category"].isin(EXCLUDED_CATEGORIES)].reset_index(drop=True)
+        df["Hydrology_Category_Original"] = df["Hydrology_Category"]
+        df["Hydrology_Category"] = df["Hydrology_Category"].map(MAPPING)
+
+        values = df[SCALED_COLUMNS].to_numpy(dtype=np.float64)
+        scaled = (values - values.mean(axis=0)) / values.std(axis=0)
+        df[SCALED_COLUMNS] = scaled
+        df["Raw_Hydrology"] = df["Hydrology_Category"] * 2
+        df["Flood_Risk_Index"] = scaled[:, 1] - scaled[:, 0]
+        df["Runoff_Index"] = (3 - df["Raw_Hydrology"]) - scaled[:, 0]
+        return compact(df)
+
+    return cached(path, {"excluded": EXCLUDED_CATEGORIES, "mapping": MAPPING}, compute, columns)
@@ -0,0 +1,175 @@
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+from cluster_hierarchy import select_k
+from feature_store import EXCLUDED_CATEGORIES, FEATURES, MAPPING, SCALED_COLUMNS
+
+# Raw samples (appended to by training_dataset.py) and the clustered dataset the classifier trains on
+raw_csv = "../data/training_data.csv"
+clustered_csv = "../data/training_data_with_clusters.csv"
+
+# Reference scaler, running statistics and drift baselines, updated on every run
+state_path = "../data/data_results/cluster_state.json"
+
+# A full rebuild (new scaler, Ward tree and k) is run when any drift metric crosses its threshold:
+#   mean_shift      running mean moved by this many reference standard deviations
+#   scale_change    running standard deviation changed by this fraction
+#   distance_ratio  new points sit this many times further from labelled points than the baseline
+#   new_share       points added since the last rebuild, as a share of the rows clustered then
+drift_thresholds = {"mean_shift": 0.25, "scale_change": 0.2, "distance_ratio": 2.0, "new_share": 0.5}
+
+k_values = range(3, 10)
+
+# PCA/t-SNE plot coordinates in older clustered CSVs. They aren't part of the incremental schema
+# (t-SNE can't place new points and the classifier drops them), so they are removed on the next update.
+PROJECTION_COLUMNS = ["PC1_PCA", "PC2_PCA", "TSNE1", "TSNE2"]
+
+
+def usable(df):
+    """Rows the clustering uses (water and made ground are excluded, as in clustering.py)."""
+    return df[~df["Hydrology_Category"].isin(EXCLUDED_CATEGORIES)]
+
+
+def prepare(df, mean, scale):
+    """The clustered-CSV columns for raw rows, scaled with the given (reference) statistics."""
+    df = usable(df).copy()
+    df["Hydrology_Category_Original"] = df["Hydrology_Category"]
+    df[SCALED_COLUMNS] = (df[SCALED_COLUMNS].to_numpy(dtype=np.float64) - mean) / scale
+    df["Raw_Hydrology"] = df["Hydrology_Category"].map(MAPPING) * 2
+    df["Flood_Risk_Index"] = df["Annual_Rainfall"] - df["Elevation"]
+    df["Runoff_Index"] = (3 - df["Raw_Hydrology"]) - df["Elevation"]
+    return df
+
+
+def raw_values(df):
+    return usable(df)[SCALED_COLUMNS].to_numpy(dtype=np.float64)
+
+
+def merge_moments(running, values):
+    """Fold a block of rows into running (count, mean, M2) statistics (Chan et al.'s pairwise update)."""
+    count, mean, m2 = running["count"], np.asarray(running["mean"]), np.asarray(running["m2"])
+    if not len(values):
+        return running
+    block_count, block_mean = len(values), values.mean(axis=0)
+    block_m2 = ((values - block_mean) ** 2).sum(axis=0)
+    total = count + block_count
+    delta = block_mean - mean
+    return {
+        "count": total,
+        "mean": (mean + delta * block_count / total).tolist(),
+        "m2": (m2 + block_m2 + delta ** 2 * count * block_count / total).tolist(),
+    }
+
+
+def nearest_distances(tree, X, exclude_self=False):
+    distances, _ = tree.query(X, k=2 if exclude_self else 1)
+    return distances[:, 1] if exclude_self else distances
+
+
+def fresh_state(values, clustered):
+    """State right after a full clustering of `clustered`, whose raw Elevation/Annual_Rainfall are `values`."""
+    X = clustered[FEATURES].to_numpy(dtype=np.float64)
+    return {
+        "k": int(clustered["Cluster"].nunique()),
+        # StandardScaler statistics (population standard deviation), as clustering.py fits them
+        "reference": {"mean": values.mean(axis=0).tolist(), "scale": values.std(axis=0).tolist()},
+        "running": merge_moments({"count": 0, "mean": [0.0, 0.0], "m2": [0.0, 0.0]}, values),
+        "rows_at_rebuild": len(clustered),
+        "added_since_rebuild": 0,
+        "baseline_distance": float(nearest_distances(cKDTree(X), X, exclude_self=True).mean()),
+    }
+
+
+def is_new(raw, clustered):
+    """Mask of the raw rows whose coordinates are not in the clustered dataset."""
+    known = pd.MultiIndex.from_frame(clustered[["Easting", "Northing"]])
+    return ~pd.MultiIndex.from_frame(raw[["Easting", "Northing"]]).isin(known)
+
+
+def initial_state(raw, clustered):
+    """Start tracking an existing clustered dataset without reclustering it."""
+    return fresh_state(raw_values(raw[~is_new(raw, clustered)]), clustered)
+
+
+def rebuild(raw):
+    """Full pipeline: fit the scaler, cluster with the Ward hierarchy and reset the incremental state."""
+    values = raw_values(raw)
+    df = prepare(raw, values.mean(axis=0), values.std(axis=0))
+    best_k, labels, _ = select_k(df[FEATURES].to_numpy(dtype=np.float64), k_values)
+    df["Cluster"] = labels
+    df.to_csv(clustered_csv, index=False)
+    print(f"Full rebuild: {len(df)} rows in {best_k} clusters")
+    return fresh_state(values, df)
+
+
+def drift(state, new_distances):
+    reference_mean, reference_scale = np.asarray(state["reference"]["mean"]), np.asarray(state["reference"]["scale"])
+    running = state["running"]
+    running_std = np.sqrt(np.asarray(running["m2"]) / max(running["count"], 1))
+    return {
+        "mean_shift": float(np.max(np.abs(np.asarray(running["mean"]) - reference_mean) / reference_scale)),
+        "scale_change": float(np.max(np.abs(running_std / reference_scale - 1))),
+        "distance_ratio": float(new_distances.mean() / state["baseline_distance"]) if len(new_distances) else 0.0,
+        "new_share": state["added_since_rebuild"] / state["rows_at_rebuild"],
+    }
+
+
+def assign(clustered, new_rows, state):
+    """
+    Label new raw rows by their nearest already-clustered point in feature space (reference scaling),
+    which follows the Ward cluster boundaries more closely than nearest centroid. Returns the
+    prepared rows and each one's distance to that point.
+    """
+    X = clustered[FEATURES].to_numpy(dtype=np.float64)
+    tree = cKDTree(X)
+    prepared = prepare(new_rows, np.asarray(state["reference"]["mean"]), np.asarray(state["reference"]["scale"]))
+    distances, nearest = tree.query(prepared[FEATURES].to_numpy(dtype=np.float64))
+    prepared["Cluster"] = clustered["Cluster"].to_numpy()[nearest]
+    return prepared, distances
+
+
+def update(raw, state):
+    """Assign the raw rows not yet in the clustered CSV, or rebuild when drift crosses a threshold."""
+    clustered = pd.read_csv(clustered_csv)
+    new_rows = usable(raw[is_new(raw, clustered)])
+    if new_rows.empty:
+        print("No new points")
+        return state
+
+    state["running"] = merge_moments(state["running"], raw_values(new_rows))
+    prepared, distances = assign(clustered, new_rows, state)
+    state["added_since_rebuild"] += len(prepared)
+    metrics = drift(state, distances)
+    print("Drift: " + ", ".join(f"{name} {value:.3f} (limit {drift_thresholds[name]})" for name, value in metrics.items()))
+    if any(metrics[name] > limit for name, limit in drift_thresholds.items()):
+        return rebuild(raw)
+
+    columns = [column for column in clustered.columns if column not in PROJECTION_COLUMNS]
+    rows = prepared.reindex(columns=columns)
+    if len(columns) < len(clustered.columns):
+        pd.concat([clustered[columns], rows], ignore_index=True).to_csv(clustered_csv, index=False)
+    else:
+        rows.to_csv(clustered_csv, mode="a", header=False, index=False)
+    print(f"Assigned {len(prepared)} new points: {prepared['Cluster'].value_counts().sort_index().to_dict()}")
+    print("Retrain the classifier (train_cluster_classifier.py) to pick up the new labels.")
+    return state
+
+
+if __name__ == "__main__":
+    # python incremental_clustering.py [--rebuild]   (run from tools/, like clustering.py)
+    raw = pd.read_csv(raw_csv)
+    if "--rebuild" in sys.argv or not os.path.exists(clustered_csv):
+        state = rebuild(raw)
+    else:
+        if os.path.exists(state_path):
+            with open(state_path) as state_file:
+                state = json.load(state_file)
+        else:
+            state = initial_state(raw, pd.read_csv(clustered_csv))
+        state = update(raw, state)
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    with open(state_path, "w") as state_file:
+        json.dump(state, state_file, indent=2)
@@ -0,0 +1,221 @@
+import io
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+import psycopg2
+import pyarrow.parquet as pq
+import shapely
+from psycopg2 import sql
+from pyproj import Transformer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from get_data import DB_CONFIG  # noqa: E402
+import provision_indexes  # noqa: E402
+
+# Rows sent per COPY chunk (the loader holds one chunk in memory at a time)
+chunk_rows = 200000
+
+# Memory for index builds and CLUSTER sorts in this session
+maintenance_work_mem = "1GB"
+
+# Polygon layers: source (GeoParquet from SHP_to_parquet.py with WKB geometry, or a CSV with WKT),
+# {table column: source column} for the text attributes, geometry column and its SRID.
+POLYGON_LAYERS = {
+    "soil_data": (
+        "data/soil_data.parquet",
+        {"Texture_Su": "Texture_Su", "TEXTURE": "TEXTURE", "DEPTH": "DEPTH", "PlainEngli": "PlainEngli"},
+        ("geometry", 29903),
+    ),
+    "hydrology_data": (
+        "data/hydrology_data.parquet",
+        {"CATEGORY": "CATEGORY", "ParMat_Des": "ParMat_Des", "SoilDraina": "SoilDraina"},
+        ("geometry", 29903),
+    ),
+    # The queries use PROVINCE and SHAPE unquoted, so the columns are lower case
+    "provinces___gen_20m_2019": ("data/provinces___gen_20m_2019.csv", {"province": "PROVINCE"}, ("shape", 2157)),
+}
+
+# Point layers in Irish Grid: source (DEM_to_csv.py output / Met Éireann grid, CSV or Parquet) and
+# {table column: source column}; source names are matched case-insensitively.
+POINT_LAYERS = {
+    "elevation_data": (
+        "data/elevation_data.parquet",
+        {"easting": "IrishGrid_Easting", "northing": "IrishGrid_Northing", "elevation": "Elevation"},
+    ),
+    "rainfall_data": (
+        "data/rainfall_data.csv",
+        {"easting": "Easting", "northing": "Northing", "ann": "ANN", "djf": "DJF", "mam": "MAM", "jja": "JJA", "son": "SON"},
+    ),
+}
+
+# Columns provision_indexes.py would add with UPDATE after the load. They are computed per chunk
+# here instead, so each table is written once rather than loaded and then rewritten in place.
+DERIVED_COLUMNS = {
+    "elevation_data": [("geom", "geometry(Point, 29903)"), ("raster_row", "integer"), ("raster_col", "integer")],
+    "rainfall_data": [("geom", "geometry(Point, 29903)"), ("grid_e", "integer"), ("grid_n", "integer")],
+}
+
+# Index each table is physically reordered by after the load: the GiST index for polygon layers,
+# the grid key used by the direct lookups for point layers
+CLUSTER_INDEXES = {
+    "soil_data": "soil_data_geometry_idx",
+    "hydrology_data": "hydrology_data_geometry_idx",
+    "provinces___gen_20m_2019": "provinces_shape_idx",
+    "elevation_data": "elevation_data_cell_idx",
+    "rainfall_data": "rainfall_data_grid_idx",
+}
+
+
+def table_columns(table):
+    """(column, type) pairs of a table, in COPY order."""
+    if table in POLYGON_LAYERS:
+        _, columns, (geometry_column, srid) = POLYGON_LAYERS[table]
+        return [(column, "text") for column in columns] + [(geometry_column, f"geometry(Geometry, {srid})")]
+    _, columns = POINT_LAYERS[table]
+    return [(column, "double precision") for column in columns] + DERIVED_COLUMNS.get(table, [])
+
+
+def read_chunks(path, columns):
+    """DataFrames of at most chunk_rows rows holding the requested source columns (case-insensitive)."""
+    if path.endswith(".parquet"):
+        source = pq.ParquetFile(path)
+        header = source.schema_arrow.names
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+    lookup = {name.lower(): name for name in header}
+    missing = [column for column in columns if column.lower() not in lookup]
+    if missing:
+        raise ValueError(f"Missing columns in {path}: {', '.join(missing)}")
+    names = [lookup[column.lower()] for column in columns]
+    renames = dict(zip(names, columns))
+
+    if path.endswith(".parquet"):
+        for batch in source.iter_batches(batch_size=chunk_rows, columns=names):
+            yield batch.to_pandas().rename(columns=renames)
+    else:
+        for chunk in pd.read_csv(path, usecols=names, chunksize=chunk_rows):
+            yield chunk.rename(columns=renames)
+
+
+def ewkb(geometries, srid):
+    """Hex EWKB with the SRID embedded, which COPY accepts for a typed geometry column."""
+    return shapely.to_wkb(shapely.set_srid(geometries, srid), hex=True, include_srid=True)
+
+
+def polygon_chunks(table):
+    path, columns, (geometry_column, srid) = POLYGON_LAYERS[table]
+    for chunk in read_chunks(path, list(columns.values()) + ["geometry"]):
+        raw = chunk["geometry"].values
+        geometries = shapely.from_wkb(raw) if path.endswith(".parquet") else shapely.from_wkt(raw)
+        rows = chunk[list(columns.values())].set_axis(list(columns), axis=1)
+        rows[geometry_column] = ewkb(geometries, srid)
+        yield rows
+
+
+def point_chunks(table, dem_grid):
+    path, columns = POINT_LAYERS[table]
+    to_wgs84 = Transformer.from_crs("EPSG:29903", "EPSG:4326", always_xy=True)
+    for chunk in read_chunks(path, list(columns.values())):
+        rows = chunk.set_axis(list(columns), axis=1)
+        easting, northing = rows["easting"].to_numpy(dtype=np.float64), rows["northing"].to_numpy(dtype=np.float64)
+        rows["geom"] = ewkb(shapely.points(easting, northing), 29903)
+        # np.rint rounds half to even, like ROUND() on double precision in provision_indexes.py
+        if table == "rainfall_data":
+            rows["grid_e"] = np.rint(easting / 1000.0).astype(np.int64)
+            rows["grid_n"] = np.rint(northing / 1000.0).astype(np.int64)
+        elif table == "elevation_data":
+            origin_lon, origin_lat, resolution = dem_grid
+            lon, lat = to_wgs84.transform(easting, northing)
+            rows["raster_row"] = np.rint((origin_lat - lat) / resolution).astype(np.int64)
+            rows["raster_col"] = np.rint((lon - origin_lon) / resolution).astype(np.int64)
+        yield rows
+
+
+def copy_table(conn, table, chunks):
+    """
+    Recreate the table and COPY every chunk into it in one transaction. Creating the table in the
+    same transaction lets COPY use FREEZE (no later hint-bit rewrite) and skip WAL when
+    wal_level=minimal. Returns the number of rows loaded.
+    """
+    columns = table_columns(table)
+    copy = sql.SQL("COPY {} ({}) FROM STDIN WITH (FORMAT csv, FREEZE)").format(
+        sql.Identifier(table), sql.SQL(", ").join(sql.Identifier(column) for column, _ in columns)
+    )
+    rows = 0
+    with conn.cursor() as cursor:
+        cursor.execute(sql.SQL("DROP TABLE IF EXISTS {};").format(sql.Identifier(table)))
+        cursor.execute(sql.SQL("CREATE TABLE {} ({});").format(
+            sql.Identifier(table),
+            sql.SQL(", ").join(sql.SQL("{} {}").format(sql.Identifier(column), sql.SQL(kind)) for column, kind in columns),
+        ))
+        for chunk in chunks:
+            buffer = io.StringIO()
+            chunk[[column for column, _ in columns]].to_csv(buffer, header=False, index=False)
+            buffer.seek(0)
+            cursor.copy_expert(copy.as_string(conn), buffer)
+            rows += len(chunk)
+    conn.commit()
+    return rows
+
+
+def index_steps(table):
+    """The CREATE INDEX statements provision_indexes.py runs for this table."""
+    steps = provision_indexes.POLYGON_STEPS + provision_indexes.RAINFALL_STEPS + provision_indexes.ELEVATION_STEPS
+    return [step for step in steps if step.startswith("CREATE INDEX") and f" ON {table} " in step]
+
+
+def elevation_grid_steps():
+    """provision_indexes.py's CREATE/TRUNCATE/INSERT for elevation_grid, without the elevation_data UPDATEs."""
+    return [
+        step for step in provision_indexes.ELEVATION_STEPS
+        if "elevation_grid" in step and step.lstrip().startswith(("CREATE TABLE", "TRUNCATE", "INSERT"))
+    ]
+
+
+def finish_table(conn, table):
+    """Build the indexes on the loaded table, reorder it by CLUSTER_INDEXES and refresh statistics."""
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SET maintenance_work_mem = %s;", (maintenance_work_mem,))
+            provision_indexes.run_steps(cursor, index_steps(table))
+            provision_indexes.run_steps(cursor, [f"CLUSTER {table} USING {CLUSTER_INDEXES[table]};", f"ANALYZE {table};"])
+    finally:
+        conn.autocommit = False
+
+
+if __name__ == "__main__":
+    # python tools/load_database.py [table ...]   (default: every layer whose source file exists)
+    tables = sys.argv[1:] or list(POLYGON_LAYERS) + list(POINT_LAYERS)
+    dem_grid = provision_indexes.dem_grid()
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS postgis;")
+        conn.commit()
+
+        # Grid definition the elevation lookups join against (as in provision_indexes.py). Only the
+        # elevation_grid table itself: raster_row/raster_col are already part of the COPY stream.
+        if "elevation_data" in tables:
+            with conn.cursor() as cursor:
+                provision_indexes.run_steps(cursor, elevation_grid_steps(), dem_grid)
+            conn.commit()
+
+        for table in tables:
+            source = POLYGON_LAYERS[table][0] if table in POLYGON_LAYERS else POINT_LAYERS[table][0]
+            if not os.path.exists(source):
+                print(f"{table}: {source} not found, skipped")
+                continue
+            start = time.time()
+            chunks = polygon_chunks(table) if table in POLYGON_LAYERS else point_chunks(table, dem_grid)
+            rows = copy_table(conn, table, chunks)
+            elapsed = time.time() - start
+            print(f"{table}: {rows} rows copied in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):.0f} rows/s)")
+            finish_table(conn, table)
+            print(f"{table}: loaded, indexed and clustered in {time.time() - start:.1f}s")
+
+    finally:
+        conn.close()
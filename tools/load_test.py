@@ -0,0 +1,169 @@
+import asyncio
+import json
+import sys
+import time
+import aiohttp
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+# Endpoint under test
+url = "http://localhost:5000/get_data"
+
+# "recorded" replays the coordinates in points_csv (shuffled), "random" draws uniform points in
+# the bounds below. jitter_m moves each point by up to that many metres so repeated coordinates
+# don't all land in the same result cache cell.
+point_source = "recorded"
+points_csv = "data/training_data.csv"
+jitter_m = 0
+EASTING_MIN, EASTING_MAX = 13098, 367154
+NORTHING_MIN, NORTHING_MAX = 11478, 462251
+
+# Closed loop: this many requests at each concurrency level (requests in flight).
+# Open loop: set arrival_rates (requests/second) to send Poisson arrivals for step_seconds per
+# rate regardless of how fast responses come back; latency then includes queueing delay.
+concurrency_steps = [1, 2, 4, 8, 16, 32, 64]
+requests_per_step = 500
+arrival_rates = None
+step_seconds = 30
+request_timeout = 60
+
+output_json = "load_test_results.json"
+output_curve = "load_test_curve.png"
+
+PERCENTILES = {"p50": 50, "p90": 90, "p99": 99, "p99.9": 99.9}
+
+
+def load_points(rng):
+    if point_source == "recorded":
+        df = pd.read_csv(points_csv, usecols=["Easting", "Northing"])
+        points = df.to_numpy(dtype=float)[rng.permutation(len(df))]
+    else:
+        count = 10000
+        points = np.column_stack([
+            rng.uniform(EASTING_MIN, EASTING_MAX, count),
+            rng.uniform(NORTHING_MIN, NORTHING_MAX, count),
+        ])
+    if jitter_m:
+        points = points + rng.uniform(-jitter_m, jitter_m, points.shape)
+    return points.round().tolist()
+
+
+class PointCycle:
+    def __init__(self, points):
+        self.points = points
+        self.position = 0
+
+    def next(self):
+        point = self.points[self.position % len(self.points)]
+        self.position += 1
+        return point
+
+
+async def send(session, point, sent_at=None):
+    """POST one coordinate; returns (latency in seconds, ok). Latency counts from sent_at when given."""
+    start = sent_at if sent_at is not None else time.perf_counter()
+    try:
+        async with session.post(url, json={"easting": point[0], "northing": point[1]}) as response:
+            await response.read()
+            ok = response.status == 200
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+async def closed_loop(session, points, concurrency):
+    """Keep `concurrency` requests in flight until requests_per_step have completed."""
+    remaining = requests_per_step
+    outcomes = []
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            outcomes.append(await send(session, points.next()))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return outcomes, time.perf_counter() - start
+
+
+async def open_loop(session, points, rate, rng):
+    """Fire requests at Poisson arrival times for step_seconds, without waiting for responses."""
+    start = time.perf_counter()
+    tasks = []
+    next_arrival = start
+    while next_arrival < start + step_seconds:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Latency from the scheduled time, so a stalled server can't hide its backlog
+        tasks.append(asyncio.create_task(send(session, points.next(), sent_at=next_arrival)))
+        next_arrival += rng.exponential(1 / rate)
+    outcomes = await asyncio.gather(*tasks)
+    return outcomes, time.perf_counter() - start
+
+
+def summarise(label, value, outcomes, elapsed):
+    latencies_ms = np.array([latency for latency, ok in outcomes if ok]) * 1000
+    errors = sum(1 for _, ok in outcomes if not ok)
+    step = {
+        label: value,
+        "requests": len(outcomes),
+        "errors": errors,
+        "error_rate": errors / len(outcomes) if outcomes else 0.0,
+        "throughput_rps": (len(outcomes) - errors) / elapsed if elapsed else 0.0,
+    }
+    for name, percentile in PERCENTILES.items():
+        step[f"{name}_ms"] = float(np.percentile(latencies_ms, percentile)) if len(latencies_ms) else None
+    print(
+        f"{label} {value:>6}: {step['throughput_rps']:8.1f} req/s  "
+        + "  ".join(f"{name} {step[f'{name}_ms'] or float('nan'):8.1f} ms" for name in PERCENTILES)
+        + f"  errors {step['error_rate']:.1%}"
+    )
+    return step
+
+
+def plot_curve(steps, label):
+    throughput = [step["throughput_rps"] for step in steps]
+    fig, ax = plt.subplots(figsize=(8, 5))
+    for name in ("p50", "p99"):
+        ax.plot(throughput, [step[f"{name}_ms"] for step in steps], marker="o", label=name)
+    for step in steps:
+        ax.annotate(str(step[label]), (step["throughput_rps"], step["p99_ms"] or 0), textcoords="offset points", xytext=(4, 4), fontsize=8)
+    ax.set_xlabel("Throughput (requests/s)")
+    ax.set_ylabel("Latency (ms)")
+    ax.set_yscale("log")
+    ax.set_title(f"/get_data throughput vs latency ({label} annotated)")
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(output_curve)
+
+
+async def main():
+    rng = np.random.default_rng(0)
+    points = PointCycle(load_points(rng))
+    label = "concurrency" if arrival_rates is None else "rate"
+    connector = aiohttp.TCPConnector(limit=0)
+    timeout = aiohttp.ClientTimeout(total=request_timeout)
+    steps = []
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        if arrival_rates is None:
+            for concurrency in concurrency_steps:
+                steps.append(summarise(label, concurrency, *await closed_loop(session, points, concurrency)))
+        else:
+            for rate in arrival_rates:
+                steps.append(summarise(label, rate, *await open_loop(session, points, rate, rng)))
+
+    with open(output_json, "w") as output_file:
+        json.dump({"url": url, "point_source": point_source, "mode": label, "steps": steps}, output_file, indent=2)
+    plot_curve(steps, label)
+    best = max(steps, key=lambda step: step["throughput_rps"])
+    print(f"Peak throughput {best['throughput_rps']:.1f} req/s at {label} {best[label]}")
+    print(f"Results written to {output_json} and {output_curve}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        url = sys.argv[1]
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import psycopg2
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from get_data import DB_CONFIG  # noqa: E402
+
+# ACE2 tile used by DEM_to_csv.py. Its origin and pixel size are read from the raster when
+# the file is available, otherwise the defaults below (45N015W, 3 arc-second) are used.
+DEM_PATH = "data/45N015W_3S.ACE2"
+DEM_ORIGIN_LON = -15.0
+DEM_ORIGIN_LAT = 60.0
+DEM_RESOLUTION = 3 / 3600
+
+
+def dem_grid():
+    """Return (origin_lon, origin_lat, resolution) of the DEM the elevation table was built from."""
+    if os.path.exists(DEM_PATH):
+        import rasterio
+        with rasterio.open(DEM_PATH) as src:
+            return src.bounds.left, src.bounds.top, (src.bounds.right - src.bounds.left) / src.width
+    return DEM_ORIGIN_LON, DEM_ORIGIN_LAT, DEM_RESOLUTION
+
+
+# Polygon layers: give the geometry column a fixed SRID so it can be KNN-ordered by its own GiST index
+POLYGON_STEPS = [
+    "ALTER TABLE soil_data ALTER COLUMN geometry TYPE geometry(Geometry, 29903) USING ST_SetSRID(geometry, 29903);",
+    "CREATE INDEX IF NOT EXISTS soil_data_geometry_idx ON soil_data USING GIST (geometry);",
+    "ALTER TABLE hydrology_data ALTER COLUMN geometry TYPE geometry(Geometry, 29903) USING ST_SetSRID(geometry, 29903);",
+    "CREATE INDEX IF NOT EXISTS hydrology_data_geometry_idx ON hydrology_data USING GIST (geometry);",
+    "CREATE INDEX IF NOT EXISTS provinces_shape_idx ON provinces___gen_20m_2019 USING GIST (SHAPE);",
+]
+
+# Rainfall: point geometry for the KNN fallback plus the 1 km grid key used for direct lookups
+RAINFALL_STEPS = [
+    """
+    ALTER TABLE rainfall_data
+        ADD COLUMN IF NOT EXISTS geom geometry(Point, 29903),
+        ADD COLUMN IF NOT EXISTS grid_e integer,
+        ADD COLUMN IF NOT EXISTS grid_n integer;
+    """,
+    """
+    UPDATE rainfall_data
+    SET geom = ST_SetSRID(ST_MakePoint(easting, northing), 29903),
+        grid_e = ROUND(easting / 1000.0),
+        grid_n = ROUND(northing / 1000.0);
+    """,
+    "CREATE INDEX IF NOT EXISTS rainfall_data_geom_idx ON rainfall_data USING GIST (geom);",
+    "CREATE INDEX IF NOT EXISTS rainfall_data_grid_idx ON rainfall_data (grid_e, grid_n);",
+]
+
+# Elevation: point geometry for the KNN fallback plus the DEM row/column of every pixel
+ELEVATION_STEPS = [
+    """
+    CREATE TABLE IF NOT EXISTS elevation_grid (
+        origin_lon double precision NOT NULL,
+        origin_lat double precision NOT NULL,
+        resolution double precision NOT NULL
+    );
+    """,
+    "TRUNCATE elevation_grid;",
+    "INSERT INTO elevation_grid (origin_lon, origin_lat, resolution) VALUES (%s, %s, %s);",
+    """
+    ALTER TABLE elevation_data
+        ADD COLUMN IF NOT EXISTS geom geometry(Point, 29903),
+        ADD COLUMN IF NOT EXISTS raster_row integer,
+        ADD COLUMN IF NOT EXISTS raster_col integer;
+    """,
+    "UPDATE elevation_data SET geom = ST_SetSRID(ST_MakePoint(easting, northing), 29903);",
+    """
+    UPDATE elevation_data AS e
+    SET raster_row = ROUND((g.origin_lat - ST_Y(ST_Transform(e.geom, 4326))) / g.resolution),
+        raster_col = ROUND((ST_X(ST_Transform(e.geom, 4326)) - g.origin_lon) / g.resolution)
+    FROM elevation_grid AS g;
+    """,
+    "CREATE INDEX IF NOT EXISTS elevation_data_geom_idx ON elevation_data USING GIST (geom);",
+    "CREATE INDEX IF NOT EXISTS elevation_data_cell_idx ON elevation_data (raster_row, raster_col);",
+]
+
+
+def run_steps(cursor, steps, params=None):
+    for step in steps:
+        start = time.time()
+        cursor.execute(step, params if "%s" in step else None)
+        print(f"{time.time() - start:8.1f}s  {' '.join(step.split())[:100]}")
+
+
+if __name__ == "__main__":
+    grid = dem_grid()
+    print(f"DEM grid: origin_lon={grid[0]}, origin_lat={grid[1]}, resolution={grid[2]}")
+
+    conn = psycopg2.connect(**DB_CONFIG)
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS postgis;")
+            run_steps(cursor, POLYGON_STEPS)
+            run_steps(cursor, RAINFALL_STEPS)
+            run_steps(cursor, ELEVATION_STEPS, grid)
+            for table in ("soil_data", "hydrology_data", "rainfall_data", "elevation_data", "provinces___gen_20m_2019"):
+                cursor.execute(f"ANALYZE {table};")
+    finally:
+        conn.close()
+
+    print("Spatial indexes and grid keys provisioned.")
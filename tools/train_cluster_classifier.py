@@ -1,10 +1,17 @@
+import json
+import multiprocessing
+import os
+import pickle
+import queue
+import sys
+import time
 import pandas as pd
 import numpy as np
 import joblib
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import StratifiedKFold, cross_val_score, train_test_split
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.svm import SVC
@@ -12,62 +19,214 @@ from sklearn.neighbors import KNeighborsClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 
-file_path = "../data/training_data_with_clusters.csv"
-df = pd.read_csv(file_path)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from compiled_model import compile_model, save_model  # noqa: E402
+import model_registry  # noqa: E402
 
-# Drop redundant columns: Description, visualization columns, and any extra computed features
-columns_to_drop = ["Description", "PC1_PCA", "PC2_PCA", "TSNE1", "TSNE2", 
-                   "Raw_Hydrology", "Flood_Risk_Index", "Runoff_Index", "Elev_Hydro_PCA"]
-for col in columns_to_drop:
-    if col in df.columns:
-        df = df.drop(columns=[col])
+# Model selection: k-fold CV on the training split (cv_folds=None scores on the held-out split only),
+# candidates fitted concurrently, each in its own process (at most model_workers at once) with
+# cv_jobs folds in parallel inside each
+cv_folds = 5
+cv_jobs = 2
+model_workers = 4
 
-texture_encoder = LabelEncoder()
-hydrology_encoder = LabelEncoder()
+# Candidates still running after time_budget_s seconds are dropped (None = wait for all), and
+# candidates whose single-row predict latency exceeds latency_budget_ms can't be chosen
+time_budget_s = None
+latency_budget_ms = None
 
-df["Texture"] = texture_encoder.fit_transform(df["Texture"])
-df["Hydrology_Category"] = hydrology_encoder.fit_transform(df["Hydrology_Category"])
+selection_report = "../data/data_results/model_selection.json"
 
-# Save encoders for future use
-joblib.dump(texture_encoder, "../models/texture_encoder.pkl")
-joblib.dump(hydrology_encoder, "../models/hydrology_encoder.pkl")
 
-X = df[["Texture", "Elevation", "Annual_Rainfall", "Hydrology_Category"]]
-y = df["Cluster"]
+def candidate_models():
+    return {
+        "Random Forest": RandomForestClassifier(n_estimators=100, random_state=42),
+        # No probability=True: nothing uses predict_proba and it adds an internal 5-fold calibration
+        "SVM": SVC(kernel="linear", random_state=42),
+        "k-NN": KNeighborsClassifier(n_neighbors=5),
+        "Logistic Regression": LogisticRegression(max_iter=500, random_state=42)
+    }
 
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(X)
-joblib.dump(scaler, "../models/scaler.pkl")
 
-X_train, X_test, y_train, y_test = train_test_split(
-    X_scaled, y, test_size=0.2, random_state=42, stratify=y
-)
+def evaluate_candidate(name, model, X_train, y_train, X_test, y_test):
+    """Fit one candidate and measure its accuracy, CV score, fit time, predict latency and pickled size."""
+    result = {"name": name}
+    if cv_folds:
+        folds = StratifiedKFold(n_splits=cv_folds, shuffle=True, random_state=42)
+        # Threads inside the pool worker: nested loky processes outlive the worker and stall shutdown
+        with joblib.parallel_backend("threading", n_jobs=cv_jobs):
+            scores = cross_val_score(model, X_train, y_train, cv=folds, n_jobs=cv_jobs)
+        result["cv_accuracy"] = float(scores.mean())
+        result["cv_std"] = float(scores.std())
 
-models = {
-    "Random Forest": RandomForestClassifier(n_estimators=100, random_state=42),
-    "SVM": SVC(kernel="linear", probability=True, random_state=42),
-    "k-NN": KNeighborsClassifier(n_neighbors=5),
-    "Logistic Regression": LogisticRegression(max_iter=500, random_state=42)
-}
-
-best_model = None
-best_accuracy = 0
-results = {}
-
-for name, model in models.items():
+    start = time.perf_counter()
     model.fit(X_train, y_train)
+    result["fit_time_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
     y_pred = model.predict(X_test)
-    acc = accuracy_score(y_test, y_pred)
-    results[name] = acc
-
-    print(f"\n{name} Accuracy: {acc:.4f}")
-    print(classification_report(y_test, y_pred))
-    
-    if acc > best_accuracy:
-        best_accuracy = acc
-        best_model = model
-        best_model_name = name
-
-model_path = "../models/best_cluster_classifier.pkl"
-joblib.dump(best_model, model_path)
-print(f"\nBest model: {best_model_name} (Accuracy: {best_accuracy:.4f}) saved to {model_path}")
+    result["batch_predict_us_per_row"] = (time.perf_counter() - start) / len(X_test) * 1e6
+    result["accuracy"] = float(accuracy_score(y_test, y_pred))
+    result["report"] = classification_report(y_test, y_pred)
+
+    # Serving predicts one row per request, so time that case separately
+    latencies = []
+    for row in X_test[:50]:
+        start = time.perf_counter()
+        model.predict(row.reshape(1, -1))
+        latencies.append(time.perf_counter() - start)
+    result["predict_latency_ms"] = float(np.median(latencies) * 1000)
+    result["artifact_bytes"] = len(pickle.dumps(model))
+    return result, model
+
+
+def run_candidate(results, name, model, data):
+    """Process body for one candidate: put (name, (result, model)) or (name, error message) on the queue."""
+    try:
+        results.put((name, evaluate_candidate(name, model, *data)))
+    except Exception as e:
+        results.put((name, f"{type(e).__name__}: {e}"))
+
+
+def evaluate_candidates(candidates, data):
+    """
+    Evaluate the candidates in their own processes, at most model_workers at a time. Candidates still
+    running when time_budget_s runs out are terminated, and those not yet started are skipped.
+    Returns the (result, model) pairs of the candidates that finished, in candidate order.
+    """
+    deadline = None if time_budget_s is None else time.monotonic() + time_budget_s
+    results = multiprocessing.Queue()
+    waiting = list(candidates.items())
+    running = {}
+    finished = {}
+    while waiting or running:
+        while waiting and len(running) < model_workers:
+            name, model = waiting.pop(0)
+            running[name] = multiprocessing.Process(target=run_candidate, args=(results, name, model, data))
+            running[name].start()
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            break
+        try:
+            # Wake up at least every second to notice a worker that died without answering
+            name, outcome = results.get(timeout=1.0 if remaining is None else min(remaining, 1.0))
+        except queue.Empty:
+            for name, process in list(running.items()):
+                if process.exitcode not in (None, 0):
+                    print(f"{name} exited with code {process.exitcode} and was skipped")
+                    del running[name]
+            continue
+        # Read the result before joining: a child doesn't exit until its queued data is taken
+        running.pop(name).join()
+        if isinstance(outcome, str):
+            print(f"{name} failed and was skipped: {outcome}")
+        else:
+            finished[name] = outcome
+
+    for process in running.values():
+        process.terminate()
+        process.join()
+    skipped = len(running) + len(waiting)
+    if skipped:
+        print(f"{skipped} candidate(s) did not finish within {time_budget_s}s and were skipped")
+    if not finished:
+        raise RuntimeError(f"No candidate finished within time_budget_s ({time_budget_s}s)")
+    return [finished[name] for name in candidates if name in finished]
+
+
+def select_model(results):
+    """Best score among candidates within the latency budget; ties go to the faster model."""
+    score = "cv_accuracy" if cv_folds else "accuracy"
+    eligible = [r for r in results if latency_budget_ms is None or r["predict_latency_ms"] <= latency_budget_ms]
+    if not eligible:
+        raise RuntimeError(f"No candidate predicts within {latency_budget_ms} ms")
+    return max(eligible, key=lambda r: (r[score], -r["predict_latency_ms"]))
+
+
+if __name__ == "__main__":
+    file_path = "../data/training_data_with_clusters.csv"
+    df = pd.read_csv(file_path)
+
+    # Drop redundant columns: Description, visualization columns, and any extra computed features
+    columns_to_drop = ["Description", "PC1_PCA", "PC2_PCA", "TSNE1", "TSNE2", 
+                       "Raw_Hydrology", "Flood_Risk_Index", "Runoff_Index", "Elev_Hydro_PCA"]
+    for col in columns_to_drop:
+        if col in df.columns:
+            df = df.drop(columns=[col])
+
+    texture_encoder = LabelEncoder()
+    hydrology_encoder = LabelEncoder()
+
+    df["Texture"] = texture_encoder.fit_transform(df["Texture"])
+    df["Hydrology_Category"] = hydrology_encoder.fit_transform(df["Hydrology_Category"])
+
+    # Save encoders for future use
+    joblib.dump(texture_encoder, "../models/texture_encoder.pkl")
+    joblib.dump(hydrology_encoder, "../models/hydrology_encoder.pkl")
+
+    X = df[["Texture", "Elevation", "Annual_Rainfall", "Hydrology_Category"]]
+    y = df["Cluster"]
+
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    joblib.dump(scaler, "../models/scaler.pkl")
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X_scaled, y, test_size=0.2, random_state=42, stratify=y
+    )
+
+    evaluated = evaluate_candidates(candidate_models(), (X_train, y_train, X_test, y_test))
+
+    fitted = {}
+    results = []
+    for result, model in evaluated:
+        fitted[result["name"]] = model
+        results.append(result)
+        print(f"\n{result['name']} Accuracy: {result['accuracy']:.4f}")
+        print(result.pop("report"))
+
+    print(f"\n{'Model':22s} {'CV acc':>8s} {'Accuracy':>9s} {'Fit s':>7s} {'Predict ms':>11s} {'us/row':>8s} {'Size KB':>9s}")
+    for r in results:
+        print(
+            f"{r['name']:22s} {r.get('cv_accuracy', float('nan')):8.4f} {r['accuracy']:9.4f} {r['fit_time_s']:7.2f} "
+            f"{r['predict_latency_ms']:11.3f} {r['batch_predict_us_per_row']:8.2f} {r['artifact_bytes'] / 1024:9.1f}"
+        )
+
+    best = select_model(results)
+    best_model_name = best["name"]
+    best_accuracy = best["accuracy"]
+    best_model = fitted[best_model_name]
+    with open(selection_report, "w") as report_file:
+        selection = {"selected": best_model_name, "cv_folds": cv_folds, "latency_budget_ms": latency_budget_ms, "candidates": results}
+        json.dump(selection, report_file, indent=2)
+
+    model_path = "../models/best_cluster_classifier.pkl"
+    joblib.dump(best_model, model_path)
+    print(f"\nBest model: {best_model_name} (Accuracy: {best_accuracy:.4f}) saved to {model_path}")
+
+    # Compile encoders, scaler and classifier into the sklearn-free artifact that get_data.py prefers.
+    # A stale artifact would shadow the new pickles, so remove it if the best model can't be compiled.
+    compiled_path = "../models/cluster_classifier.npz"
+    try:
+        save_model(compiled_path, compile_model(texture_encoder, hydrology_encoder, scaler, best_model))
+        print(f"Compiled model saved to {compiled_path}")
+    except ValueError as e:
+        if os.path.exists(compiled_path):
+            os.remove(compiled_path)
+        print(f"Compiled model not written: {e}")
+
+    # Publish the same models as a new registry version and point CURRENT at it; running
+    # get_data.py workers switch to it on their next request (see MODEL_REGISTRY_DIR)
+    registry_dir = "../models/registry"
+    fitted_models = {"texture_encoder": texture_encoder, "hydrology_encoder": hydrology_encoder, "scaler": scaler, "classifier": best_model}
+    metadata = {
+        "model": best_model_name,
+        "accuracy": best_accuracy,
+        "cv_accuracy": best.get("cv_accuracy"),
+        "predict_latency_ms": best["predict_latency_ms"],
+        "training_data": file_path,
+        "training_data_sha256": model_registry.file_hash(file_path),
+        "training_rows": len(df),
+    }
+    version = model_registry.publish(registry_dir, fitted_models, metadata)
+    print(f"Published model version {version} to {registry_dir}")
@@ -1,7 +1,17 @@
-import json
 import csv
+import os
+import sys
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import numpy as np
 import requests
-import random
+import shapely
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import get_data  # noqa: E402
+from boundary_mask import BoundaryMask  # noqa: E402
+from polygon_index import PolygonLayer  # noqa: E402
 
 # Define bounds for Easting and Northing (Ireland)
 EASTING_MIN = 13098
@@ -9,66 +19,212 @@ EASTING_MAX = 367154
 NORTHING_MIN = 11478
 NORTHING_MAX = 462251
 
-# Output file for the dataset
+# Output file for the dataset (appended to, so an interrupted run resumes where it stopped)
 output_csv = "training_data.csv"
 
 # Define the number of valid data points to extract
 num_points = 10000
 
+# Batch endpoint, points per request and number of requests in flight
+batch_url = "http://localhost:5000/get_data_batch"
+batch_size = 250
+concurrency = 8
+
+# Share of num_points per hydrology category. None keeps the natural proportions of uniform
+# sampling; e.g. {"Well Drained": 0.3, "Poorly Drained": 0.3, "Peat": 0.2, "AlluvMIN": 0.2}
+# fills rare categories without sampling thousands of extra points.
+strata = None
+
+# Candidate draws per batch before giving up on the open strata (e.g. a category that never occurs)
+max_draws = 50
+
 # Features to extract (including Easting and Northing)
 fields = ["Easting", "Northing", "Texture", "Description", "Elevation", "Annual_Rainfall", "Hydrology_Category"]
 
-# Initialize CSV file
-with open(output_csv, "w", newline="") as csvfile:
-    writer = csv.writer(csvfile)
-    writer.writerow(fields) 
-
-    valid_points = 0
-
-    while valid_points < num_points:
-        # Randomly generate a coordinate within the bounds
-        easting = round(random.uniform(EASTING_MIN, EASTING_MAX))
-        northing = round(random.uniform(NORTHING_MIN, NORTHING_MAX))
-
-        # Make a POST request to the backend
-        response = requests.post(
-            "http://localhost:5000/get_data",  # Update this URL as needed
-            headers={"Content-Type": "application/json"},
-            data=json.dumps({"easting": easting, "northing": northing}),
-        )
-
-        if response.status_code == 200:
-            try:
-                # Parse the response
-                data = response.json()
-
-                # Check if all relevant data exists
-                if (
-                    not data["soil_data"].get("TEXTURE") or
-                    not data["soil_data"].get("PlainEngli") or
-                    not data["elevation_data"].get("Elevation") or
-                    not data["rainfall_data"].get("ANN") or
-                    not data["hydrology_data"].get("CATEGORY")
-                ):
-                    print(f"Skipped incomplete or out-of-bounds data at Easting: {easting}, Northing: {northing}")
-                    continue
+rng = np.random.default_rng()
+thread_state = threading.local()
+
+
+def load_boundary():
+    """
+    The province mask from tools/build_boundary_mask.py when it has been built, else the union of
+    the province polygons in Irish Grid, prepared for vectorised point-in-polygon tests.
+    """
+    if get_data.province_mask is not None:
+        return get_data.province_mask
+    with get_data.pooled_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT ST_AsBinary(ST_Transform(ST_Union(SHAPE), 29903)) FROM provinces___gen_20m_2019;")
+        boundary = shapely.from_wkb(bytes(cursor.fetchone()[0]))
+    shapely.prepare(boundary)
+    return boundary
+
+
+def load_hydrology():
+    """Local hydrology polygon index (exact matches only), or None when it has not been built."""
+    path = os.path.join(get_data.POLYGON_DIR, "hydrology_data.parquet")
+    return PolygonLayer(path, max_distance=0).load() if os.path.exists(path) else None
+
+
+def candidates(count, boundary, hydrology):
+    """
+    Draw uniform random points and keep those that can produce a valid row: inside the boundary and
+    with elevation, rainfall and hydrology data in the local layers. Returns (eastings, northings,
+    categories); categories are None when no local hydrology index is available.
+    """
+    eastings = rng.integers(EASTING_MIN, EASTING_MAX + 1, count)
+    northings = rng.integers(NORTHING_MIN, NORTHING_MAX + 1, count)
+    if isinstance(boundary, BoundaryMask):
+        keep = boundary.contains(eastings, northings)
+    else:
+        keep = shapely.contains_xy(boundary, eastings, northings)
+    for table_name, band in (("elevation_data", "Elevation"), ("rainfall_data", "ANN")):
+        if table_name in get_data.grid_layers:
+            keep &= ~np.isnan(get_data.grid_layers[table_name].lookup(eastings, northings)[band])
+    eastings, northings = eastings[keep], northings[keep]
+
+    if hydrology is None:
+        return eastings, northings, None
+    rows = hydrology.lookup(eastings, northings, ["CATEGORY"])
+    found = np.array([row is not None for row in rows], dtype=bool)
+    return eastings[found], northings[found], [row[0] for row in rows if row is not None]
+
+
+def targets():
+    """Number of rows wanted per hydrology category, or None when not stratifying."""
+    if strata is None:
+        return None
+    # Largest-remainder rounding, so the targets add up to exactly num_points
+    total = sum(strata.values())
+    exact = {category: num_points * share / total for category, share in strata.items()}
+    wanted = {category: int(value) for category, value in exact.items()}
+    by_remainder = sorted(exact, key=lambda category: exact[category] - wanted[category], reverse=True)
+    for category in by_remainder[:num_points - sum(wanted.values())]:
+        wanted[category] += 1
+    return wanted
+
 
-                # Extract the required fields
-                texture = data["soil_data"].get("TEXTURE", "N/A")
-                description = data["soil_data"].get("PlainEngli", "N/A")
-                elevation = data["elevation_data"].get("Elevation", "N/A")
-                annual_rainfall = data["rainfall_data"].get("ANN", "N/A")
-                hydrology_category = data["hydrology_data"].get("CATEGORY", "N/A")
+def open_strata(counts, wanted):
+    """Categories still short of their target (None when not stratifying)."""
+    if wanted is None:
+        return None
+    return {category for category, target in wanted.items() if counts[category] < target}
 
-                # Write the data to the CSV (including Easting and Northing)
-                writer.writerow([easting, northing, texture, description, elevation, annual_rainfall, hydrology_category])
 
-                valid_points += 1  # Increment the counter for valid points
-                print(f"Valid point added: {valid_points}/{num_points}")
+def complete(counts, wanted):
+    if wanted is not None:
+        return not open_strata(counts, wanted)
+    return sum(counts.values()) >= num_points
 
-            except Exception as e:
-                print(f"Error processing response for Easting: {easting}, Northing: {northing} - {e}")
+
+def next_batch(counts, wanted, boundary, hydrology):
+    """
+    Pick up to batch_size pre-filtered points, taking only categories that still need rows. Returns
+    an empty batch once every stratum is full; raises when max_draws draws find no point at all.
+    """
+    batch = []
+    open_categories = open_strata(counts, wanted)
+    for _ in range(max_draws):
+        if open_categories is not None and not open_categories:
+            return batch
+        eastings, northings, categories = candidates(batch_size * 4, boundary, hydrology)
+        if open_categories is None or categories is None:
+            batch.extend(zip(eastings.tolist(), northings.tolist()))
         else:
-            print(f"Failed request for Easting: {easting}, Northing: {northing} - Status Code: {response.status_code}")
+            batch.extend((e, n) for e, n, category in zip(eastings.tolist(), northings.tolist(), categories) if category in open_categories)
+        if len(batch) >= batch_size:
+            return batch[:batch_size]
+    if not batch:
+        raise RuntimeError(f"No candidate points for the open strata {sorted(open_categories or [])} in {max_draws} draws")
+    return batch
+
+
+def fetch(points):
+    """POST one batch of points to the backend and return its results."""
+    session = getattr(thread_state, "session", None)
+    if session is None:
+        session = thread_state.session = requests.Session()
+    response = session.post(batch_url, json={"points": [[e, n] for e, n in points]}, timeout=300)
+    response.raise_for_status()
+    return response.json()["results"]
+
+
+def to_row(data):
+    """The CSV row for a backend result, or None when any required field is missing."""
+    try:
+        if (
+            not data["soil_data"].get("TEXTURE") or
+            not data["soil_data"].get("PlainEngli") or
+            not data["elevation_data"].get("Elevation") or
+            not data["rainfall_data"].get("ANN") or
+            not data["hydrology_data"].get("CATEGORY")
+        ):
+            return None
+    except (KeyError, AttributeError, TypeError):
+        return None
+    return [
+        round(data["easting"]),
+        round(data["northing"]),
+        data["soil_data"]["TEXTURE"],
+        data["soil_data"]["PlainEngli"],
+        data["elevation_data"]["Elevation"],
+        data["rainfall_data"]["ANN"],
+        data["hydrology_data"]["CATEGORY"],
+    ]
+
+
+def existing_counts():
+    """Per-category counts of the rows already in output_csv (for resuming)."""
+    if not os.path.exists(output_csv):
+        return Counter()
+    with open(output_csv, newline="") as csvfile:
+        return Counter(row["Hydrology_Category"] for row in csv.DictReader(csvfile))
+
+
+def accept(row, counts, wanted):
+    category = row[-1]
+    if wanted is not None and counts[category] >= wanted.get(category, 0):
+        return False
+    return sum(counts.values()) < num_points
+
+
+if __name__ == "__main__":
+    boundary = load_boundary()
+    hydrology = load_hydrology()
+    wanted = targets()
+    counts = existing_counts()
+    print(f"Resuming with {sum(counts.values())} existing points" if counts else "Starting a new dataset")
+
+    new_file = not os.path.exists(output_csv)
+    with open(output_csv, "a", newline="") as csvfile, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        writer = csv.writer(csvfile)
+        if new_file:
+            writer.writerow(fields)
+
+        in_flight = set()
+        while not complete(counts, wanted):
+            while len(in_flight) < concurrency:
+                batch = next_batch(counts, wanted, boundary, hydrology)
+                if not batch:
+                    break
+                in_flight.add(executor.submit(fetch, batch))
+            if not in_flight:
+                break
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    results = future.result()
+                except Exception as e:
+                    print(f"Batch request failed: {e}")
+                    continue
+                rows = [row for row in map(to_row, results) if row is not None]
+                for row in rows:
+                    if accept(row, counts, wanted):
+                        writer.writerow(row)
+                        counts[row[-1]] += 1
+                csvfile.flush()
+                print(f"Valid points: {sum(counts.values())}/{num_points} {dict(counts)}")
+
+        for future in in_flight:
+            future.cancel()
 
-print(f"Data extraction complete. Saved {num_points} valid entries to {output_csv}.")
+    print(f"Data extraction complete. Saved {sum(counts.values())} valid entries to {output_csv}.")
@@ -1,30 +1,35 @@
+import os
+import sys
 import pandas as pd
+import pyarrow.parquet as pq
+import shapely
 
-# Input and output file paths
+# Input and output file paths. The GeoParquet from SHP_to_parquet.py is read with a column
+# projection, so only the kept columns are ever decoded; the full CSV is the fallback.
+input_parquet = "data/hydrology_data.parquet"
 input_csv = "data/hydrology_data_full.csv"  # Replace with the path to your original CSV
 output_csv = "data/hydrology_data_trimmed.csv"  # Path to save the trimmed CSV
 
 # Columns to retain
 columns_to_keep = ["CATEGORY", "ParMat_Des", "SoilDraina", "geometry"]
 
-try:
-    # Load the CSV file into a DataFrame
-    df = pd.read_csv(input_csv)
-
-    # Check if all required columns exist in the input CSV
-    missing_columns = [col for col in columns_to_keep if col not in df.columns]
-    if missing_columns:
-        raise ValueError(f"Missing columns in input CSV: {', '.join(missing_columns)}")
+if not os.path.exists(input_parquet) and not os.path.exists(input_csv):
+    print(f"Error: File not found at {input_parquet} or {input_csv}")
+    sys.exit(1)
 
-    # Select only the required columns
-    trimmed_df = df[columns_to_keep]
+try:
+    if os.path.exists(input_parquet):
+        # Geometry is WKB in the Parquet file; write it back out as WKT like the CSV path
+        trimmed_df = pq.read_table(input_parquet, columns=columns_to_keep).to_pandas()
+        trimmed_df["geometry"] = shapely.to_wkt(shapely.from_wkb(trimmed_df["geometry"].values))
+    else:
+        # Read only the required columns (usecols raises ValueError naming any that are missing)
+        trimmed_df = pd.read_csv(input_csv, usecols=columns_to_keep)[columns_to_keep]
 
     # Save the trimmed DataFrame to a new CSV
     trimmed_df.to_csv(output_csv, index=False)
 
     print(f"Trimmed CSV saved to {output_csv}")
 
-except FileNotFoundError:
-    print(f"Error: File not found at {input_csv}")
 except Exception as e:
     print(f"An error occurred: {e}")
@@ -1,17 +1,32 @@
+import os
+import sys
 import pandas as pd
-from shapely import wkt
+import pyarrow.parquet as pq
+import shapely
 
-# Load the dataset
-soil_data = pd.read_csv("data/soil_data_full.csv")
+# Input file paths: the GeoParquet from SHP_to_parquet.py, or the full CSV as the fallback
+input_parquet = "data/soil_data.parquet"
+input_csv = "data/soil_data_full.csv"
 
-# Parse geometry column
-soil_data['geometry'] = soil_data['geometry'].apply(wkt.loads)
+columns = ["Texture_Su", "TEXTURE", "DEPTH", "PlainEngli"]
+bbox_columns = ["min_x", "min_y", "max_x", "max_y"]
 
-# Add bounding box columns for spatial filtering
-soil_data['min_x'] = soil_data['geometry'].apply(lambda geom: geom.bounds[0])
-soil_data['min_y'] = soil_data['geometry'].apply(lambda geom: geom.bounds[1])
-soil_data['max_x'] = soil_data['geometry'].apply(lambda geom: geom.bounds[2])
-soil_data['max_y'] = soil_data['geometry'].apply(lambda geom: geom.bounds[3])
+if not os.path.exists(input_parquet) and not os.path.exists(input_csv):
+    print(f"Error: File not found at {input_parquet} or {input_csv}")
+    sys.exit(1)
+
+if os.path.exists(input_parquet):
+    # GeoParquet from SHP_to_parquet.py already has the bounding boxes, so project just the
+    # columns needed and skip geometry decoding altogether
+    soil_data = pq.read_table(input_parquet, columns=bbox_columns + columns).to_pandas()
+else:
+    # Load the dataset (only the columns that are kept) and parse the geometry in one call
+    soil_data = pd.read_csv(input_csv, usecols=columns + ["geometry"])
+    bounds = shapely.bounds(shapely.from_wkt(soil_data.pop("geometry").values))
+
+    # Add bounding box columns for spatial filtering
+    for i, column in enumerate(bbox_columns):
+        soil_data[column] = bounds[:, i]
 
 # Define a grid size (in meters) for clustering
 grid_size = 1000 